@@ -31,6 +31,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -66,11 +67,12 @@ async def health_check():
 
 
 # Import and register routes
-from api.routes import jobs, rooms, michigan
+from api.routes import jobs, rooms, michigan, pricing
 
 app.include_router(jobs.router)
 app.include_router(rooms.router)
 app.include_router(michigan.router)
+app.include_router(pricing.router)
 
 # TODO: Add remaining routes as they are created
 # from api.routes import customers, invoices, ai, paypal
@@ -96,6 +98,11 @@ async def startup_event():
             logger.warning(f"[WARN] Database URL not available: {db_err}")
 
         logger.info("[OK] Database connection: Ready")
+
+        from services.classification_worker import get_classification_worker_pool
+
+        await get_classification_worker_pool().start()
+
         logger.info("[OK] AI Vision service: Ready")
         logger.info("[OK] PayPal integration: Ready")
         logger.info("[OK] All systems operational")
@@ -108,6 +115,22 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("[SHUTDOWN] CleanoutPro API shutting down...")
+
+    # Stop classification workers before closing their HTTP client
+    from services.classification_worker import get_classification_worker_pool
+
+    await get_classification_worker_pool().stop()
+
+    # Release pooled Ollama connections
+    from services.ai_vision import get_ai_vision_service
+
+    await get_ai_vision_service().aclose()
+
+    # Release pooled async database connections
+    from database.connection import close_async_db
+
+    await close_async_db()
+
     logger.info("[OK] Cleanup complete")
 
 
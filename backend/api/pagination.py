@@ -0,0 +1,67 @@
+"""
+Keyset Pagination
+Opaque cursor tokens for list endpoints
+Each page seeks past the last row seen instead of counting through an OFFSET
+"""
+
+import base64
+import json
+from typing import Any, Callable, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+# Response header carrying the cursor for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode sort key values of the last row as an opaque cursor"""
+    raw = json.dumps([_serialize(value) for value in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, parsers: Sequence[Callable[[str], Any]]) -> Tuple:
+    """
+    Decode cursor back into sort key values
+
+    Raises:
+        HTTPException 400 if the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError("wrong number of cursor fields")
+        return tuple(parse(value) for parse, value in zip(parsers, values))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def apply_keyset(query, columns: Sequence, after: Optional[Tuple] = None, descending: bool = False):
+    """
+    Order query by columns and seek past the after key
+
+    columns must form a unique key (end with the primary key) so rows
+    are never skipped or repeated between pages.
+    """
+    if after is not None:
+        key = tuple_(*columns)
+        query = query.filter(key < tuple(after) if descending else key > tuple(after))
+
+    return query.order_by(*[column.desc() if descending else column.asc() for column in columns])
+
+
+def next_cursor(items: Sequence, limit: int, key: Callable[[Any], Sequence[Any]]) -> Optional[str]:
+    """Cursor for the page after items, or None if this is the last page"""
+    if len(items) < limit:
+        return None
+    return encode_cursor(key(items[-1]))
+
+
+def _serialize(value: Any) -> Any:
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, (int, float, str)) or value is None:
+        return value
+    return str(value)
@@ -3,16 +3,24 @@ Jobs API Routes
 CRUD operations for job management
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import selectinload
 from typing import List, Optional
 from datetime import datetime
 from decimal import Decimal
+import asyncio
+import json
 import uuid
 
-from database.connection import get_db
+from api.pagination import NEXT_CURSOR_HEADER, apply_keyset, decode_cursor, next_cursor
+from database.connection import get_async_db, get_async_session_factory
 from database.models import Job, Customer, Room
 from pydantic import BaseModel
+from services.job_totals import recompute_job_totals_by_id
+from services.pricing_engine import get_pricing_engine
 
 router = APIRouter(prefix="/api/jobs", tags=["Jobs"])
 
@@ -66,34 +74,49 @@ class JobDetailResponse(JobResponse):
 # Routes
 
 @router.get("", response_model=List[JobResponse])
-def list_jobs(
+async def list_jobs(
+    response: Response,
     status: Optional[str] = Query(None),
     limit: int = Query(50, le=100),
+    cursor: Optional[str] = Query(None),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    List all jobs with optional filtering
+    List all jobs with optional filtering, newest first
 
     Query params:
     - status: Filter by status (draft, estimated, approved, in_progress, completed, invoiced, paid)
     - limit: Max results (default 50, max 100)
-    - offset: Pagination offset
+    - cursor: Value of the X-Next-Cursor header from the previous page
+    - offset: Pagination offset (deprecated - deep pages get slower, use cursor)
+
+    The X-Next-Cursor response header is set when more jobs may follow.
     """
-    query = db.query(Job)
+    query = select(Job)
 
     if status:
-        query = query.filter(Job.status == status)
+        query = query.where(Job.status == status)
+
+    after = decode_cursor(cursor, (datetime.fromisoformat, uuid.UUID)) if cursor else None
+    query = apply_keyset(query, (Job.created_at, Job.id), after, descending=True)
+
+    if offset and not cursor:
+        query = query.offset(offset)
+
+    jobs = (await db.scalars(query.limit(limit))).all()
 
-    jobs = query.order_by(Job.created_at.desc()).offset(offset).limit(limit).all()
+    token = next_cursor(jobs, limit, lambda job: (job.created_at, job.id))
+    if token:
+        response.headers[NEXT_CURSOR_HEADER] = token
 
     return jobs
 
 
 @router.post("", response_model=JobResponse, status_code=201)
-def create_job(
+async def create_job(
     job_data: JobCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create new job
@@ -103,7 +126,7 @@ def create_job(
     - property_address: Job location
     """
     # Verify customer exists
-    customer = db.query(Customer).filter(Customer.id == uuid.UUID(job_data.customer_id)).first()
+    customer = await db.get(Customer, uuid.UUID(job_data.customer_id))
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
 
@@ -121,16 +144,16 @@ def create_job(
     )
 
     db.add(job)
-    db.commit()
-    db.refresh(job)
+    await db.commit()
+    await db.refresh(job)
 
     return job
 
 
 @router.get("/{job_id}", response_model=JobDetailResponse)
-def get_job(
+async def get_job(
     job_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get job details with customer and rooms
@@ -140,10 +163,12 @@ def get_job(
     - All rooms with AI classification
     - Pricing breakdown
     """
-    job = db.query(Job).options(
-        joinedload(Job.customer),
-        joinedload(Job.rooms)
-    ).filter(Job.id == uuid.UUID(job_id)).first()
+    job = await db.scalar(
+        select(Job).options(
+            selectinload(Job.customer),
+            selectinload(Job.rooms)
+        ).where(Job.id == uuid.UUID(job_id))
+    )
 
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
@@ -182,10 +207,10 @@ def get_job(
 
 
 @router.patch("/{job_id}", response_model=JobResponse)
-def update_job(
+async def update_job(
     job_id: str,
     job_update: JobUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update job
@@ -197,7 +222,7 @@ def update_job(
     - adjustments (stairs, bins, etc.)
     - notes
     """
-    job = db.query(Job).filter(Job.id == uuid.UUID(job_id)).first()
+    job = await db.get(Job, uuid.UUID(job_id))
 
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
@@ -213,37 +238,37 @@ def update_job(
     if job_update.human_adjusted_estimate is not None:
         job.final_price = Decimal(str(job_update.human_adjusted_estimate))
 
-    db.commit()
-    db.refresh(job)
+    await db.commit()
+    await db.refresh(job)
 
     return job
 
 
 @router.delete("/{job_id}", status_code=204)
-def delete_job(
+async def delete_job(
     job_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete job (cascade deletes rooms)
 
     WARNING: This permanently deletes the job and all associated rooms
     """
-    job = db.query(Job).filter(Job.id == uuid.UUID(job_id)).first()
+    job = await db.get(Job, uuid.UUID(job_id))
 
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    db.delete(job)
-    db.commit()
+    await db.delete(job)
+    await db.commit()
 
     return None
 
 
 @router.get("/{job_id}/estimate", response_model=dict)
-def get_job_estimate(
+async def get_job_estimate(
     job_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get pricing estimate for job
@@ -254,7 +279,9 @@ def get_job_estimate(
     - Final price
     - Breakdown by room
     """
-    job = db.query(Job).options(joinedload(Job.rooms)).filter(Job.id == uuid.UUID(job_id)).first()
+    job = await db.scalar(
+        select(Job).options(selectinload(Job.rooms)).where(Job.id == uuid.UUID(job_id))
+    )
 
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
@@ -281,3 +308,172 @@ def get_job_estimate(
         "final_price": float(job.final_price) if job.final_price else ai_total,
         "room_breakdown": room_breakdown
     }
+
+
+@router.post("/{job_id}/classify")
+async def classify_job_rooms(
+    job_id: str,
+    concurrency: int = Query(4, ge=1, le=16),
+    force: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    session_factory: async_sessionmaker = Depends(get_async_session_factory)
+):
+    """
+    Re-run AI classification on every room of a job concurrently
+
+    Same rules as POST /api/rooms/{room_id}/reprocess (human overrides
+    are never replaced), but rooms are classified in parallel and the
+    job's ai_estimate/final_price are recomputed once at the end.
+
+    Query params:
+    - concurrency: Max simultaneous vision requests (default 4, max 16)
+    - force: Bypass the classification cache
+
+    Streams newline-delimited JSON: one line per room as it completes,
+    then a final summary line with the updated job totals.
+    """
+    job = await db.get(Job, uuid.UUID(job_id))
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    rooms = (await db.execute(
+        select(Room.id, Room.name, Room.image_path)
+        .where(Room.job_id == job.id)
+        .order_by(Room.room_number)
+    )).all()
+
+    return StreamingResponse(
+        _classify_rooms_stream(session_factory, job.id, rooms, concurrency, force),
+        media_type="application/x-ndjson"
+    )
+
+
+async def _classify_rooms_stream(
+    session_factory: async_sessionmaker, job_id, rooms, concurrency: int, force: bool
+):
+    """
+    Fan room images out to the vision service and yield results as they finish
+
+    Runs after the route has returned (and its request session is gone),
+    so it writes through a session of its own. Rooms are committed as they
+    finish; if the stream stops early (client disconnect, cancellation),
+    job totals are still recomputed for the rooms already written.
+    """
+    # Imported on first use - keeps httpx/Pillow out of app cold start
+    from services.ai_vision import get_ai_vision_service
+
+    ai_service = get_ai_vision_service()
+    pricing_engine = get_pricing_engine()
+    semaphore = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+
+    async def classify(room_id, name, image_path):
+        async with semaphore:
+            try:
+                image_data = await loop.run_in_executor(None, _read_image, image_path)
+            except Exception as e:
+                return room_id, name, None, f"Room image not found: {e}"
+
+            classification = await ai_service.classify_room_async(
+                image_data, room_name=name, use_ultrathink=True, use_cache=not force
+            )
+            return room_id, name, classification, classification.get('error')
+
+    tasks = [asyncio.ensure_future(classify(*room)) for room in rooms]
+    classified = 0
+    failed = 0
+    totals_stale = False
+
+    try:
+        async with session_factory() as db:
+            await db.run_sync(pricing_engine.refresh_rules)
+
+            for next_done in asyncio.as_completed(tasks):
+                room_id, name, classification, error = await next_done
+
+                if error:
+                    failed += 1
+                    yield json.dumps({
+                        "room_id": str(room_id),
+                        "name": name,
+                        "status": "failed",
+                        "error": error
+                    }) + "\n"
+                    continue
+
+                room = await db.get(Room, room_id)
+                if room is None:
+                    continue
+
+                # Update AI fields only
+                room.ai_size_class = classification['size_class']
+                room.ai_workload_class = classification['workload_class']
+                room.ai_confidence = classification['confidence']
+                room.ai_reasoning = classification.get('reasoning')
+                room.ai_features = classification.get('features', {})
+                room.ai_estimated_cost = pricing_engine.calculate_room_cost(
+                    room.ai_size_class,
+                    room.ai_workload_class
+                )
+                room.processed_at = datetime.utcnow()
+                room.status = 'classified'
+
+                # Only update final if no human override exists
+                if not room.human_size_class and not room.human_workload_class:
+                    room.final_size_class = classification['size_class']
+                    room.final_workload_class = classification['workload_class']
+                    room.estimated_cost = pricing_engine.calculate_room_cost(
+                        room.final_size_class,
+                        room.final_workload_class
+                    )
+
+                await db.commit()
+                classified += 1
+                totals_stale = True
+
+                yield json.dumps({
+                    "room_id": str(room.id),
+                    "name": room.name,
+                    "status": "classified",
+                    "ai_size_class": room.ai_size_class,
+                    "ai_workload_class": room.ai_workload_class,
+                    "ai_confidence": room.ai_confidence,
+                    "final_size_class": room.final_size_class,
+                    "final_workload_class": room.final_workload_class,
+                    "estimated_cost": float(room.estimated_cost),
+                    "cache_hit": classification.get('cache_hit', False)
+                }) + "\n"
+
+            # Job totals once, after every room is in
+            await db.run_sync(recompute_job_totals_by_id, job_id)
+            await db.commit()
+            totals_stale = False
+            job = await db.get(Job, job_id)
+
+            yield json.dumps({
+                "job_id": str(job_id),
+                "rooms_classified": classified,
+                "rooms_failed": failed,
+                "ai_estimate": float(job.ai_estimate) if job else 0.0,
+                "final_price": float(job.final_price) if job else 0.0
+            }) + "\n"
+
+    finally:
+        for task in tasks:
+            task.cancel()
+
+        if totals_stale:
+            # Shielded so a second cancellation can't leave the totals stale
+            await asyncio.shield(_recompute_job_totals(session_factory, job_id))
+
+
+async def _recompute_job_totals(session_factory: async_sessionmaker, job_id):
+    async with session_factory() as db:
+        await db.run_sync(recompute_job_totals_by_id, job_id)
+        await db.commit()
+
+
+def _read_image(path: Optional[str]) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
@@ -81,14 +81,10 @@ class MichiganAnalyticsResponse(BaseModel):
     recent_performance: List[Dict[str, str]]
 
 
-# Import Michigan services (simplified for demo)
-try:
-    from services.michigan_autonomous import MichiganAutonomousSystem
-
-    MICHIGAN_SYSTEM_AVAILABLE = True
-except ImportError:
-    logger.warning("Michigan autonomous system not available - using demo data")
-    MICHIGAN_SYSTEM_AVAILABLE = False
+# Michigan services (aiohttp, BeautifulSoup, twilio, SQLite lead store) are
+# imported and built on the first Michigan request, not at app import.
+# None = not checked yet
+MICHIGAN_SYSTEM_AVAILABLE = None
 
 # Global orchestrator instance
 michigan_orchestrator = None
@@ -96,10 +92,16 @@ michigan_orchestrator = None
 
 def get_michigan_system():
     """Get or create Michigan autonomous system instance"""
-    global michigan_orchestrator
-    if not michigan_orchestrator and MICHIGAN_SYSTEM_AVAILABLE:
-        from services.michigan_autonomous import MichiganAutonomousSystem
-
+    global michigan_orchestrator, MICHIGAN_SYSTEM_AVAILABLE
+    if michigan_orchestrator is None and MICHIGAN_SYSTEM_AVAILABLE is not False:
+        try:
+            from services.michigan_autonomous import MichiganAutonomousSystem
+        except ImportError:
+            logger.warning("Michigan autonomous system not available - using demo data")
+            MICHIGAN_SYSTEM_AVAILABLE = False
+            return None
+
+        MICHIGAN_SYSTEM_AVAILABLE = True
         michigan_orchestrator = MichiganAutonomousSystem()
     return michigan_orchestrator
 
@@ -204,9 +206,7 @@ async def generate_michigan_quote(
             )
 
         # Generate real quote
-        from services.michigan_deal_closer import MichiganDealCloser
-
-        deal_closer = MichiganDealCloser(system.db_conn)
+        deal_closer = system.deal_closer
 
         # Get lead data
         cursor = system.db_conn.cursor()
@@ -222,14 +222,19 @@ async def generate_michigan_quote(
         quote = deal_closer.calculate_michigan_pricing(lead_dict)
         quote_doc = deal_closer.generate_quote_document(quote)
 
-        # Save quote to database
-        deal_closer.save_quote_to_database(lead_dict, quote, quote_doc)
-
-        # Send quote in background
+        # Save quote to database; it only becomes 'sent' once the email is out
         if request.contact_email:
+            # Claimed ('sending') so a quoting run doesn't email it as well
+            deal_closer.save_quote_to_database(lead_dict, quote, quote_doc, status="sending")
             background_tasks.add_task(
-                deal_closer.send_quote_via_email, lead_dict, quote, quote_doc
+                deal_closer.deliver_quote,
+                lead_dict,
+                quote,
+                quote_doc,
+                request.contact_email,
             )
+        else:
+            deal_closer.save_quote_to_database(lead_dict, quote, quote_doc)
 
         return MichiganQuoteResponse(
             quote_id=quote.quote_id,
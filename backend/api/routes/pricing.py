@@ -0,0 +1,84 @@
+"""
+Pricing API Routes
+What-if repricing of historical jobs under candidate rates
+"""
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional
+from datetime import datetime
+from decimal import Decimal
+
+from database.connection import get_async_db
+from pydantic import BaseModel
+from services.pricing_engine import JobFilter, get_pricing_engine, rate_overrides
+
+router = APIRouter(prefix="/api/pricing", tags=["Pricing"])
+
+
+# Pydantic schemas for request/response
+class SimulationRequest(BaseModel):
+    # Candidate rates; anything not given keeps its current value
+    base_labor_rate: Optional[Decimal] = None
+    size_multipliers: Dict[str, Decimal] = {}
+    workload_multipliers: Dict[str, Decimal] = {}
+
+    # Which jobs to reprice (default: all)
+    statuses: Optional[List[str]] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+
+
+class SimulationBucket(BaseModel):
+    size_class: Optional[str]
+    workload_class: Optional[str]
+    rooms: int
+    current: float
+    candidate: float
+    delta: float
+
+
+class SimulationMonth(BaseModel):
+    month: Optional[str]
+    rooms: int
+    current: float
+    candidate: float
+    delta: float
+
+
+class SimulationResponse(BaseModel):
+    rooms: int
+    current_total: float
+    candidate_total: float
+    delta: float
+    by_bucket: List[SimulationBucket]
+    by_month: List[SimulationMonth]
+
+
+# Routes
+
+@router.post("/simulate", response_model=SimulationResponse)
+async def simulate_pricing(
+    request: SimulationRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Revenue impact of candidate rates across past jobs
+
+    Reprices every room of the matching jobs under the current rates and
+    under the candidate ones, and returns the totals and deltas per
+    size/workload bucket and per month (of job creation). Nothing is saved.
+    """
+    pricing_engine = get_pricing_engine()
+    await db.run_sync(pricing_engine.refresh_rules)
+
+    rule_set = rate_overrides(
+        request.base_labor_rate, request.size_multipliers, request.workload_multipliers
+    )
+    job_filter = JobFilter(
+        statuses=tuple(request.statuses) if request.statuses else None,
+        created_from=request.created_from,
+        created_to=request.created_to
+    )
+
+    return await db.run_sync(pricing_engine.simulate, rule_set, job_filter)
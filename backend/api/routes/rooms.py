@@ -3,19 +3,22 @@ Rooms API Routes
 Image upload, AI classification, and human overrides
 """
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Response
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime
 from decimal import Decimal
 import uuid
 import os
 
-from database.connection import get_db
-from database.models import Room, Job
+from api.pagination import NEXT_CURSOR_HEADER, apply_keyset, decode_cursor, next_cursor
+from database.connection import get_async_db
+from database.models import Room, Job, SyncQueue
 from pydantic import BaseModel
-from services.ai_vision import get_ai_vision_service
-from services.pricing_engine import PricingEngine
+from services.classification_worker import ClassificationWorkerPool, get_classification_worker_pool
+from services.job_totals import recompute_job_totals_by_id
+from services.pricing_engine import get_pricing_engine
 
 
 router = APIRouter(prefix="/api/rooms", tags=["Rooms"])
@@ -47,6 +50,10 @@ class RoomResponse(BaseModel):
 
     # Pricing
     estimated_cost: float
+    ai_estimated_cost: Optional[float] = None
+
+    # pending, processing, classified, failed
+    status: str
 
     captured_at: datetime
     processed_at: Optional[datetime]
@@ -65,29 +72,32 @@ class RoomOverride(BaseModel):
 
 # Routes
 
-@router.post("", response_model=RoomResponse, status_code=201)
+@router.post("", response_model=RoomResponse, status_code=202)
 async def upload_room(
     job_id: str = Form(...),
     room_name: str = Form(...),
     room_number: int = Form(...),
     image: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Upload room image and trigger AI classification
+    Upload room image and queue AI classification
 
     Process:
     1. Verify job exists
     2. Save image to uploads directory
-    3. Trigger AI classification (Ollama LLaVA)
-    4. Calculate pricing
-    5. Store results
+    3. Store room with status 'pending'
+    4. Queue AI classification (Ollama LLaVA) for the worker pool
+
+    The classification worker fills in the ai_* fields, estimated_cost
+    and job totals, then sets status to 'classified'. Poll
+    GET /api/rooms/{room_id} for the result.
 
     Returns:
-    - Complete room record with AI classification and cost estimate
+    - 202 with the pending room record
     """
     # Verify job exists
-    job = db.query(Job).filter(Job.id == uuid.UUID(job_id)).first()
+    job = await db.get(Job, uuid.UUID(job_id))
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
@@ -106,76 +116,40 @@ async def upload_room(
     with open(image_path, "wb") as f:
         f.write(image_data)
 
-    # Trigger AI classification
-    ai_service = get_ai_vision_service()
-
-    try:
-        classification = ai_service.classify_room(image_data, room_name=room_name, use_ultrathink=True)
-    except Exception as e:
-        # If AI fails, use default classification
-        print(f"AI classification failed: {e}")
-        classification = {
-            "size_class": "medium",
-            "workload_class": "moderate",
-            "confidence": 0.0,
-            "reasoning": f"AI classification failed: {str(e)}. Using default values.",
-            "features": {}
-        }
-
-    # Calculate pricing
-    pricing_engine = PricingEngine()
-    estimated_cost = pricing_engine.calculate_room_cost(
-        classification['size_class'],
-        classification['workload_class']
-    )
-
-    # Create room record
+    # Create room record (classified later by the worker pool)
     room = Room(
+        id=uuid.uuid4(),
         job_id=uuid.UUID(job_id),
         name=room_name,
         room_number=room_number,
         image_path=image_path,
         image_url=f"/uploads/rooms/{image_filename}",
 
-        # AI Classification
-        ai_size_class=classification['size_class'],
-        ai_workload_class=classification['workload_class'],
-        ai_confidence=classification['confidence'],
-        ai_reasoning=classification.get('reasoning'),
-        ai_features=classification.get('features', {}),
-
-        # Final = AI (until human override)
-        final_size_class=classification['size_class'],
-        final_workload_class=classification['workload_class'],
+        # Placeholder until AI classification completes
+        final_size_class='medium',
+        final_workload_class='moderate',
+        estimated_cost=Decimal('0.00'),
 
-        # Pricing
-        estimated_cost=estimated_cost,
-
-        processed_at=datetime.utcnow()
+        status='pending'
     )
-
     db.add(room)
-    db.commit()
-    db.refresh(room)
 
-    # Update job AI estimate
-    job_rooms = db.query(Room).filter(Room.job_id == job.id).all()
-    ai_total = sum(float(r.estimated_cost) for r in job_rooms)
-    job.ai_estimate = Decimal(str(ai_total))
+    # Queue classification in the same transaction
+    worker_pool = get_classification_worker_pool()
+    worker_pool.enqueue(db, room, use_ultrathink=True)
 
-    # If no human adjustment, update final_price
-    if not job.human_adjusted_estimate or job.human_adjusted_estimate == 0:
-        job.final_price = job.ai_estimate
+    await db.commit()
+    await db.refresh(room)
 
-    db.commit()
+    worker_pool.notify()
 
     return room
 
 
 @router.get("/{room_id}", response_model=RoomResponse)
-def get_room(
+async def get_room(
     room_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get room details including AI classification and human overrides
@@ -183,7 +157,7 @@ def get_room(
     Returns:
     - Complete room record with all classifications and reasoning
     """
-    room = db.query(Room).filter(Room.id == uuid.UUID(room_id)).first()
+    room = await db.get(Room, uuid.UUID(room_id))
 
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
@@ -192,35 +166,50 @@ def get_room(
 
 
 @router.get("", response_model=List[RoomResponse])
-def list_rooms(
+async def list_rooms(
+    response: Response,
     job_id: Optional[str] = None,
     limit: int = 100,
+    cursor: Optional[str] = Query(None),
     offset: int = 0,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    List rooms with optional job filtering
+    List rooms with optional job filtering, ordered by job then room number
 
     Query params:
     - job_id: Filter by job
     - limit: Max results (default 100)
-    - offset: Pagination offset
+    - cursor: Value of the X-Next-Cursor header from the previous page
+    - offset: Pagination offset (deprecated - deep pages get slower, use cursor)
+
+    The X-Next-Cursor response header is set when more rooms may follow.
     """
-    query = db.query(Room)
+    query = select(Room)
 
     if job_id:
-        query = query.filter(Room.job_id == uuid.UUID(job_id))
+        query = query.where(Room.job_id == uuid.UUID(job_id))
+
+    after = decode_cursor(cursor, (uuid.UUID, int, uuid.UUID)) if cursor else None
+    query = apply_keyset(query, (Room.job_id, Room.room_number, Room.id), after)
+
+    if offset and not cursor:
+        query = query.offset(offset)
 
-    rooms = query.order_by(Room.room_number).offset(offset).limit(limit).all()
+    rooms = (await db.scalars(query.limit(limit))).all()
+
+    token = next_cursor(rooms, limit, lambda room: (room.job_id, room.room_number, room.id))
+    if token:
+        response.headers[NEXT_CURSOR_HEADER] = token
 
     return rooms
 
 
 @router.patch("/{room_id}", response_model=RoomResponse)
-def override_room_classification(
+async def override_room_classification(
     room_id: str,
     override: RoomOverride,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Human override for AI classification
@@ -233,7 +222,7 @@ def override_room_classification(
 
     This is the "Decide" part of "See, Decide, or Get Paid"
     """
-    room = db.query(Room).filter(Room.id == uuid.UUID(room_id)).first()
+    room = await db.get(Room, uuid.UUID(room_id))
 
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
@@ -251,46 +240,42 @@ def override_room_classification(
         room.human_override_reason = override.human_override_reason
 
     # Recalculate pricing with human overrides
-    pricing_engine = PricingEngine()
+    pricing_engine = get_pricing_engine()
+    await db.run_sync(pricing_engine.refresh_rules)
     room.estimated_cost = pricing_engine.calculate_room_cost(
         room.final_size_class,
         room.final_workload_class
     )
 
-    db.commit()
-    db.refresh(room)
-
-    # Update job estimates
-    job = db.query(Job).filter(Job.id == room.job_id).first()
-    job_rooms = db.query(Room).filter(Room.job_id == job.id).all()
+    # Rooms classified before ai_estimated_cost existed: keep the AI price for audit
+    if room.ai_estimated_cost is None and room.ai_size_class and room.ai_workload_class:
+        room.ai_estimated_cost = pricing_engine.calculate_room_cost(
+            room.ai_size_class,
+            room.ai_workload_class
+        )
 
-    # Recalculate AI estimate (sum of all AI classifications)
-    ai_total = sum(
-        float(pricing_engine.calculate_room_cost(r.ai_size_class, r.ai_workload_class))
-        for r in job_rooms
-    )
-    job.ai_estimate = Decimal(str(ai_total))
+    await db.flush()
 
-    # Update final price (sum of all final classifications)
-    final_total = sum(float(r.estimated_cost) for r in job_rooms)
-    job.final_price = Decimal(str(final_total))
+    # Update job estimates (AI estimate and final price summed in SQL)
+    await db.run_sync(recompute_job_totals_by_id, room.job_id)
 
-    db.commit()
+    await db.commit()
+    await db.refresh(room)
 
     return room
 
 
 @router.delete("/{room_id}", status_code=204)
-def delete_room(
+async def delete_room(
     room_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete room and recalculate job estimates
 
     Also deletes associated image file
     """
-    room = db.query(Room).filter(Room.id == uuid.UUID(room_id)).first()
+    room = await db.get(Room, uuid.UUID(room_id))
 
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
@@ -304,35 +289,22 @@ def delete_room(
         except Exception as e:
             print(f"Failed to delete image: {e}")
 
-    # Delete room
-    db.delete(room)
-    db.commit()
-
-    # Update job estimates
-    job = db.query(Job).filter(Job.id == job_id).first()
-    if job:
-        job_rooms = db.query(Room).filter(Room.job_id == job.id).all()
+    # Delete room and update job estimates in one transaction
+    await db.delete(room)
+    await db.flush()
 
-        if job_rooms:
-            ai_total = sum(float(r.estimated_cost) for r in job_rooms)
-            job.ai_estimate = Decimal(str(ai_total))
+    await db.run_sync(recompute_job_totals_by_id, job_id)
 
-            if not job.human_adjusted_estimate or job.human_adjusted_estimate == 0:
-                job.final_price = job.ai_estimate
-        else:
-            # No rooms left
-            job.ai_estimate = Decimal('0.00')
-            job.final_price = Decimal('0.00')
-
-        db.commit()
+    await db.commit()
 
     return None
 
 
 @router.post("/{room_id}/reprocess", response_model=RoomResponse)
-def reprocess_room(
+async def reprocess_room(
     room_id: str,
-    db: Session = Depends(get_db)
+    force: bool = False,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Re-run AI classification on existing room image
@@ -344,12 +316,22 @@ def reprocess_room(
 
     IMPORTANT: Does NOT override human adjustments
     Only updates ai_* fields
+
+    Sets status to 'classified' (or 'failed' if LLaVA only returned the
+    fallback). A room still waiting in the queue is classified now and its
+    queued job dropped; a room a worker is processing returns 409.
+
+    Query params:
+    - force: Bypass the classification cache and always call LLaVA
     """
-    room = db.query(Room).filter(Room.id == uuid.UUID(room_id)).first()
+    room = await db.get(Room, uuid.UUID(room_id))
 
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
 
+    if room.status == 'processing':
+        raise HTTPException(status_code=409, detail="Room is being classified, try again when it finishes")
+
     if not room.image_path or not os.path.exists(room.image_path):
         raise HTTPException(status_code=400, detail="Room image not found")
 
@@ -357,11 +339,15 @@ def reprocess_room(
     with open(room.image_path, 'rb') as f:
         image_data = f.read()
 
-    # Re-run AI classification
+    # Re-run AI classification (imported on first use to keep cold start light)
+    from services.ai_vision import get_ai_vision_service
+
     ai_service = get_ai_vision_service()
 
     try:
-        classification = ai_service.classify_room(image_data, room_name=room.name, use_ultrathink=True)
+        classification = await ai_service.classify_room_async(
+            image_data, room_name=room.name, use_ultrathink=True, use_cache=not force
+        )
 
         # Update AI fields only
         room.ai_size_class = classification['size_class']
@@ -371,20 +357,46 @@ def reprocess_room(
         room.ai_features = classification.get('features', {})
         room.processed_at = datetime.utcnow()
 
+        pricing_engine = get_pricing_engine()
+        await db.run_sync(pricing_engine.refresh_rules)
+        room.ai_estimated_cost = pricing_engine.calculate_room_cost(
+            room.ai_size_class,
+            room.ai_workload_class
+        )
+
         # Only update final if no human override exists
         if not room.human_size_class and not room.human_workload_class:
             room.final_size_class = classification['size_class']
             room.final_workload_class = classification['workload_class']
 
             # Recalculate pricing
-            pricing_engine = PricingEngine()
             room.estimated_cost = pricing_engine.calculate_room_cost(
                 room.final_size_class,
                 room.final_workload_class
             )
 
-        db.commit()
-        db.refresh(room)
+        if 'error' not in classification:
+            room.status = 'classified'
+
+            # Queued classification is now redundant
+            await db.execute(
+                update(SyncQueue)
+                .where(
+                    SyncQueue.entity_id == room.id,
+                    SyncQueue.action == ClassificationWorkerPool.ACTION,
+                    SyncQueue.status == 'pending'
+                )
+                .values(status='completed', processed_at=datetime.utcnow())
+            )
+        elif room.status != 'pending':
+            # Still queued: leave it to the worker's retries
+            room.status = 'failed'
+
+        await db.flush()
+        await db.run_sync(recompute_job_totals_by_id, room.job_id)
+
+        await db.commit()
+        await db.refresh(room)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI classification failed: {str(e)}")
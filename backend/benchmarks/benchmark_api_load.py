@@ -0,0 +1,140 @@
+"""
+API Load Benchmark
+Compares requests/sec and tail latency of the async job listing route
+against the previous sync (threadpool + sync engine) implementation
+
+Requires a reachable PostgreSQL database (DATABASE_URL) with some jobs.
+
+Usage:
+    python benchmarks/benchmark_api_load.py
+    python benchmarks/benchmark_api_load.py --clients 200 --requests 5000
+    python benchmarks/benchmark_api_load.py --database-url postgresql+psycopg://user:pw@localhost/cleanoutpro
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def build_app():
+    """App with the async jobs router plus the old sync listing for comparison"""
+    from fastapi import Depends, FastAPI, Query
+    from sqlalchemy.orm import Session
+
+    from api.routes import jobs
+    from database.connection import get_db
+    from database.models import Job
+
+    app = FastAPI()
+    app.include_router(jobs.router)
+
+    @app.get("/sync/api/jobs")
+    def list_jobs_sync(
+        limit: int = Query(50, le=100),
+        db: Session = Depends(get_db)
+    ):
+        # Pre-async implementation: sync route on the threadpool, sync engine
+        rows = db.query(Job).order_by(Job.created_at.desc()).limit(limit).all()
+        return [{"id": str(job.id), "job_number": job.job_number} for job in rows]
+
+    return app
+
+
+def start_server(app, port: int):
+    import uvicorn
+
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+async def run_load(url: str, clients: int, total: int):
+    """Fire total GETs with at most clients in flight; return latencies and errors"""
+    import httpx
+
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(clients)
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        async def one():
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        # Warm up pools
+        await asyncio.gather(*[one() for _ in range(min(clients, total))])
+        latencies.clear()
+        errors = 0
+
+        start = time.perf_counter()
+        await asyncio.gather(*[one() for _ in range(total)])
+        elapsed = time.perf_counter() - start
+
+    return latencies, errors, elapsed
+
+
+def report(label: str, latencies, errors: int, elapsed: float):
+    latencies = sorted(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"\n[{label}]")
+    print(f"  Requests/sec: {len(latencies) / elapsed:10.1f}")
+    print(f"  p50 latency:  {statistics.median(latencies) * 1000:10.1f} ms")
+    print(f"  p99 latency:  {p99 * 1000:10.1f} ms")
+    print(f"  Errors:       {errors:10d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--clients", type=int, default=200, help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=5000, help="Requests per route")
+    parser.add_argument("--limit", type=int, default=50, help="Jobs per page")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--database-url", help="Override DATABASE_URL")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("AI_CLASSIFICATION_WORKERS", "0")
+
+    print("=" * 60)
+    print("API Load Benchmark")
+    print("=" * 60)
+    print(f"  {args.clients} concurrent clients, {args.requests} requests per route")
+
+    server, thread = start_server(build_app(), args.port)
+    base = f"http://127.0.0.1:{args.port}"
+
+    try:
+        for label, path in (("sync route + sync engine", "/sync/api/jobs"),
+                            ("async route + async engine", "/api/jobs")):
+            url = f"{base}{path}?limit={args.limit}"
+            latencies, errors, elapsed = asyncio.run(run_load(url, args.clients, args.requests))
+            report(label, latencies, errors, elapsed)
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Image Preprocessing Benchmark
+Compares Ollama payload size and classification latency with and
+without downsizing photos before base64 encoding
+
+Usage:
+    python benchmarks/benchmark_image_preprocessing.py
+    python benchmarks/benchmark_image_preprocessing.py --image photo.jpg --ollama http://localhost:11434
+"""
+
+import argparse
+import base64
+import io
+import os
+import statistics
+import sys
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from services.ai_vision import AIVisionService
+from services.image_preprocessing import preprocess_image
+
+
+def synthetic_photo(size, quality=92) -> bytes:
+    """Noisy JPEG roughly the size of a phone camera photo"""
+    image = Image.effect_noise(size, 40).convert('RGB')
+    output = io.BytesIO()
+    image.save(output, format='JPEG', quality=quality)
+    return output.getvalue()
+
+
+def payload_bytes(image_data: bytes) -> int:
+    return len(base64.b64encode(image_data))
+
+
+def bench_preprocessing(label: str, image_data: bytes, runs: int):
+    timings = []
+    processed = image_data
+    for _ in range(runs):
+        start = time.perf_counter()
+        processed = preprocess_image(image_data)
+        timings.append(time.perf_counter() - start)
+
+    size = Image.open(io.BytesIO(processed)).size
+    print(f"\n[{label}]")
+    print(f"  Raw image:        {len(image_data) / 1024 / 1024:8.2f} MB")
+    print(f"  Raw payload:      {payload_bytes(image_data) / 1024 / 1024:8.2f} MB (base64)")
+    print(f"  Processed image:  {len(processed) / 1024:8.1f} KB  {size[0]}x{size[1]}")
+    print(f"  Processed payload:{payload_bytes(processed) / 1024:8.1f} KB (base64)")
+    print(f"  Reduction:        {payload_bytes(image_data) / payload_bytes(processed):8.1f}x")
+    print(f"  Preprocess time:  {statistics.median(timings) * 1000:8.1f} ms (median of {runs})")
+
+
+def bench_end_to_end(image_data: bytes, ollama_url: str, runs: int):
+    service = AIVisionService(ollama_url)
+    if not service.test_connection():
+        print(f"\n[SKIP] Ollama not reachable at {ollama_url}")
+        return
+
+    print(f"\n[END-TO-END] {service.model} at {ollama_url}")
+    for enabled in (False, True):
+        service.preprocess_images = enabled
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            result = service.classify_room(image_data, use_ultrathink=False, use_cache=False)
+            timings.append(time.perf_counter() - start)
+            if 'error' in result:
+                print(f"  [WARN] {result['error']}")
+
+        label = "preprocessed" if enabled else "raw"
+        print(f"  {label:13s} median {statistics.median(timings):6.2f}s  "
+              f"min {min(timings):6.2f}s  max {max(timings):6.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--image", help="Benchmark a real photo instead of synthetic ones")
+    parser.add_argument("--ollama", help="Also measure end-to-end latency against Ollama")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Image Preprocessing Benchmark")
+    print("=" * 60)
+
+    if args.image:
+        with open(args.image, 'rb') as f:
+            samples = {os.path.basename(args.image): f.read()}
+    else:
+        samples = {
+            "8MP phone photo": synthetic_photo((3264, 2448)),
+            "12MP phone photo": synthetic_photo((4032, 3024)),
+        }
+
+    for label, image_data in samples.items():
+        bench_preprocessing(label, image_data, args.runs)
+
+    if args.ollama:
+        bench_end_to_end(next(iter(samples.values())), args.ollama, args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Lead Pipeline Benchmark
+Runs MichiganLeadGenerator end-to-end against a local replay server
+and reports pages/sec, leads/sec, parse time and DB insert time
+
+Uses synthetic pages unless --fixtures points at recorded ones
+(record them with --record, which needs network access).
+
+Usage:
+    python benchmarks/benchmark_lead_pipeline.py
+    python benchmarks/benchmark_lead_pipeline.py --latency 0.2 --parse-workers 0
+    python benchmarks/benchmark_lead_pipeline.py --max-concurrent 20 --per-host 8
+    python benchmarks/benchmark_lead_pipeline.py --record fixtures/ && \\
+        python benchmarks/benchmark_lead_pipeline.py --fixtures fixtures/
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.listing_parser import HTML_PARSER, ListingParser, parse_craigslist_search
+from services.michigan_lead_generator import MichiganLeadGenerator
+from services.rate_limiter import RateLimiter
+from benchmarks.scrape_replay import ReplayServer, fixture_name, record_pages, write_synthetic_fixtures
+
+
+class TimedParser(ListingParser):
+    """ListingParser that sums the time callers spend awaiting parses"""
+
+    def __init__(self, max_workers=None):
+        super().__init__(max_workers)
+        self.pages = 0
+        self.seconds = 0.0
+
+    async def parse(self, parser, html):
+        start = time.perf_counter()
+        try:
+            return await super().parse(parser, html)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.pages += 1
+
+
+def search_urls(facebook_cities, craigslist_cities):
+    return [
+        f"https://www.facebook.com/marketplace/{city}/search?query=junk%20removal"
+        for city in facebook_cities
+    ] + [
+        f"https://{city}.craigslist.org/search/svc?query=junk%20removal"
+        for city in craigslist_cities
+    ]
+
+
+async def record(fixtures_dir, facebook_cities, craigslist_cities):
+    """Record search pages, then the Craigslist detail pages they link to"""
+    saved = await record_pages(search_urls(facebook_cities, craigslist_cities), fixtures_dir)
+
+    detail_urls = []
+    for url in search_urls([], craigslist_cities):
+        path = os.path.join(fixtures_dir, fixture_name(url))
+        if os.path.exists(path):
+            with open(path, encoding="utf-8", errors="replace") as f:
+                detail_urls += [detail for _, _, detail in parse_craigslist_search(f.read()) if detail]
+
+    saved += await record_pages(detail_urls, fixtures_dir)
+    print(f"Recorded {saved} pages into {fixtures_dir}")
+
+
+async def run_pipeline(args, fixtures_dir, facebook_cities, craigslist_cities):
+    parser = TimedParser(args.parse_workers)
+    # Effectively unlimited: measure the pipeline, not the politeness settings
+    limiter = RateLimiter({}, default=(args.rate, max(1, int(args.rate))))
+
+    async with ReplayServer(fixtures_dir, latency=args.latency) as server:
+        async with MichiganLeadGenerator(
+            max_concurrent_requests=args.max_concurrent,
+            max_requests_per_host=args.per_host,
+            rate_limiter=limiter,
+            parser=parser,
+            url_map=server.url_for,
+        ) as generator:
+            # Start the worker processes outside the timed section
+            await parser.parse(parse_craigslist_search, "<html></html>")
+            parser.pages, parser.seconds = 0, 0.0
+
+            start = time.perf_counter()
+            facebook_leads, craigslist_leads = await asyncio.gather(
+                generator.scrape_facebook_marketplace(facebook_cities),
+                generator.scrape_craigslist(craigslist_cities),
+            )
+            scrape_seconds = time.perf_counter() - start
+
+            leads = facebook_leads + craigslist_leads
+            start = time.perf_counter()
+            saved = generator.save_leads(leads)
+            insert_seconds = time.perf_counter() - start
+
+    parser.shutdown()
+
+    total = scrape_seconds + insert_seconds
+    print(f"\n  Pages fetched:     {server.requests:10d}  ({server.not_found} missing fixtures)")
+    print(f"  Leads found:       {len(leads):10d}  ({saved.new} new, {saved.seen} seen)")
+    print(f"  Scrape time:       {scrape_seconds:10.3f} s")
+    print(f"  Parse time:        {parser.seconds:10.3f} s  (awaited, summed over {parser.pages} pages)")
+    print(f"  DB insert time:    {insert_seconds * 1000:10.1f} ms")
+    print(f"  Pages/sec:         {server.requests / scrape_seconds:10.1f}")
+    print(f"  Leads/sec:         {len(leads) / total:10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--fixtures", help="Directory of recorded pages (default: synthetic)")
+    parser.add_argument("--record", metavar="DIR", help="Record real pages into DIR and exit")
+    parser.add_argument("--latency", type=float, default=0.05, help="Server latency per page (s)")
+    parser.add_argument("--facebook-cities", type=int, default=31, help="Facebook cities to scrape")
+    parser.add_argument("--craigslist-cities", type=int, default=2, help="Craigslist cities (synthetic only)")
+    parser.add_argument("--listings", type=int, default=15, help="Listings per synthetic search page")
+    parser.add_argument("--parse-workers", type=int, default=None, help="Parser processes (0 = inline)")
+    parser.add_argument("--max-concurrent", type=int, default=MichiganLeadGenerator.MAX_CONCURRENT_REQUESTS)
+    parser.add_argument("--per-host", type=int, default=MichiganLeadGenerator.MAX_REQUESTS_PER_HOST)
+    parser.add_argument("--rate", type=float, default=10000.0, help="Requests/sec per host")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="lead_pipeline_")
+    os.chdir(workdir)  # fresh michigan_leads.db for every run
+
+    probe = MichiganLeadGenerator()
+    facebook_cities = probe.cities[: args.facebook_cities]
+    craigslist_cities = probe.craigslist_cities
+    probe.db_conn.close()
+
+    if args.record:
+        asyncio.run(record(os.path.abspath(args.record), facebook_cities, craigslist_cities))
+        return
+
+    if args.fixtures:
+        fixtures_dir = os.path.abspath(args.fixtures)
+    else:
+        craigslist_cities = (
+            craigslist_cities + [f"city{i}" for i in range(args.craigslist_cities)]
+        )[: args.craigslist_cities]
+        fixtures_dir = os.path.join(workdir, "fixtures")
+        write_synthetic_fixtures(fixtures_dir, facebook_cities, craigslist_cities, args.listings)
+
+    print("=" * 60)
+    print("Lead Pipeline Benchmark")
+    print("=" * 60)
+    print(f"  {len(facebook_cities)} Facebook cities, {len(craigslist_cities)} Craigslist cities")
+    print(f"  Latency {args.latency * 1000:.0f} ms/page, {args.max_concurrent} concurrent, {args.per_host} per host")
+    workers = "inline" if args.parse_workers == 0 else f"{args.parse_workers or 'default'} processes"
+    print(f"  Parser: {HTML_PARSER}, {workers}")
+    print(f"  Working directory: {workdir}")
+
+    asyncio.run(run_pipeline(args, fixtures_dir, facebook_cities, craigslist_cities))
+
+
+if __name__ == "__main__":
+    main()
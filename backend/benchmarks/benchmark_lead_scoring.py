@@ -0,0 +1,144 @@
+"""
+Lead Scoring Benchmark
+Compares per-keyword substring scans with the shared precompiled
+KeywordMatcher for urgency, lead type and job value over synthetic listings
+
+Usage:
+    python benchmarks/benchmark_lead_scoring.py
+    python benchmarks/benchmark_lead_scoring.py --listings 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.keyword_matcher import KeywordMatcher
+from services.michigan_lead_generator import MichiganLeadGenerator
+
+FILLER = (
+    "please call text today we have old stuff in the back need help with "
+    "pickup this weekend great price cash only items left behind by tenant "
+    "couch mattress boxes bags yard"
+).split()
+
+
+def synthetic_listings(generator: MichiganLeadGenerator, count: int, seed: int = 42):
+    """Random listings sprinkled with scoring keywords"""
+    rng = random.Random(seed)
+    vocabulary = sorted(
+        set().union(*generator.keywords.values(), *generator.value_keywords.values())
+    )
+    listings = []
+    for _ in range(count):
+        title = " ".join(rng.choices(FILLER, k=4) + rng.choices(vocabulary, k=1))
+        words = rng.choices(FILLER, k=rng.randint(20, 60)) + rng.choices(vocabulary, k=rng.randint(0, 6))
+        rng.shuffle(words)
+        listings.append((title.title(), " ".join(words), rng.choice(generator.cities)))
+    return listings
+
+
+def legacy_score(generator: MichiganLeadGenerator, title: str, description: str, location: str):
+    """Pre-matcher implementation: lowercase + one `in` scan per keyword, three times"""
+    keywords = generator.keywords
+
+    text = (title + " " + description).lower()
+    urgency = 0.0
+    for keyword in keywords["high_urgency"]:
+        if keyword in text:
+            urgency += 0.4
+    for keyword in keywords["medium_urgency"]:
+        if keyword in text:
+            urgency += 0.2
+    urgency = min(urgency, 1.0)
+
+    text = (title + " " + description).lower()
+    scores = {"junk_removal": 0, "cleanout": 0, "moving": 0, "estate": 0}
+    for category, words in keywords.items():
+        if category in scores:
+            for keyword in words:
+                if keyword in text:
+                    scores[category] += 1
+    lead_type = max(scores, key=scores.get)
+
+    text = (title + " " + description).lower()
+    value = 200
+    if any(word in text for word in ["house", "home", "entire", "whole"]):
+        value += 200
+    if any(word in text for word in ["apartment", "condo", "studio"]):
+        value -= 50
+    if any(word in text for word in ["basement", "garage", "shed"]):
+        value += 100
+    if any(word in text for word in ["estate", "inheritance"]):
+        value += 300
+    if "furniture" in text:
+        value += 75
+    if "appliances" in text:
+        value += 50
+    if "construction" in text or "debris" in text:
+        value += 150
+    if any(city in location.lower() for city in ["bloomfield", "birmingham", "farmington"]):
+        value *= 1.3
+    elif any(city in location.lower() for city in ["detroit", "highland park"]):
+        value *= 0.9
+
+    return lead_type, urgency, max(value, 100)
+
+
+def matcher_score(generator: MichiganLeadGenerator, title: str, description: str, location: str):
+    """Current implementation: one match result shared by all three functions"""
+    hits = generator.match_keywords(title, description)
+    return (
+        generator.classify_lead_type(title, description, hits),
+        generator.calculate_urgency_score(title, description, hits),
+        generator.estimate_job_value(title, description, location, hits),
+    )
+
+
+def bench(label: str, score, generator, listings):
+    start = time.perf_counter()
+    results = [score(generator, *listing) for listing in listings]
+    elapsed = time.perf_counter() - start
+    print(f"\n[{label}]")
+    print(f"  Total:     {elapsed:8.2f} s")
+    print(f"  Per lead:  {elapsed / len(listings) * 1e6:8.1f} us")
+    print(f"  Leads/sec: {len(listings) / elapsed:8.0f}")
+    return results, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--listings", type=int, default=100_000)
+    parser.add_argument("--no-automaton", action="store_true",
+                        help="Use the term table even if pyahocorasick is installed")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Lead Scoring Benchmark")
+    print("=" * 60)
+
+    generator = MichiganLeadGenerator()
+    generator.db_conn.close()  # Scoring only
+
+    if args.no_automaton:
+        generator.matcher = KeywordMatcher(
+            {**generator.keywords, **generator.value_keywords}, use_automaton=False
+        )
+
+    listings = synthetic_listings(generator, args.listings)
+    print(f"  {len(listings)} synthetic listings, matcher backend: {generator.matcher.backend}")
+
+    legacy, legacy_time = bench("per-keyword scans", legacy_score, generator, listings)
+    current, current_time = bench("precompiled matcher", matcher_score, generator, listings)
+
+    mismatches = sum(1 for a, b in zip(legacy, current) if a != b)
+    print(f"\n  Speedup:    {legacy_time / current_time:6.2f}x")
+    print(f"  Mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
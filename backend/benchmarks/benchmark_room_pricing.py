@@ -0,0 +1,90 @@
+"""
+Room Pricing Benchmark
+Compares calculate_room_cost calls/sec against the previous implementation
+(per-call multiplies, fresh Decimal defaults, eager INFO log line)
+
+Logging is configured at INFO with a discarding handler, as in the app,
+so the old per-call f-string log is formatted but not written anywhere.
+
+Usage:
+    python benchmarks/benchmark_room_pricing.py
+    python benchmarks/benchmark_room_pricing.py --calls 1000000
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+from decimal import Decimal
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.pricing_engine import PricingEngine
+
+logger = logging.getLogger("services.pricing_engine")
+
+
+def legacy_room_cost(engine: PricingEngine, size_class, workload_class, adjustments=None):
+    """calculate_room_cost before the precomputed cost table, kept for comparison"""
+    size_mult = engine.size_multipliers.get(size_class, Decimal('1.5'))
+    workload_mult = engine.workload_multipliers.get(workload_class, Decimal('1.3'))
+
+    room_cost = engine.base_labor_rate * size_mult * workload_mult
+
+    if adjustments:
+        room_cost += engine._calculate_adjustments(adjustments)
+
+    logger.info(
+        f"Room cost calculated: {size_class}/{workload_class} = ${room_cost:.2f}"
+    )
+
+    return room_cost
+
+
+def rate(label, seconds, calls):
+    print(f"  {label:<28}{seconds:8.3f} s  ({calls / seconds:12,.0f} calls/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--calls", type=int, default=200000, help="Rooms to price")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, handlers=[logging.NullHandler()])
+
+    engine = PricingEngine()
+    rng = random.Random(42)
+    sizes = list(engine.size_multipliers) + ['unknown']
+    workloads = list(engine.workload_multipliers) + ['unknown']
+    rooms = [(rng.choice(sizes), rng.choice(workloads)) for _ in range(args.calls)]
+
+    print("=" * 60)
+    print("Room Pricing Benchmark")
+    print("=" * 60)
+    print(f"  {args.calls} rooms, logging at INFO (discarded)\n")
+
+    start = time.perf_counter()
+    legacy = [legacy_room_cost(engine, size, workload) for size, workload in rooms]
+    legacy_seconds = time.perf_counter() - start
+    rate("Before (multiply + log):", legacy_seconds, args.calls)
+
+    start = time.perf_counter()
+    current = [engine.calculate_room_cost(size, workload) for size, workload in rooms]
+    current_seconds = time.perf_counter() - start
+    rate("calculate_room_cost:", current_seconds, args.calls)
+
+    start = time.perf_counter()
+    bulk = engine.price_rooms_bulk([s for s, _ in rooms], [w for _, w in rooms])
+    bulk_seconds = time.perf_counter() - start
+    rate("price_rooms_bulk:", bulk_seconds, args.calls)
+
+    mismatches = sum(1 for a, b, c in zip(legacy, current, bulk) if not a == b == c)
+    print(f"\n  Speedup (single room):      {legacy_seconds / current_seconds:8.2f}x")
+    print(f"  Mismatched costs:           {mismatches:8d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Scrape Replay
+Serves recorded (or synthetic) Facebook/Craigslist pages from a local aiohttp server
+So the lead pipeline can be tested and benchmarked without the network
+"""
+
+import asyncio
+import hashlib
+import os
+from typing import Iterable, Optional
+from urllib.parse import quote, urlsplit
+import logging
+
+import aiohttp
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+
+def fixture_name(url: str) -> str:
+    """File name of the recorded page for url (scheme and fragment dropped)"""
+    parts = urlsplit(url)
+    key = parts.netloc + parts.path + (f"?{parts.query}" if parts.query else "")
+    return quote(key, safe="") + ".html"
+
+
+class ReplayServer:
+    """
+    Local HTTP server for recorded pages
+
+    A page recorded for https://detroit.craigslist.org/search/svc?query=x
+    is served at {base_url}/detroit.craigslist.org/search/svc?query=x;
+    pass url_for as MichiganLeadGenerator(url_map=...) to scrape it.
+    Each response waits latency seconds and carries an ETag, so
+    conditional requests behave like the real sites.
+    """
+
+    def __init__(self, fixtures_dir: str, latency: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        self.fixtures_dir = fixtures_dir
+        self.latency = latency
+        self.host = host
+        self.port = port
+
+        self.requests = 0
+        self.not_found = 0
+        self.bytes_sent = 0
+
+        self._runner: Optional[web.AppRunner] = None
+        self.base_url: Optional[str] = None
+
+    def url_for(self, url: str) -> str:
+        """Replay URL for a real site URL"""
+        parts = urlsplit(url)
+        query = f"?{parts.query}" if parts.query else ""
+        return f"{self.base_url}/{parts.netloc}{parts.path}{query}"
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        original = "https://" + request.match_info["path"]
+        if request.rel_url.raw_query_string:
+            original += "?" + request.rel_url.raw_query_string
+        path = os.path.join(self.fixtures_dir, fixture_name(original))
+
+        if not os.path.exists(path):
+            self.not_found += 1
+            return web.Response(status=404)
+
+        with open(path, "rb") as f:
+            body = f.read()
+
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+
+        self.bytes_sent += len(body)
+        return web.Response(body=body, content_type="text/html", headers={"ETag": etag})
+
+    async def start(self) -> str:
+        """Start serving; returns the base URL"""
+        app = web.Application()
+        app.router.add_get("/{path:.*}", self._handle)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+
+        port = self._runner.addresses[0][1]
+        self.base_url = f"http://{self.host}:{port}"
+        return self.base_url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
+
+
+async def record_pages(urls: Iterable[str], fixtures_dir: str, session: Optional[aiohttp.ClientSession] = None) -> int:
+    """
+    Download real pages into fixtures_dir for later replay
+
+    Craigslist detail pages linked from recorded search pages must be
+    passed too (e.g. from a first pass over parse_craigslist_search).
+    Returns the number of pages saved.
+    """
+    os.makedirs(fixtures_dir, exist_ok=True)
+    own_session = session is None
+    if own_session:
+        session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30))
+
+    saved = 0
+    try:
+        for url in urls:
+            try:
+                async with session.get(url) as response:
+                    if response.status != 200:
+                        logger.warning(f"Not recorded ({response.status}): {url}")
+                        continue
+                    body = await response.read()
+            except aiohttp.ClientError as e:
+                logger.warning(f"Not recorded ({e}): {url}")
+                continue
+
+            with open(os.path.join(fixtures_dir, fixture_name(url)), "wb") as f:
+                f.write(body)
+            saved += 1
+    finally:
+        if own_session:
+            await session.close()
+
+    return saved
+
+
+def write_synthetic_fixtures(
+    fixtures_dir: str,
+    facebook_cities: Iterable[str],
+    craigslist_cities: Iterable[str],
+    listings_per_page: int = 15,
+    filler_paragraphs: int = 40,
+) -> int:
+    """
+    Write search and detail pages with the markup the scrapers parse
+
+    filler_paragraphs pads every page with unrelated markup so parse cost
+    is closer to a real page. Returns the number of pages written.
+    """
+    os.makedirs(fixtures_dir, exist_ok=True)
+    filler = "".join(
+        f"<div class=\"filler\"><p>Unrelated page content {i} "
+        f"<a href=\"/about/{i}\">link</a> <span>text</span></p></div>"
+        for i in range(filler_paragraphs)
+    )
+
+    def write(url: str, body: str):
+        with open(os.path.join(fixtures_dir, fixture_name(url)), "w", encoding="utf-8") as f:
+            f.write(f"<html><head><title>replay</title></head><body>{filler}{body}{filler}</body></html>")
+
+    pages = 0
+    for city in facebook_cities:
+        items = "".join(
+            f'<div class="x78zum5"><span class="x1lliihq">{city.title()} couch pickup {i}</span>'
+            f'<span class="x1yztbdb">Need junk removal ASAP, moving out of the apartment, '
+            f'old furniture and mattress {i}</span><span class="x193iq5w">${50 + i}</span></div>'
+            for i in range(listings_per_page)
+        )
+        write(f"https://www.facebook.com/marketplace/{city}/search?query=junk%20removal", items)
+        pages += 1
+
+    for c, city in enumerate(craigslist_cities):
+        items = []
+        for i in range(listings_per_page):
+            posting_id = 7_000_000_000 + c * 10_000 + i
+            detail_url = f"https://{city}.craigslist.org/svc/d/junk-removal-{i}/{posting_id}.html"
+            items.append(
+                f'<li class="cl-static-search-result"><a class="title" href="{detail_url}">'
+                f"Basement cleanout {city} {i}</a><span class=\"price\">${100 + i}</span></li>"
+            )
+            write(
+                detail_url,
+                f'<section id="postingbody">Estate cleanout, whole house, furniture and '
+                f"appliances. Urgent, must be done this week. Posting {posting_id}</section>",
+            )
+            pages += 1
+        write(f"https://{city}.craigslist.org/search/svc?query=junk%20removal", "".join(items))
+        pages += 1
+
+    return pages
@@ -95,6 +95,10 @@ class Room(Base):
 
     # Pricing
     estimated_cost = Column(DECIMAL(10, 2), default=0.00)
+    ai_estimated_cost = Column(DECIMAL(10, 2))  # Cost of the AI classification
+
+    # Classification status: pending, processing, classified, failed
+    status = Column(String(50), nullable=False, default='classified')
 
     captured_at = Column(DateTime(timezone=True), server_default=func.now())
     processed_at = Column(DateTime(timezone=True))
@@ -204,6 +208,7 @@ class SyncQueue(Base):
     retry_count = Column(Integer, default=0)
     error_message = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    claimed_at = Column(DateTime(timezone=True))  # When a worker took the item
     processed_at = Column(DateTime(timezone=True))
 
 
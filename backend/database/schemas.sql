@@ -61,6 +61,9 @@ CREATE INDEX idx_jobs_customer ON jobs(customer_id);
 CREATE INDEX idx_jobs_status ON jobs(status);
 CREATE INDEX idx_jobs_scheduled ON jobs(scheduled_date);
 CREATE INDEX idx_jobs_job_number ON jobs(job_number);
+-- Keyset pagination: GET /api/jobs orders by (created_at, id) DESC
+CREATE INDEX idx_jobs_created_id ON jobs(created_at DESC, id DESC);
+CREATE INDEX idx_jobs_status_created_id ON jobs(status, created_at DESC, id DESC);
 
 -- ============================================
 -- ROOMS
@@ -107,6 +110,13 @@ CREATE TABLE rooms (
 
     -- Pricing
     estimated_cost DECIMAL(10, 2) DEFAULT 0.00,
+        -- Cost of final (AI or human) classification
+    ai_estimated_cost DECIMAL(10, 2),
+        -- Cost of AI classification; summed into jobs.ai_estimate
+
+    -- Classification status
+    status VARCHAR(50) NOT NULL DEFAULT 'classified',
+        -- Status: pending, processing, classified, failed
 
     captured_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     processed_at TIMESTAMP WITH TIME ZONE,
@@ -115,7 +125,8 @@ CREATE TABLE rooms (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
-CREATE INDEX idx_rooms_job ON rooms(job_id);
+-- Also serves keyset pagination: GET /api/rooms orders by (job_id, room_number, id)
+CREATE INDEX idx_rooms_job_number_id ON rooms(job_id, room_number, id);
 CREATE INDEX idx_rooms_size_class ON rooms(final_size_class);
 CREATE INDEX idx_rooms_workload_class ON rooms(final_workload_class);
 
@@ -233,19 +244,22 @@ CREATE TABLE sync_queue (
         -- Type: job, room, image
     entity_id UUID NOT NULL,
     action VARCHAR(50) NOT NULL,
-        -- Action: create, update, delete
+        -- Action: create, update, delete, classify (server-side AI queue)
     payload JSONB NOT NULL,
     status VARCHAR(50) DEFAULT 'pending',
         -- Status: pending, processing, completed, failed
     retry_count INTEGER DEFAULT 0,
     error_message TEXT,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    claimed_at TIMESTAMP WITH TIME ZONE,
+        -- When a worker set status to processing; stale claims are requeued
     processed_at TIMESTAMP WITH TIME ZONE
 );
 
 CREATE INDEX idx_sync_queue_device ON sync_queue(device_id);
 CREATE INDEX idx_sync_queue_status ON sync_queue(status);
 CREATE INDEX idx_sync_queue_created ON sync_queue(created_at);
+CREATE INDEX idx_sync_queue_action_status ON sync_queue(action, status, created_at);
 
 -- ============================================
 -- AUDIT_LOG
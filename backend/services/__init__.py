@@ -1,12 +1,23 @@
 """
 Services Package
+Exports are imported on first access so that importing one light
+service (e.g. job_totals) doesn't pull in httpx, Pillow or Ollama clients
 """
 
-from .ai_vision import get_ai_vision_service, AIVisionService
-from .pricing_engine import PricingEngine
+import importlib
 
-__all__ = [
-    'get_ai_vision_service',
-    'AIVisionService',
-    'PricingEngine'
-]
+_EXPORTS = {
+    'get_ai_vision_service': '.ai_vision',
+    'AIVisionService': '.ai_vision',
+    'PricingEngine': '.pricing_engine',
+    'ClassificationCache': '.classification_cache',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        module = importlib.import_module(_EXPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,8 +4,10 @@ Ollama LLaVA integration with "Ultrathink" extended reasoning
 Classifies room images for size and workload estimation
 """
 
+import asyncio
 import base64
 import requests
+import httpx
 import json
 import time
 import re
@@ -13,6 +15,13 @@ from typing import Dict, Optional, Tuple
 from datetime import datetime
 import logging
 
+from services.classification_cache import ClassificationCache, create_classification_cache
+from services.image_preprocessing import (
+    preprocess_image,
+    DEFAULT_MAX_SIDE,
+    DEFAULT_JPEG_QUALITY
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,15 +33,51 @@ class AIVisionService:
     for more accurate room size and workload classification
     """
 
-    def __init__(self, ollama_url: str = "http://localhost:11434"):
+    # Shared async client pool limits (keep-alive connections to Ollama)
+    MAX_CONNECTIONS = 10
+    MAX_KEEPALIVE_CONNECTIONS = 5
+    REQUEST_TIMEOUT = 120  # Vision models can be slow
+
+    def __init__(
+        self,
+        ollama_url: str = "http://localhost:11434",
+        cache: Optional[ClassificationCache] = None
+    ):
         self.ollama_url = ollama_url
         self.model = "llava:7b"  # LLaVA 7B model
+        self.cache = cache
+
+        # Downsize photos to model input resolution before encoding
+        self.preprocess_images = True
+        self.max_image_side = DEFAULT_MAX_SIDE
+        self.jpeg_quality = DEFAULT_JPEG_QUALITY
+        self._async_client: Optional[httpx.AsyncClient] = None
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """Get (or lazily create) the shared pooled async HTTP client"""
+        if self._async_client is None or self._async_client.is_closed:
+            self._async_client = httpx.AsyncClient(
+                base_url=self.ollama_url,
+                timeout=self.REQUEST_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=self.MAX_CONNECTIONS,
+                    max_keepalive_connections=self.MAX_KEEPALIVE_CONNECTIONS
+                )
+            )
+        return self._async_client
+
+    async def aclose(self):
+        """Close the shared async client (call on application shutdown)"""
+        if self._async_client is not None and not self._async_client.is_closed:
+            await self._async_client.aclose()
+        self._async_client = None
 
     def classify_room(
         self,
         image_data: bytes,
         room_name: str = "",
-        use_ultrathink: bool = True
+        use_ultrathink: bool = True,
+        use_cache: bool = True
     ) -> Dict:
         """
         Classify room from image using LLaVA vision model
@@ -41,6 +86,7 @@ class AIVisionService:
             image_data: Raw image bytes (JPEG/PNG)
             room_name: Name of room (optional, helps context)
             use_ultrathink: Enable extended reasoning (recommended)
+            use_cache: Look up / store result in the classification cache
 
         Returns:
             {
@@ -61,66 +107,196 @@ class AIVisionService:
         """
         start_time = time.time()
 
+        prompt = self._build_classification_prompt(room_name, use_ultrathink)
+        cache_key = self._cache_key(image_data, prompt, use_ultrathink) if use_cache else None
+
+        cached = self._get_cached(cache_key, start_time)
+        if cached is not None:
+            return cached
+
         try:
-            # Encode image to base64
-            image_base64 = base64.b64encode(image_data).decode('utf-8')
-
-            # Construct prompt
-            prompt = self._build_classification_prompt(room_name, use_ultrathink)
-
-            # Call Ollama API
-            logger.info(f"Classifying room: {room_name or 'unnamed'} (ultrathink={use_ultrathink})")
-
-            payload = {
-                "model": self.model,
-                "prompt": prompt,
-                "images": [image_base64],
-                "stream": False,
-                "options": {
-                    "temperature": 0.3,  # Lower for consistent classification
-                    "num_predict": 1000 if use_ultrathink else 500
-                }
-            }
+            image_data = self._prepare_image(image_data)
+            payload = self._build_payload(image_data, prompt, room_name, use_ultrathink)
 
             response = requests.post(
                 f"{self.ollama_url}/api/generate",
                 json=payload,
-                timeout=120  # Vision models can be slow
+                timeout=self.REQUEST_TIMEOUT
             )
 
             if response.status_code != 200:
                 raise Exception(f"Ollama API error: {response.text}")
 
-            result = response.json()
-            llm_output = result.get('response', '')
+            return self._finish_classification(response.json(), start_time, cache_key)
+
+        except Exception as e:
+            logger.error(f"AI vision error: {e}", exc_info=True)
+            return self._fallback_classification(e, start_time)
 
-            # Parse LLM output
-            classification = self._parse_classification(llm_output)
+    async def classify_room_async(
+        self,
+        image_data: bytes,
+        room_name: str = "",
+        use_ultrathink: bool = True,
+        use_cache: bool = True
+    ) -> Dict:
+        """
+        Classify room from image without blocking the event loop
 
-            processing_time = time.time() - start_time
-            classification['processing_time'] = round(processing_time, 2)
+        Same contract as classify_room, but uses the shared pooled
+        httpx.AsyncClient so concurrent uploads don't serialize
+        behind each other while LLaVA is running. Cache lookups and
+        stores (image hashing, SQLite writes and commits) run in the
+        executor too.
+        """
+        start_time = time.time()
+        loop = asyncio.get_running_loop()
 
-            logger.info(
-                f"Classification complete: {classification['size_class']}/{classification['workload_class']} "
-                f"(confidence: {classification['confidence']:.2f}, time: {processing_time:.2f}s)"
+        prompt = self._build_classification_prompt(room_name, use_ultrathink)
+        cache_key = None
+        if use_cache and self.cache is not None:
+            cache_key, cached = await loop.run_in_executor(
+                None, self._lookup_cache, image_data, prompt, use_ultrathink, start_time
             )
+            if cached is not None:
+                return cached
 
-            return classification
+        try:
+            # Decoding/resizing is CPU-bound - keep it off the event loop
+            image_data = await loop.run_in_executor(None, self._prepare_image, image_data)
+            payload = self._build_payload(image_data, prompt, room_name, use_ultrathink)
+
+            client = self._get_async_client()
+            response = await client.post("/api/generate", json=payload)
+
+            if response.status_code != 200:
+                raise Exception(f"Ollama API error: {response.text}")
+
+            return await loop.run_in_executor(
+                None, self._finish_classification, response.json(), start_time, cache_key
+            )
 
         except Exception as e:
             logger.error(f"AI vision error: {e}", exc_info=True)
-            processing_time = time.time() - start_time
+            return self._fallback_classification(e, start_time)
+
+    def _prepare_image(self, image_data: bytes) -> bytes:
+        """Resize/re-encode image for the model (no-op when disabled)"""
+        if not self.preprocess_images:
+            return image_data
+        return preprocess_image(image_data, self.max_image_side, self.jpeg_quality)
+
+    def _cache_key(self, image_data: bytes, prompt: str, use_ultrathink: bool) -> Optional[str]:
+        """Content-addressed cache key (None when caching is disabled)"""
+        if self.cache is None:
+            return None
+
+        # Keyed on the raw upload so hits skip preprocessing entirely
+        variant = (
+            f"{self.max_image_side}q{self.jpeg_quality}" if self.preprocess_images else "raw"
+        )
+        return ClassificationCache.make_key(
+            image_data, self.model, use_ultrathink, prompt, variant=variant
+        )
+
+    def _lookup_cache(
+        self,
+        image_data: bytes,
+        prompt: str,
+        use_ultrathink: bool,
+        start_time: float
+    ) -> Tuple[Optional[str], Optional[Dict]]:
+        """Cache key and cached classification (if any), in one executor hop"""
+        cache_key = self._cache_key(image_data, prompt, use_ultrathink)
+        return cache_key, self._get_cached(cache_key, start_time)
+
+    def _get_cached(self, cache_key: Optional[str], start_time: float) -> Optional[Dict]:
+        """Return cached classification if present"""
+        if cache_key is None:
+            return None
 
-            # Return fallback classification with error
-            return {
-                'size_class': 'medium',
-                'workload_class': 'moderate',
-                'confidence': 0.0,
-                'reasoning': f'AI classification failed: {str(e)}',
-                'features': {},
-                'processing_time': round(processing_time, 2),
-                'error': str(e)
+        try:
+            classification = self.cache.get(cache_key)
+        except Exception as e:
+            logger.warning(f"Classification cache lookup failed: {e}")
+            return None
+
+        if classification is None:
+            return None
+
+        classification['processing_time'] = round(time.time() - start_time, 2)
+        classification['cache_hit'] = True
+        logger.info(
+            f"Classification cache hit: {classification['size_class']}/{classification['workload_class']}"
+        )
+        return classification
+
+    def _build_payload(
+        self,
+        image_data: bytes,
+        prompt: str,
+        room_name: str,
+        use_ultrathink: bool
+    ) -> Dict:
+        """Build Ollama /api/generate request payload"""
+        # Encode image to base64
+        image_base64 = base64.b64encode(image_data).decode('utf-8')
+
+        logger.info(f"Classifying room: {room_name or 'unnamed'} (ultrathink={use_ultrathink})")
+
+        return {
+            "model": self.model,
+            "prompt": prompt,
+            "images": [image_base64],
+            "stream": False,
+            "options": {
+                "temperature": 0.3,  # Lower for consistent classification
+                "num_predict": 1000 if use_ultrathink else 500
             }
+        }
+
+    def _finish_classification(
+        self,
+        result: Dict,
+        start_time: float,
+        cache_key: Optional[str] = None
+    ) -> Dict:
+        """Parse Ollama response, cache it and attach processing time"""
+        llm_output = result.get('response', '')
+
+        # Parse LLM output
+        classification = self._parse_classification(llm_output)
+
+        # Only cache usable results - parse failures should be retried
+        if cache_key is not None and 'parse_error' not in classification:
+            try:
+                self.cache.put(cache_key, classification)
+            except Exception as e:
+                logger.warning(f"Classification cache store failed: {e}")
+
+        processing_time = time.time() - start_time
+        classification['processing_time'] = round(processing_time, 2)
+
+        logger.info(
+            f"Classification complete: {classification['size_class']}/{classification['workload_class']} "
+            f"(confidence: {classification['confidence']:.2f}, time: {processing_time:.2f}s)"
+        )
+
+        return classification
+
+    def _fallback_classification(self, error: Exception, start_time: float) -> Dict:
+        """Conservative classification returned when the AI call fails"""
+        processing_time = time.time() - start_time
+
+        return {
+            'size_class': 'medium',
+            'workload_class': 'moderate',
+            'confidence': 0.0,
+            'reasoning': f'AI classification failed: {str(error)}',
+            'features': {},
+            'processing_time': round(processing_time, 2),
+            'error': str(error)
+        }
 
     def _build_classification_prompt(self, room_name: str, use_ultrathink: bool) -> str:
         """Build prompt for room classification"""
@@ -306,5 +482,5 @@ def get_ai_vision_service(ollama_url: str = "http://localhost:11434") -> AIVisio
     """Get AI vision service singleton"""
     global _ai_vision_service
     if _ai_vision_service is None:
-        _ai_vision_service = AIVisionService(ollama_url)
+        _ai_vision_service = AIVisionService(ollama_url, cache=create_classification_cache())
     return _ai_vision_service
@@ -0,0 +1,191 @@
+"""
+Classification Cache
+Content-addressed, persistent cache for AI room classifications
+Keyed by image hash + model + prompt so identical uploads skip LLaVA
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ClassificationCache:
+    """
+    SQLite-backed LRU cache for room classifications
+
+    Entries are evicted least-recently-used first once the total
+    stored payload size exceeds max_bytes.
+    """
+
+    DEFAULT_PATH = "classification_cache.db"
+    DEFAULT_MAX_BYTES = 64 * 1024 * 1024  # 64 MB
+
+    def __init__(self, db_path: str = DEFAULT_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(
+        image_data: bytes,
+        model: str,
+        use_ultrathink: bool,
+        prompt: str,
+        variant: str = ""
+    ) -> str:
+        """
+        Build cache key from image bytes, model, ultrathink flag and prompt
+
+        variant distinguishes anything else that changes the model input
+        (e.g. image preprocessing settings).
+        """
+        image_hash = hashlib.sha256(image_data).hexdigest()
+        prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:16]
+        model_key = f"{model}@{variant}" if variant else model
+        return f"{image_hash}:{model_key}:{int(use_ultrathink)}:{prompt_hash}"
+
+    def _get_conn(self) -> sqlite3.Connection:
+        """Open the cache database on first use"""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS classification_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_cache_last_access "
+                "ON classification_cache(last_access)"
+            )
+            self._conn.commit()
+
+            row = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM classification_cache"
+            ).fetchone()
+            self._total_bytes = row[0]
+        return self._conn
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return cached classification, or None on miss"""
+        with self._lock:
+            conn = self._get_conn()
+            row = conn.execute(
+                "SELECT value FROM classification_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            conn.execute(
+                "UPDATE classification_cache SET last_access = ? WHERE cache_key = ?",
+                (time.time(), key),
+            )
+            conn.commit()
+            self.hits += 1
+            return json.loads(row[0])
+
+    def put(self, key: str, classification: Dict):
+        """Store classification and evict LRU entries if over budget"""
+        value = json.dumps(classification)
+        size = len(value.encode('utf-8'))
+
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            conn = self._get_conn()
+
+            existing = conn.execute(
+                "SELECT size FROM classification_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if existing:
+                self._total_bytes -= existing[0]
+
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO classification_cache (cache_key, value, size, last_access)
+                VALUES (?, ?, ?, ?)
+            """,
+                (key, value, size, time.time()),
+            )
+            self._total_bytes += size
+
+            if self._total_bytes > self.max_bytes:
+                self._evict(conn)
+
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Delete least-recently-used entries until under max_bytes"""
+        cursor = conn.execute(
+            "SELECT cache_key, size FROM classification_cache ORDER BY last_access ASC"
+        )
+        evicted = []
+        for cache_key, size in cursor:
+            if self._total_bytes <= self.max_bytes:
+                break
+            evicted.append((cache_key,))
+            self._total_bytes -= size
+
+        conn.executemany("DELETE FROM classification_cache WHERE cache_key = ?", evicted)
+        self.evictions += len(evicted)
+
+    def clear(self):
+        """Remove all cached entries"""
+        with self._lock:
+            conn = self._get_conn()
+            conn.execute("DELETE FROM classification_cache")
+            conn.commit()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            conn = self._get_conn()
+            entries = conn.execute("SELECT COUNT(*) FROM classification_cache").fetchone()[0]
+
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'entries': entries,
+            'size_bytes': self._total_bytes,
+            'max_bytes': self.max_bytes,
+        }
+
+    def close(self):
+        """Close the cache database"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def create_classification_cache() -> ClassificationCache:
+    """Create cache from environment configuration"""
+    return ClassificationCache(
+        db_path=os.getenv("AI_CLASSIFICATION_CACHE_PATH", ClassificationCache.DEFAULT_PATH),
+        max_bytes=int(
+            os.getenv("AI_CLASSIFICATION_CACHE_MAX_BYTES", ClassificationCache.DEFAULT_MAX_BYTES)
+        ),
+    )
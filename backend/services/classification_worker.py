@@ -0,0 +1,343 @@
+"""
+Classification Worker Pool
+Drains queued room classifications in the background
+Uses the sync_queue table as a persistent queue so uploads return immediately
+"""
+
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple, Union
+import logging
+
+from sqlalchemy import or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from database.models import Room, SyncQueue
+from services.job_totals import recompute_job_totals_by_id
+from services.pricing_engine import PricingEngine, get_pricing_engine
+
+if TYPE_CHECKING:
+    from services.ai_vision import AIVisionService
+
+logger = logging.getLogger(__name__)
+
+
+class ClassificationWorkerPool:
+    """
+    Bounded pool of async workers that classify queued rooms
+
+    Each queued item is a SyncQueue row (entity_type='room',
+    action='classify'). Workers claim pending rows, call LLaVA,
+    then write the ai_* fields, estimated_cost and job totals.
+
+    Claims are stamped with claimed_at (refreshed on every retry). On
+    start, only claims older than CLAIM_TIMEOUT are requeued, so several
+    app instances can share the queue without taking each other's work.
+    """
+
+    DEVICE_ID = "server"
+    ENTITY_TYPE = "room"
+    ACTION = "classify"
+
+    MAX_RETRIES = 3
+    RETRY_BACKOFF = 2.0  # seconds, doubled per attempt
+    POLL_INTERVAL = 5.0  # seconds between idle queue checks
+    CLAIM_TIMEOUT = 900.0  # seconds before a 'processing' item counts as abandoned
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        concurrency: int = 2,
+        ai_service: Optional["AIVisionService"] = None,
+        pricing_engine: Optional[PricingEngine] = None
+    ):
+        self._session_factory = session_factory
+        self.concurrency = concurrency
+        self.ai_service = ai_service
+        self.pricing_engine = pricing_engine or get_pricing_engine()
+
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._claim_lock: Optional[asyncio.Lock] = None
+
+    @property
+    def session_factory(self) -> Callable[[], Session]:
+        """Default to the app's sync session factory (engine built on first use)"""
+        if self._session_factory is None:
+            from database.connection import get_session_factory
+            self._session_factory = get_session_factory()
+        return self._session_factory
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def enqueue(
+        self,
+        db: Union[Session, AsyncSession],
+        room: Room,
+        use_ultrathink: bool = True
+    ) -> SyncQueue:
+        """
+        Add a classification job for room to the (sync or async) session
+
+        Caller commits; call notify() after commit to wake a worker.
+        """
+        item = SyncQueue(
+            device_id=self.DEVICE_ID,
+            entity_type=self.ENTITY_TYPE,
+            entity_id=room.id,
+            action=self.ACTION,
+            payload={"use_ultrathink": use_ultrathink},
+            status='pending',
+            retry_count=0
+        )
+        db.add(item)
+        return item
+
+    def notify(self):
+        """Wake an idle worker (must be called from the event loop)"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def start(self):
+        """Requeue abandoned work and start the workers"""
+        if self.running or self.concurrency <= 0:
+            return
+
+        self._wakeup = asyncio.Event()
+        self._claim_lock = asyncio.Lock()
+
+        try:
+            requeued = await self._run_sync(self._requeue_interrupted)
+            if requeued:
+                logger.info(f"Requeued {requeued} interrupted classification jobs")
+        except Exception as e:
+            logger.warning(f"Could not recover classification queue: {e}")
+
+        self._tasks = [
+            asyncio.create_task(self._worker(worker_id))
+            for worker_id in range(self.concurrency)
+        ]
+        logger.info(f"Classification worker pool started ({self.concurrency} workers)")
+
+    async def stop(self):
+        """Cancel workers; in-flight items are requeued once their claim goes stale"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Classification worker pool stopped")
+
+    async def process_next(self) -> bool:
+        """Claim and process one queued item. Returns False if queue is empty."""
+        if self._claim_lock is None:
+            self._claim_lock = asyncio.Lock()
+
+        async with self._claim_lock:
+            claimed = await self._run_sync(self._claim_next)
+
+        if claimed is None:
+            return False
+
+        await self._process(*claimed)
+        return True
+
+    async def _worker(self, worker_id: int):
+        """Worker loop: drain queue, then sleep until notified or poll interval"""
+        while True:
+            try:
+                self._wakeup.clear()
+                if await self.process_next():
+                    continue
+
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Classification worker {worker_id} error: {e}", exc_info=True)
+                await asyncio.sleep(self.POLL_INTERVAL)
+
+    async def _process(self, queue_id, room_id, image_path: str, room_name: str, payload: dict):
+        """Classify one room, retrying transient AI failures with backoff"""
+        if self.ai_service is None:
+            from services.ai_vision import get_ai_vision_service
+            self.ai_service = get_ai_vision_service()
+        ai_service = self.ai_service
+        use_ultrathink = payload.get("use_ultrathink", True)
+
+        try:
+            image_data = await self._run_sync(_read_file, image_path)
+        except Exception as e:
+            logger.error(f"Cannot read image for room {room_id}: {e}")
+            await self._run_sync(self._mark_failed, queue_id, room_id, str(e), None)
+            return
+
+        classification = None
+        for attempt in range(self.MAX_RETRIES):
+            classification = await ai_service.classify_room_async(
+                image_data, room_name=room_name, use_ultrathink=use_ultrathink
+            )
+            if 'error' not in classification:
+                break
+
+            await self._run_sync(self._record_retry, queue_id, attempt + 1, classification['error'])
+            if attempt + 1 < self.MAX_RETRIES:
+                await asyncio.sleep(self.RETRY_BACKOFF * (2 ** attempt))
+
+        if 'error' in classification:
+            # Out of retries - price with the fallback classification like before
+            await self._run_sync(
+                self._mark_failed, queue_id, room_id, classification['error'], classification
+            )
+            return
+
+        await self._run_sync(self._apply_classification, queue_id, room_id, classification)
+
+    # Synchronous DB operations (run in the default executor)
+
+    def _requeue_interrupted(self) -> int:
+        cutoff = datetime.utcnow() - timedelta(seconds=self.CLAIM_TIMEOUT)
+        db = self.session_factory()
+        try:
+            items = db.query(SyncQueue).filter(
+                SyncQueue.action == self.ACTION,
+                SyncQueue.status == 'processing',
+                or_(SyncQueue.claimed_at.is_(None), SyncQueue.claimed_at < cutoff)
+            ).all()
+            for item in items:
+                item.status = 'pending'
+            db.commit()
+            return len(items)
+        finally:
+            db.close()
+
+    def _claim_next(self) -> Optional[Tuple]:
+        db = self.session_factory()
+        try:
+            item = db.query(SyncQueue).filter(
+                SyncQueue.action == self.ACTION,
+                SyncQueue.status == 'pending'
+            ).order_by(SyncQueue.created_at).with_for_update(skip_locked=True).first()
+
+            if item is None:
+                return None
+
+            room = db.query(Room).filter(Room.id == item.entity_id).first()
+            if room is None:
+                item.status = 'failed'
+                item.error_message = 'Room no longer exists'
+                item.processed_at = datetime.utcnow()
+                db.commit()
+                return None
+
+            item.status = 'processing'
+            item.claimed_at = datetime.utcnow()
+            room.status = 'processing'
+            db.commit()
+
+            return item.id, room.id, room.image_path, room.name, item.payload or {}
+        finally:
+            db.close()
+
+    def _record_retry(self, queue_id, retry_count: int, error: str):
+        db = self.session_factory()
+        try:
+            item = db.query(SyncQueue).filter(SyncQueue.id == queue_id).first()
+            if item:
+                item.retry_count = retry_count
+                item.error_message = error
+                item.claimed_at = datetime.utcnow()  # still being worked on
+                db.commit()
+        finally:
+            db.close()
+
+    def _apply_classification(self, queue_id, room_id, classification: dict, status: str = 'classified'):
+        db = self.session_factory()
+        try:
+            room = db.query(Room).filter(Room.id == room_id).first()
+            item = db.query(SyncQueue).filter(SyncQueue.id == queue_id).first()
+
+            if room is not None:
+                self.pricing_engine.refresh_rules(db)
+                room.ai_size_class = classification['size_class']
+                room.ai_workload_class = classification['workload_class']
+                room.ai_confidence = classification['confidence']
+                room.ai_reasoning = classification.get('reasoning')
+                room.ai_features = classification.get('features', {})
+                room.ai_estimated_cost = self.pricing_engine.calculate_room_cost(
+                    classification['size_class'],
+                    classification['workload_class']
+                )
+                room.processed_at = datetime.utcnow()
+                room.status = status
+
+                # Human overrides made while queued still win
+                if not room.human_size_class:
+                    room.final_size_class = classification['size_class']
+                if not room.human_workload_class:
+                    room.final_workload_class = classification['workload_class']
+
+                room.estimated_cost = self.pricing_engine.calculate_room_cost(
+                    room.final_size_class,
+                    room.final_workload_class
+                )
+                db.flush()
+
+                recompute_job_totals_by_id(db, room.job_id)
+
+            if item is not None:
+                item.status = 'completed' if status == 'classified' else 'failed'
+                item.processed_at = datetime.utcnow()
+
+            db.commit()
+        finally:
+            db.close()
+
+    def _mark_failed(self, queue_id, room_id, error: str, classification: Optional[dict]):
+        if classification is not None:
+            self._apply_classification(queue_id, room_id, classification, status='failed')
+            return
+
+        db = self.session_factory()
+        try:
+            room = db.query(Room).filter(Room.id == room_id).first()
+            item = db.query(SyncQueue).filter(SyncQueue.id == queue_id).first()
+            if room is not None:
+                room.status = 'failed'
+            if item is not None:
+                item.status = 'failed'
+                item.error_message = error
+                item.processed_at = datetime.utcnow()
+            db.commit()
+        finally:
+            db.close()
+
+    @staticmethod
+    async def _run_sync(func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+# Singleton instance
+_worker_pool = None
+
+def get_classification_worker_pool() -> ClassificationWorkerPool:
+    """Get classification worker pool singleton"""
+    global _worker_pool
+    if _worker_pool is None:
+        _worker_pool = ClassificationWorkerPool(
+            concurrency=int(os.getenv("AI_CLASSIFICATION_WORKERS", "2"))
+        )
+    return _worker_pool
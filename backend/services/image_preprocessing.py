@@ -0,0 +1,74 @@
+"""
+Image Preprocessing
+Downsizes phone photos to the vision model's input resolution
+before base64 encoding, so payloads and LLaVA input time stay small
+"""
+
+import io
+from typing import Tuple
+import logging
+
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# LLaVA 1.6 tiles images at 672px; anything larger is downscaled by the model anyway
+DEFAULT_MAX_SIDE = 672
+DEFAULT_JPEG_QUALITY = 85
+
+# EXIF orientation tag
+_ORIENTATION_TAG = 0x0112
+
+
+def preprocess_image(
+    image_data: bytes,
+    max_side: int = DEFAULT_MAX_SIDE,
+    quality: int = DEFAULT_JPEG_QUALITY
+) -> bytes:
+    """
+    Decode, EXIF-rotate, resize and re-encode an image as JPEG
+
+    Args:
+        image_data: Raw image bytes (JPEG/PNG/...)
+        max_side: Longest side of the output in pixels
+        quality: JPEG quality of the output
+
+    Returns:
+        JPEG bytes no larger than max_side on either side.
+        The original bytes are returned unchanged if the image can't be
+        decoded, or if it is already a correctly oriented JPEG that fits.
+    """
+    try:
+        image = Image.open(io.BytesIO(image_data))
+
+        orientation = image.getexif().get(_ORIENTATION_TAG, 1)
+        needs_resize = max(image.size) > max_side
+
+        if image.format == 'JPEG' and orientation == 1 and not needs_resize:
+            return image_data
+
+        if image.format == 'JPEG' and needs_resize:
+            # Let libjpeg decode at a reduced scale - much cheaper than a full decode
+            image.draft('RGB', _draft_size(image.size, max_side))
+
+        image = ImageOps.exif_transpose(image)
+
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+
+        output = io.BytesIO()
+        image.save(output, format='JPEG', quality=quality, optimize=True)
+        return output.getvalue()
+
+    except Exception as e:
+        logger.warning(f"Image preprocessing failed, using original bytes: {e}")
+        return image_data
+
+
+def _draft_size(size: Tuple[int, int], max_side: int) -> Tuple[int, int]:
+    """Smallest decode size whose longest side still covers max_side"""
+    width, height = size
+    scale = max_side / max(width, height)
+    return (max(1, int(width * scale)), max(1, int(height * scale)))
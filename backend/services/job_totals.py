@@ -0,0 +1,77 @@
+"""
+Job Totals
+Recomputes job ai_estimate / final_price from room costs in SQL
+One aggregate query per recompute, regardless of room count
+"""
+
+from decimal import Decimal
+from typing import Dict, Iterable, Tuple
+import logging
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from database.models import Job, Room
+
+logger = logging.getLogger(__name__)
+
+CENTS = Decimal('0.01')
+ZERO = Decimal('0.00')
+
+
+def aggregate_room_costs(db: Session, job_ids: Iterable) -> Dict:
+    """
+    Sum AI and final room costs per job with a single GROUP BY query
+
+    Rooms priced before ai_estimated_cost existed fall back to
+    estimated_cost for the AI total.
+
+    Returns:
+        {job_id: (ai_total, final_total)} - jobs without rooms are omitted
+    """
+    rows = db.query(
+        Room.job_id,
+        func.sum(func.coalesce(Room.ai_estimated_cost, Room.estimated_cost, 0)),
+        func.sum(func.coalesce(Room.estimated_cost, 0))
+    ).filter(
+        Room.job_id.in_(list(job_ids))
+    ).group_by(Room.job_id).all()
+
+    return {
+        job_id: (_to_cents(ai_total), _to_cents(final_total))
+        for job_id, ai_total, final_total in rows
+    }
+
+
+def recompute_job_totals(db: Session, job: Job) -> Tuple[Decimal, Decimal]:
+    """
+    Update job.ai_estimate and job.final_price from its rooms
+
+    - ai_estimate: sum of room AI costs
+    - final_price: sum of room final costs, unless a human adjusted
+      estimate has been set on the job
+
+    Caller commits.
+    """
+    ai_total, final_total = aggregate_room_costs(db, [job.id]).get(job.id, (ZERO, ZERO))
+
+    job.ai_estimate = ai_total
+
+    # If no human adjustment, update final_price
+    if not job.human_adjusted_estimate or job.human_adjusted_estimate == 0:
+        job.final_price = final_total
+
+    return ai_total, final_total
+
+
+def recompute_job_totals_by_id(db: Session, job_id) -> None:
+    """Load job by id and recompute its totals (no-op if missing)"""
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if job:
+        recompute_job_totals(db, job)
+
+
+def _to_cents(value) -> Decimal:
+    if value is None:
+        return ZERO
+    return Decimal(str(value)).quantize(CENTS)
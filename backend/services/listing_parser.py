@@ -0,0 +1,147 @@
+"""
+Listing Parser
+Parses scraped search and detail pages into plain tuples off the event loop
+HTML goes to a process pool; only small tuples come back
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional, Tuple, TypeVar
+import logging
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+logger = logging.getLogger(__name__)
+
+# Optional C parser backend (pip install lxml), several times faster than html.parser
+try:
+    import lxml  # noqa: F401
+
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+HTML_PARSER = "lxml" if LXML_AVAILABLE else "html.parser"
+
+T = TypeVar("T")
+
+# Page parsers: module-level functions so they can run in worker processes
+
+
+def parse_facebook_search(html: str) -> List[Tuple[str, str, str]]:
+    """Facebook Marketplace search page -> [(title, description, price)]"""
+    soup = BeautifulSoup(html, HTML_PARSER)
+
+    # Extract listings (this is simplified - would need more sophisticated parsing)
+    results = []
+    for listing in soup.find_all("div", class_="x78zum5")[:10]:
+        try:
+            title_elem = listing.find("span", class_="x1lliihq")
+            title = title_elem.text if title_elem else ""
+
+            desc_elem = listing.find("span", class_="x1yztbdb")
+            description = desc_elem.text if desc_elem else ""
+
+            price_elem = listing.find("span", class_="x193iq5w")
+            price = price_elem.text if price_elem else ""
+
+            if title and description:
+                results.append((title, description, price))
+        except Exception as e:
+            logger.warning(f"Error parsing Facebook listing: {e}")
+
+    return results
+
+
+def parse_craigslist_search(html: str) -> List[Tuple[str, str, str]]:
+    """Craigslist search page -> [(title, price, detail_url)]"""
+    # Only build the result items, not the whole page
+    only_results = SoupStrainer("li", class_="cl-static-search-result")
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=only_results)
+
+    results = []
+    for listing in soup.find_all("li", class_="cl-static-search-result")[:15]:
+        try:
+            title_elem = listing.find("a", class_="title")
+            title = title_elem.text if title_elem else ""
+
+            price_elem = listing.find("span", class_="price")
+            price = price_elem.text if price_elem else ""
+
+            link = listing.find("a")
+            detail_url = link["href"] if link else ""
+
+            if title:
+                results.append((title, price, detail_url))
+        except Exception as e:
+            logger.warning(f"Error parsing Craigslist listing: {e}")
+
+    return results
+
+
+def parse_craigslist_detail(html: str) -> str:
+    """Craigslist posting page -> description text ("" if missing)"""
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=SoupStrainer("section", id="postingbody"))
+    desc_elem = soup.find("section", id="postingbody")
+    return desc_elem.text if desc_elem else ""
+
+
+class ListingParser:
+    """
+    Runs page parsers in a process pool
+
+    BeautifulSoup is pure-Python and CPU-bound; run inline it blocks the
+    event loop (and the API, when a campaign is started from it). In the
+    pool, parsing uses other cores while fetches continue. max_workers=0
+    parses inline, for tests and single-core hosts.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        if max_workers is None:
+            max_workers = min(4, os.cpu_count() or 1)
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that runs an event loop and threads isn't safe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info(
+                f"Listing parser pool started ({self.max_workers} workers, {HTML_PARSER})"
+            )
+        return self._executor
+
+    async def parse(self, parser: Callable[[str], T], html: str) -> T:
+        """Run parser(html) in the pool (or inline with max_workers=0)"""
+        if self.max_workers <= 0:
+            return parser(html)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), parser, html)
+
+    def shutdown(self):
+        """Stop the worker processes (restarted on next parse)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+# Singleton instance
+_listing_parser = None
+
+def get_listing_parser() -> ListingParser:
+    """
+    Get shared listing parser singleton (worker processes outlive each scrape)
+
+    SCRAPE_PARSE_WORKERS sets the pool size; 0 parses inline.
+    """
+    global _listing_parser
+    if _listing_parser is None:
+        workers = os.getenv("SCRAPE_PARSE_WORKERS")
+        _listing_parser = ListingParser(int(workers) if workers is not None else None)
+    return _listing_parser
@@ -32,8 +32,14 @@ class MichiganAutonomousSystem:
     def __init__(self):
         self.db_conn = create_michigan_database()
         self.is_running = False
+
+        # Long-lived so templates, the outbox dispatcher and SMTP connections
+        # are set up once and shared by outreach campaigns and quote emails
+        self.outreach = MichiganOutreachSystem()
+        self.deal_closer = MichiganDealCloser(self.db_conn, outreach=self.outreach)
         self.stats = {
             "leads_found": 0,
+            "leads_seen": 0,  # re-scraped listings already in the database
             "leads_contacted": 0,
             "quotes_sent": 0,
             "deals_closed": 0,
@@ -68,11 +74,13 @@ class MichiganAutonomousSystem:
 
         try:
             async with MichiganLeadGenerator() as generator:
-                all_leads, top_leads = await generator.run_lead_generation()
+                all_leads, top_leads, saved = await generator.run_lead_generation()
 
-                self.stats["leads_found"] += len(all_leads)
+                self.stats["leads_found"] += saved.new
+                self.stats["leads_seen"] += saved.seen
                 logger.info(
-                    f"✅ Found {len(all_leads)} total leads, {len(top_leads)} high-urgency leads"
+                    f"✅ Found {len(all_leads)} total leads ({saved.new} new, "
+                    f"{saved.seen} already seen), {len(top_leads)} high-urgency leads"
                 )
 
                 return len(all_leads) > 0
@@ -90,8 +98,7 @@ class MichiganAutonomousSystem:
         logger.info("📧 Starting Michigan outreach campaign...")
 
         try:
-            outreach_system = MichiganOutreachSystem()
-            contacts_made = await outreach_system.run_outreach_campaign()
+            contacts_made = await self.outreach.run_outreach_campaign()
 
             self.stats["leads_contacted"] += contacts_made
             logger.info(f"✅ Contacted {contacts_made} leads")
@@ -107,8 +114,7 @@ class MichiganAutonomousSystem:
         logger.info("💰 Starting Michigan deal closing...")
 
         try:
-            deal_closer = MichiganDealCloser(self.db_conn)
-            quotes_generated = await deal_closer.run_automated_quoting()
+            quotes_generated = await self.deal_closer.run_automated_quoting()
 
             self.stats["quotes_sent"] += quotes_generated
             logger.info(f"✅ Generated {quotes_generated} quotes")
@@ -168,7 +174,7 @@ Date: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
 System Status: {"🟢 ACTIVE" if self.is_running else "🔴 STOPPED"}
 
 📈 TODAY'S PERFORMANCE:
-• Leads Found: {self.stats["leads_found"]}
+• Leads Found: {self.stats["leads_found"]} new ({self.stats["leads_seen"]} already seen)
 • Leads Contacted: {self.stats["leads_contacted"]}
 • Quotes Sent: {self.stats["quotes_sent"]}
 • Deals Closed: {self.stats["deals_closed"]}
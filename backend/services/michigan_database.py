@@ -4,11 +4,164 @@ Creates tables for leads, quotes, and customer interactions
 """
 
 import sqlite3
+import hashlib
 import logging
+import re
 from datetime import datetime
+from typing import Optional
+from urllib.parse import urlsplit
 
 logger = logging.getLogger(__name__)
 
+_WHITESPACE = re.compile(r"\s+")
+_CRAIGSLIST_ID = re.compile(r"/(\d+)\.html$")
+
+
+def canonical_url(url: str) -> str:
+    """Listing URL without scheme, query, fragment or trailing slash"""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return host + parts.path.rstrip("/")
+
+
+def craigslist_listing_id(url: Optional[str]) -> Optional[str]:
+    """Posting id from a Craigslist detail URL (.../d/some-title/7712345678.html)"""
+    if not url:
+        return None
+    match = _CRAIGSLIST_ID.search(urlsplit(url).path)
+    return match.group(1) if match else None
+
+
+def lead_fingerprint(
+    source: str, title: str, description: Optional[str], url: Optional[str] = None
+) -> str:
+    """
+    Stable identity of a scraped listing
+
+    Uses the canonical listing URL when there is one, otherwise the
+    whitespace/case-normalized title and description.
+    """
+    if url:
+        key = f"{source}|url|{canonical_url(url)}"
+    else:
+        text = _WHITESPACE.sub(" ", f"{title}\n{description or ''}").strip().lower()
+        key = f"{source}|text|{text}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def ensure_lead_fingerprints(conn: sqlite3.Connection):
+    """
+    Add the fingerprint column and unique index to an existing leads table
+
+    Older rows are backfilled from title/description; repeats of an
+    already-fingerprinted listing keep a NULL fingerprint (the earliest
+    row wins) so quotes that reference them stay valid.
+    """
+    cursor = conn.cursor()
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(leads)")}
+
+    if "fingerprint" not in columns:
+        cursor.execute("ALTER TABLE leads ADD COLUMN fingerprint TEXT")
+
+    rows = cursor.execute(
+        "SELECT id, source, title, description FROM leads "
+        "WHERE fingerprint IS NULL ORDER BY id"
+    ).fetchall()
+    if rows:
+        taken = {
+            row[0]
+            for row in cursor.execute(
+                "SELECT fingerprint FROM leads WHERE fingerprint IS NOT NULL"
+            )
+        }
+        updates = []
+        for lead_id, source, title, description in rows:
+            fingerprint = lead_fingerprint(source or "", title or "", description)
+            if fingerprint not in taken:
+                taken.add(fingerprint)
+                updates.append((fingerprint, lead_id))
+        cursor.executemany("UPDATE leads SET fingerprint = ? WHERE id = ?", updates)
+        logger.info(
+            f"Fingerprinted {len(updates)} existing leads "
+            f"({len(rows) - len(updates)} duplicates left unfingerprinted)"
+        )
+
+    cursor.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_leads_fingerprint ON leads(fingerprint)"
+    )
+    conn.commit()
+
+
+def ensure_listing_ids(conn: sqlite3.Connection):
+    """
+    Add the listing_id column and its index to an existing leads table
+
+    listing_id is the source's own id for the posting; the scraper uses it
+    to skip detail pages of listings it has already stored.
+    """
+    cursor = conn.cursor()
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(leads)")}
+
+    if "listing_id" not in columns:
+        cursor.execute("ALTER TABLE leads ADD COLUMN listing_id TEXT")
+        rows = cursor.execute(
+            "SELECT id, url FROM leads WHERE source = 'craigslist'"
+        ).fetchall()
+        cursor.executemany(
+            "UPDATE leads SET listing_id = ? WHERE id = ?",
+            [
+                (craigslist_listing_id(url), lead_id)
+                for lead_id, url in rows
+                if craigslist_listing_id(url)
+            ],
+        )
+
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_leads_listing ON leads(source, listing_id)"
+    )
+    conn.commit()
+
+
+def ensure_outbox_table(conn: sqlite3.Connection):
+    """
+    Create the outreach outbox (rendered messages waiting for delivery)
+
+    One row per lead; status goes pending -> sending -> sent, or back to
+    pending with a later next_attempt_at until max attempts, then failed.
+    claimed_at records when a dispatcher moved the row to 'sending'.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            lead_id INTEGER NOT NULL UNIQUE,
+            channel TEXT NOT NULL,  -- 'email', 'sms'
+            recipient TEXT NOT NULL,
+            subject TEXT,
+            body TEXT NOT NULL,
+            template_name TEXT NOT NULL,
+            priority REAL DEFAULT 0.0,  -- higher is sent first
+            status TEXT DEFAULT 'pending',  -- 'pending', 'sending', 'sent', 'failed'
+            attempts INTEGER DEFAULT 0,
+            next_attempt_at REAL DEFAULT 0,  -- unix time
+            claimed_at REAL,  -- unix time of the last claim
+            last_error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            sent_at TEXT,
+            FOREIGN KEY (lead_id) REFERENCES leads (id)
+        )
+    """)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(outbox)")}
+    if "claimed_at" not in columns:
+        conn.execute("ALTER TABLE outbox ADD COLUMN claimed_at REAL")
+
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_outbox_due "
+        "ON outbox(status, next_attempt_at, priority DESC)"
+    )
+    conn.commit()
+
 
 def create_michigan_database():
     """Create the complete Michigan lead generation database"""
@@ -39,6 +192,8 @@ def create_michigan_database():
                 contact_date TEXT,
                 quote_sent_date TEXT,
                 template_used TEXT,
+                fingerprint TEXT,  -- lead_fingerprint(); unique, see ensure_lead_fingerprints
+                listing_id TEXT,  -- source's posting id, see ensure_listing_ids
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
@@ -136,6 +291,9 @@ def create_michigan_database():
             "CREATE INDEX IF NOT EXISTS idx_leads_processed ON leads(processed, contacted)"
         )
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_leads_quoted ON leads(quoted)")
+        ensure_lead_fingerprints(conn)
+        ensure_listing_ids(conn)
+        ensure_outbox_table(conn)
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_quotes_status ON quotes(status)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)")
         cursor.execute(
@@ -201,13 +359,15 @@ def insert_sample_data(cursor, conn):
         },
     ]
 
-    for lead in sample_leads:
-        cursor.execute(
-            """
-            INSERT INTO leads (source, title, description, price, location, 
-                              lead_type, urgency_score, estimated_value)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """,
+    # Fingerprinted, so re-running the setup doesn't duplicate the samples
+    cursor.executemany(
+        """
+        INSERT INTO leads (source, title, description, price, location, 
+                          lead_type, urgency_score, estimated_value, fingerprint)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(fingerprint) DO NOTHING
+    """,
+        [
             (
                 lead["source"],
                 lead["title"],
@@ -217,11 +377,15 @@ def insert_sample_data(cursor, conn):
                 lead["lead_type"],
                 lead["urgency_score"],
                 lead["estimated_value"],
-            ),
-        )
+                lead_fingerprint(lead["source"], lead["title"], lead["description"]),
+            )
+            for lead in sample_leads
+        ],
+    )
+    inserted = cursor.rowcount
 
     conn.commit()
-    logger.info(f"Inserted {len(sample_leads)} sample leads")
+    logger.info(f"Inserted {inserted} sample leads")
 
 
 if __name__ == "__main__":
@@ -7,18 +7,34 @@ import asyncio
 import aiohttp
 import json
 import logging
+import os
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
+from typing import TYPE_CHECKING, List, Dict, Optional, Tuple
 from dataclasses import dataclass
 import sqlite3
 import uuid
 import re
 from decimal import Decimal
 
+from services.keyword_matcher import KeywordMatcher
+from services.rate_limiter import RateLimiter, get_rate_limiter
+
+if TYPE_CHECKING:
+    from services.michigan_outreach import MichiganOutreachSystem
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_INSERT_QUOTE = """
+    INSERT INTO quotes (
+        quote_id, lead_id, customer_name, property_address,
+        estimated_cost, discount_amount, final_price,
+        estimated_duration, quote_expires, terms,
+        created_at, status, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
 
 @dataclass
 class MichiganQuote:
@@ -40,8 +56,21 @@ class MichiganQuote:
 class MichiganDealCloser:
     """Automated deal closing system for Michigan leads"""
 
-    def __init__(self, db_connection):
+    MAX_QUOTES_PER_RUN = int(os.getenv("QUOTING_MAX_LEADS", "15"))
+    SEND_CONCURRENCY = 8  # quote emails in flight; pacing is the rate limiter's job
+    QUOTE_CLAIM_TIMEOUT = 900  # seconds before a 'sending' quote counts as abandoned
+
+    def __init__(
+        self,
+        db_connection,
+        rate_limiter: Optional[RateLimiter] = None,
+        outreach: Optional["MichiganOutreachSystem"] = None,
+    ):
         self.db_conn = db_connection
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        # Quote emails go out through the outreach system's SMTP pool;
+        # pass the long-lived one in rather than building one per quote
+        self._outreach = outreach
         self.michigan_pricing = {
             "detroit": {
                 "base_rate": Decimal("150.00"),
@@ -81,6 +110,17 @@ class MichiganDealCloser:
             "weekend": Decimal("0.05"),  # 5% surcharge for weekend
         }
 
+        # Lead text keywords for discounts, surcharges and terms
+        self.lead_matcher = KeywordMatcher({
+            "veteran": ["military", "veteran", "army", "navy", "air force"],
+            "senior": ["senior", "elderly", "retirement"],
+            "student": ["student", "college", "university"],
+            "first_responder": ["police", "fire", "emt", "paramedic"],
+            "same_day": ["urgent", "asap"],
+            "eviction_terms": ["eviction", "foreclosure", "court"],
+            "estate_terms": ["estate", "inheritance", "deceased", "passed"],
+        })
+
         self.michigan_terms = {
             "standard_terms": """
 **Michigan Cleanout Service Agreement**
@@ -149,28 +189,25 @@ class MichiganDealCloser:
                 adjusted_cost * self.michigan_discounts["michigan_resident"]
             )
 
-        # Check for other discounts from lead text
-        lead_text = (
-            f"{lead_data.get('title', '')} {lead_data.get('description', '')}".lower()
+        # Check for other discounts from lead text (one pass over the text)
+        hits = self.lead_matcher.find(
+            str(lead_data.get("title", "")), str(lead_data.get("description", ""))
         )
 
         additional_discounts = Decimal("0.00")
-        if any(
-            word in lead_text
-            for word in ["military", "veteran", "army", "navy", "air force"]
-        ):
+        if hits.any("veteran"):
             additional_discounts += adjusted_cost * self.michigan_discounts["veteran"]
-        elif any(word in lead_text for word in ["senior", "elderly", "retirement"]):
+        elif hits.any("senior"):
             additional_discounts += adjusted_cost * self.michigan_discounts["senior"]
-        elif any(word in lead_text for word in ["student", "college", "university"]):
+        elif hits.any("student"):
             additional_discounts += adjusted_cost * self.michigan_discounts["student"]
-        elif any(word in lead_text for word in ["police", "fire", "emt", "paramedic"]):
+        elif hits.any("first_responder"):
             additional_discounts += (
                 adjusted_cost * self.michigan_discounts["first_responder"]
             )
 
         # Same day/weekend surcharges
-        if "urgent" in lead_text or "asap" in lead_text:
+        if hits.any("same_day"):
             additional_discounts -= adjusted_cost * abs(
                 self.michigan_discounts["same_day"]
             )
@@ -187,12 +224,9 @@ class MichiganDealCloser:
 
         # Determine terms
         terms = self.michigan_terms["standard_terms"]
-        if any(word in lead_text for word in ["eviction", "foreclosure", "court"]):
+        if hits.any("eviction_terms"):
             terms = self.michigan_terms["eviction_terms"]
-        elif any(
-            word in lead_text
-            for word in ["estate", "inheritance", "deceased", "passed"]
-        ):
+        elif hits.any("estate_terms"):
             terms = self.michigan_terms["estate_terms"]
 
         return MichiganQuote(
@@ -287,8 +321,14 @@ class MichiganDealCloser:
             },
         }
 
-    def get_leads_for_quoting(self, limit: int = 15) -> List[Dict]:
-        """Get leads that are ready for automated quoting"""
+    def get_leads_for_quoting(self, limit: int = MAX_QUOTES_PER_RUN) -> List[Dict]:
+        """
+        Get leads that are ready for automated quoting
+
+        Quotes go out by email, so leads without one (e.g. contacted by SMS)
+        are filtered in SQL; filtering after the LIMIT would let them fill
+        every batch and starve the emailable leads behind them.
+        """
         cursor = self.db_conn.cursor()
 
         cursor.execute(
@@ -298,6 +338,8 @@ class MichiganDealCloser:
                AND quoted = FALSE 
                AND urgency_score >= 0.3
                AND estimated_value >= 100
+               AND json_valid(contact_info)
+               AND COALESCE(json_extract(contact_info, '$.email'), '') != ''
             ORDER BY urgency_score DESC, estimated_value DESC
             LIMIT ?
         """,
@@ -313,19 +355,21 @@ class MichiganDealCloser:
 
         return leads
 
-    async def send_quote_via_email(
-        self, lead: Dict, quote: MichiganQuote, quote_doc: Dict
-    ) -> bool:
-        """Send quote via email (integrates with outreach system)"""
-        try:
+    @property
+    def outreach(self) -> "MichiganOutreachSystem":
+        """Outreach system used to deliver quotes (created on first use if not injected)"""
+        if self._outreach is None:
             # Import here to avoid circular imports
             from services.michigan_outreach import MichiganOutreachSystem
 
-            outreach = MichiganOutreachSystem()
+            self._outreach = MichiganOutreachSystem(rate_limiter=self.rate_limiter)
+        return self._outreach
 
-            subject = f"CleanoutPro Quote {quote.quote_id} - {quote.property_address}"
+    def render_quote_email(self, quote: MichiganQuote, quote_doc: Dict) -> Tuple[str, str]:
+        """Subject and body of the quote email"""
+        subject = f"CleanoutPro Quote {quote.quote_id} - {quote.property_address}"
 
-            body = f"""
+        body = f"""
 Dear {quote.customer_name},
 
 Thank you for your interest in CleanoutPro! Here is your personalized Michigan quote:
@@ -360,84 +404,242 @@ The CleanoutPro Team
 
 ---
 Michigan Licensed & Insured | License #{quote_doc["contact_info"]["license"]}
-            """
+        """
+
+        return subject, body
 
-            # Send email (would need to implement email sending)
-            logger.info(f"Quote email prepared for {lead['id']}: {quote.quote_id}")
+    async def send_quote_via_email(
+        self, lead: Dict, quote: MichiganQuote, quote_doc: Dict, to_email: Optional[str] = None
+    ) -> bool:
+        """Send quote via email (to_email, else the lead's contact email)"""
+        try:
+            if not to_email:
+                contact_info = json.loads(lead.get("contact_info") or "{}")
+                to_email = contact_info.get("email")
+            if not to_email:
+                logger.warning(f"No email for lead {lead['id']}, quote {quote.quote_id} not sent")
+                return False
+
+            subject, body = self.render_quote_email(quote, quote_doc)
+
+            # Rate limited and sent on the shared SMTP pool
+            if not await self.outreach.send_email(to_email, subject, body):
+                return False
+
+            logger.info(f"Quote email sent for {lead['id']}: {quote.quote_id}")
             return True
 
         except Exception as e:
             logger.error(f"Failed to send quote email: {e}")
             return False
 
-    def save_quote_to_database(self, lead: Dict, quote: MichiganQuote, quote_doc: Dict):
-        """Save quote to database for tracking"""
-        cursor = self.db_conn.cursor()
-
-        cursor.execute(
-            """
-            INSERT INTO quotes (
-                quote_id, lead_id, customer_name, property_address, 
-                estimated_cost, discount_amount, final_price, 
-                estimated_duration, quote_expires, terms,
-                created_at, status
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-            (
-                quote.quote_id,
-                lead["id"],
-                quote.customer_name,
-                quote.property_address,
-                float(quote.estimated_cost),
-                float(quote.michigan_discount),
-                float(quote.final_price),
-                quote.estimated_duration,
-                quote.quote_expires.isoformat(),
-                quote.terms_conditions,
-                datetime.now().isoformat(),
-                "sent",
-            ),
+    @staticmethod
+    def _quote_row(lead: Dict, quote: MichiganQuote, created_at: str, status: str = "pending") -> Tuple:
+        return (
+            quote.quote_id,
+            lead["id"],
+            quote.customer_name,
+            quote.property_address,
+            float(quote.estimated_cost),
+            float(quote.michigan_discount),
+            float(quote.final_price),
+            quote.estimated_duration,
+            quote.quote_expires.isoformat(),
+            quote.terms_conditions,
+            created_at,
+            status,
+            created_at,  # updated_at, in the same format the claim timeout compares
         )
 
-        self.db_conn.commit()
-
-    async def run_automated_quoting(self):
-        """Main automated quoting process"""
-        logger.info("Starting Michigan automated quoting system...")
+    def save_quote_to_database(
+        self, lead: Dict, quote: MichiganQuote, quote_doc: Dict, status: str = "pending"
+    ):
+        """
+        Save quote to database for tracking
+
+        'pending' quotes are emailed by the next deliver_pending_quotes();
+        save as 'sending' when the caller sends it itself via deliver_quote().
+        """
+        with self.db_conn:
+            self.db_conn.execute(
+                _INSERT_QUOTE, self._quote_row(lead, quote, datetime.now().isoformat(), status)
+            )
 
-        leads = self.get_leads_for_quoting(15)
-        logger.info(f"Found {len(leads)} leads for quoting")
+    def save_quotes(self, quoted: List[Tuple[Dict, MichiganQuote]]) -> int:
+        """
+        Insert quotes as 'pending' and mark their leads quoted in a single transaction
 
-        quotes_generated = 0
+        Nothing is emailed here; deliver_pending_quotes() sends them.
+        """
+        now = datetime.now().isoformat()
+        with self.db_conn:
+            self.db_conn.executemany(
+                _INSERT_QUOTE, [self._quote_row(lead, quote, now) for lead, quote in quoted]
+            )
+            self.db_conn.executemany(
+                "UPDATE leads SET quoted = TRUE WHERE id = ?",
+                [(lead["id"],) for lead, _ in quoted],
+            )
+        return len(quoted)
 
+    def price_leads(self, leads: List[Dict]) -> List[Tuple[Dict, MichiganQuote, Dict]]:
+        """Quote and quote document for each lead, computed in memory"""
+        batch = []
         for lead in leads:
             try:
-                # Calculate Michigan-specific quote
                 quote = self.calculate_michigan_pricing(lead)
-                quote_doc = self.generate_quote_document(quote)
+                batch.append((lead, quote, self.generate_quote_document(quote)))
+            except Exception as e:
+                logger.error(f"Error generating quote for lead {lead['id']}: {e}")
+        return batch
+
+    def claim_pending_quotes(self) -> List[Tuple[Dict, MichiganQuote, Dict]]:
+        """
+        Mark pending quotes as 'sending' and return them ready to email
+
+        Quotes left in 'sending' longer than QUOTE_CLAIM_TIMEOUT (a crashed
+        delivery) are claimed again; pending quotes past their expiry are
+        marked 'expired' rather than sent late.
+        """
+        now = datetime.now()
+        now_iso = now.isoformat()
+        stale = (now - timedelta(seconds=self.QUOTE_CLAIM_TIMEOUT)).isoformat()
+
+        with self.db_conn:
+            self.db_conn.execute(
+                "UPDATE quotes SET status = 'pending' WHERE status = 'sending' AND updated_at < ?",
+                (stale,),
+            )
+            self.db_conn.execute(
+                "UPDATE quotes SET status = 'expired', updated_at = ? "
+                "WHERE status = 'pending' AND quote_expires < ?",
+                (now_iso, now_iso),
+            )
+            rows = self.db_conn.execute(
+                """
+                SELECT q.quote_id, q.customer_name, q.property_address, q.estimated_cost,
+                       q.discount_amount, q.final_price, q.estimated_duration,
+                       q.quote_expires, q.terms, l.id, l.source, l.location, l.contact_info
+                FROM quotes q JOIN leads l ON l.id = q.lead_id
+                WHERE q.status = 'pending'
+                ORDER BY q.id
+            """
+            ).fetchall()
+            self.db_conn.executemany(
+                "UPDATE quotes SET status = 'sending', updated_at = ? WHERE quote_id = ?",
+                [(now_iso, row[0]) for row in rows],
+            )
 
-                # Send quote
-                if await self.send_quote_via_email(lead, quote, quote_doc):
-                    self.save_quote_to_database(lead, quote, quote_doc)
+        batch = []
+        for (quote_id, customer_name, property_address, estimated_cost, discount, final_price,
+             duration, expires, terms, lead_id, source, location, contact_info) in rows:
+            quote = MichiganQuote(
+                quote_id=quote_id,
+                customer_name=customer_name,
+                lead_source=source or "online",
+                property_address=property_address,
+                estimated_cost=Decimal(str(estimated_cost)),
+                michigan_discount=Decimal(str(discount)),
+                final_price=Decimal(str(final_price)),
+                estimated_duration=duration,
+                available_slots=self.generate_available_slots(location or "Detroit"),
+                quote_expires=datetime.fromisoformat(expires),
+                terms_conditions=terms,
+            )
+            lead = {"id": lead_id, "contact_info": contact_info}
+            batch.append((lead, quote, self.generate_quote_document(quote)))
+        return batch
 
-                    # Mark lead as quoted
-                    cursor = self.db_conn.cursor()
-                    cursor.execute(
-                        "UPDATE leads SET quoted = TRUE, quote_sent_date = ? WHERE id = ?",
-                        (datetime.now().isoformat(), lead["id"]),
-                    )
-                    self.db_conn.commit()
+    async def deliver_quotes(self, batch: List[Tuple[Dict, MichiganQuote, Dict]]) -> List[bool]:
+        """Send quote emails concurrently; returns success per quote"""
+        semaphore = asyncio.Semaphore(self.SEND_CONCURRENCY)
 
-                    quotes_generated += 1
-                    logger.info(f"Quote sent for lead {lead['id']}: {quote.quote_id}")
+        async def bounded(lead, quote, quote_doc):
+            async with semaphore:
+                return await self.send_quote_via_email(lead, quote, quote_doc)
 
-                # Rate limiting
-                await asyncio.sleep(2)
+        return await asyncio.gather(*(bounded(*item) for item in batch))
 
-            except Exception as e:
-                logger.error(f"Error generating quote for lead {lead['id']}: {e}")
+    async def deliver_pending_quotes(self) -> int:
+        """
+        Email every pending quote; returns the number sent
+
+        Delivered quotes flip to 'sent' (and their leads get quote_sent_date)
+        in one transaction; failed ones go back to 'pending' for the next run.
+        """
+        batch = self.claim_pending_quotes()
+        if not batch:
+            return 0
+
+        delivered = await self.deliver_quotes(batch)
 
-        logger.info(f"Automated quoting complete. Generated {quotes_generated} quotes")
+        sent = [(lead, quote) for (lead, quote, _), ok in zip(batch, delivered) if ok]
+        failed = [quote for (_, quote, _), ok in zip(batch, delivered) if not ok]
+        self._record_deliveries(sent, failed)
+
+        if failed:
+            logger.warning(f"{len(failed)} quote emails failed, retrying next run")
+        return len(sent)
+
+    async def deliver_quote(
+        self, lead: Dict, quote: MichiganQuote, quote_doc: Dict, to_email: Optional[str] = None
+    ) -> bool:
+        """
+        Email one quote saved as 'sending' and record the outcome
+
+        Like deliver_pending_quotes: 'sent' on success, otherwise back to
+        'pending' so the next run retries it.
+        """
+        ok = await self.send_quote_via_email(lead, quote, quote_doc, to_email)
+        if ok:
+            self._record_deliveries([(lead, quote)], [])
+        else:
+            self._record_deliveries([], [quote])
+            logger.warning(f"Quote {quote.quote_id} email failed, retrying next run")
+        return ok
+
+    def _record_deliveries(
+        self, sent: List[Tuple[Dict, MichiganQuote]], failed: List[MichiganQuote]
+    ):
+        """Flip sent quotes to 'sent' (stamping their leads) and failed ones to 'pending'"""
+        now = datetime.now().isoformat()
+        with self.db_conn:
+            self.db_conn.executemany(
+                "UPDATE quotes SET status = 'sent', updated_at = ? WHERE quote_id = ?",
+                [(now, quote.quote_id) for _, quote in sent],
+            )
+            self.db_conn.executemany(
+                "UPDATE leads SET quote_sent_date = ? WHERE id = ?",
+                [(now, lead["id"]) for lead, _ in sent],
+            )
+            self.db_conn.executemany(
+                "UPDATE quotes SET status = 'pending', updated_at = ? WHERE quote_id = ?",
+                [(now, quote.quote_id) for quote in failed],
+            )
+
+    async def run_automated_quoting(self, limit: int = MAX_QUOTES_PER_RUN):
+        """
+        Main automated quoting process
+
+        Prices every lead in memory and saves the quotes as 'pending' with
+        their leads marked quoted in one transaction, before anything is
+        emailed. Pending quotes (this run's and any earlier undelivered
+        ones) are then sent and flipped to 'sent', so a crash or failed
+        send never loses a quote or emails one twice.
+        """
+        logger.info("Starting Michigan automated quoting system...")
+
+        leads = self.get_leads_for_quoting(limit)
+        logger.info(f"Found {len(leads)} leads with an email for quoting")
+
+        batch = self.price_leads(leads)
+        quotes_generated = self.save_quotes([(lead, quote) for lead, quote, _ in batch])
+
+        quotes_sent = await self.deliver_pending_quotes()
+
+        logger.info(
+            f"Automated quoting complete. Generated {quotes_generated} quotes, sent {quotes_sent}"
+        )
         return quotes_generated
 
 
@@ -8,15 +8,31 @@ import aiohttp
 import json
 import logging
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 from dataclasses import dataclass
 import re
-from bs4 import BeautifulSoup
 import sqlite3
 from urllib.parse import urljoin, urlparse
 import time
 import random
 
+from services.keyword_matcher import KeywordHits, KeywordMatcher
+from services.michigan_database import (
+    craigslist_listing_id,
+    ensure_lead_fingerprints,
+    ensure_listing_ids,
+    lead_fingerprint,
+)
+from services.listing_parser import (
+    ListingParser,
+    get_listing_parser,
+    parse_craigslist_detail,
+    parse_craigslist_search,
+    parse_facebook_search,
+)
+from services.page_cache import PageCache
+from services.rate_limiter import RateLimiter, get_rate_limiter
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -37,12 +53,33 @@ class MichiganLead:
     lead_type: str  # 'junk_removal', 'cleanout', 'moving', 'estate'
     urgency_score: float  # 0-1 based on keywords
     estimated_value: float  # estimated job value
+    fingerprint: str = ""  # lead_fingerprint(); identifies re-scraped listings
+    listing_id: Optional[str] = None  # source's own posting id, when known
+
+
+@dataclass
+class LeadSaveResult:
+    """Outcome of saving one batch of scraped leads"""
+
+    new: int  # inserted
+    seen: int  # already in the database (or repeated within the batch)
 
 
 class MichiganLeadGenerator:
     """Autonomous Michigan client acquisition system"""
 
-    def __init__(self):
+    # Scrape concurrency: total in-flight requests, and per host
+    MAX_CONCURRENT_REQUESTS = 10
+    MAX_REQUESTS_PER_HOST = 2
+
+    def __init__(
+        self,
+        max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS,
+        max_requests_per_host: int = MAX_REQUESTS_PER_HOST,
+        rate_limiter: Optional[RateLimiter] = None,
+        parser: Optional[ListingParser] = None,
+        url_map: Optional[Callable[[str], str]] = None,
+    ):
         self.cities = [
             "detroit",
             "dearborn",
@@ -77,6 +114,8 @@ class MichiganLeadGenerator:
             "westland",
         ]
 
+        self.craigslist_cities = ["detroit", "annarbor"]
+
         self.keywords = {
             "high_urgency": [
                 "urgent",
@@ -134,8 +173,33 @@ class MichiganLeadGenerator:
             ],
         }
 
+        # Job value indicators (checked by estimate_job_value)
+        self.value_keywords = {
+            "value_whole_home": ["house", "home", "entire", "whole"],
+            "value_small_unit": ["apartment", "condo", "studio"],
+            "value_storage": ["basement", "garage", "shed"],
+            "value_estate": ["estate", "inheritance"],
+            "value_furniture": ["furniture"],
+            "value_appliances": ["appliances"],
+            "value_debris": ["construction", "debris"],
+        }
+
+        # One matcher for every keyword list - each lead is scanned once
+        self.matcher = KeywordMatcher({**self.keywords, **self.value_keywords})
+
+        self.max_requests_per_host = max_requests_per_host
+        self._request_limit = asyncio.Semaphore(max_concurrent_requests)
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.parser = parser or get_listing_parser()
+        # Where requests actually go (e.g. benchmarks/scrape_replay.py ReplayServer.url_for);
+        # limits, caching and lead URLs still use the real site URL
+        self.url_map = url_map
+
         self.session = None
         self.db_conn = self.init_database()
+        self.page_cache = PageCache(self.db_conn)
+        self.skipped_known_listings = 0
 
     def init_database(self):
         """Initialize SQLite database for leads"""
@@ -158,6 +222,8 @@ class MichiganLeadGenerator:
                 estimated_value REAL,
                 processed BOOLEAN DEFAULT FALSE,
                 contacted BOOLEAN DEFAULT FALSE,
+                fingerprint TEXT,
+                listing_id TEXT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
@@ -171,6 +237,8 @@ class MichiganLeadGenerator:
         """)
 
         conn.commit()
+        ensure_lead_fingerprints(conn)
+        ensure_listing_ids(conn)
         return conn
 
     async def __aenter__(self):
@@ -190,58 +258,61 @@ class MichiganLeadGenerator:
         if self.db_conn:
             self.db_conn.close()
 
-    def calculate_urgency_score(self, title: str, description: str) -> float:
-        """Calculate urgency score based on keyword analysis"""
-        text = (title + " " + description).lower()
-        score = 0.0
+    def match_keywords(self, title: str, description: str) -> KeywordHits:
+        """Find all scoring keywords in a listing with one pass over its text"""
+        return self.matcher.find(title, description)
 
-        # High urgency keywords (0.4 points each)
-        for keyword in self.keywords["high_urgency"]:
-            if keyword in text:
-                score += 0.4
+    def calculate_urgency_score(
+        self, title: str, description: str, hits: Optional[KeywordHits] = None
+    ) -> float:
+        """Calculate urgency score based on keyword analysis"""
+        hits = hits or self.match_keywords(title, description)
 
-        # Medium urgency keywords (0.2 points each)
-        for keyword in self.keywords["medium_urgency"]:
-            if keyword in text:
-                score += 0.2
+        # High urgency keywords (0.4 points each), medium (0.2 points each)
+        score = 0.4 * hits.count("high_urgency") + 0.2 * hits.count("medium_urgency")
 
         # Cap at 1.0
         return min(score, 1.0)
 
-    def classify_lead_type(self, title: str, description: str) -> str:
+    def classify_lead_type(
+        self, title: str, description: str, hits: Optional[KeywordHits] = None
+    ) -> str:
         """Classify lead type based on content"""
-        text = (title + " " + description).lower()
-        scores = {"junk_removal": 0, "cleanout": 0, "moving": 0, "estate": 0}
-
-        for category, keywords in self.keywords.items():
-            if category in scores:
-                for keyword in keywords:
-                    if keyword in text:
-                        scores[category] += 1
+        hits = hits or self.match_keywords(title, description)
+        scores = {
+            category: hits.count(category)
+            for category in ("junk_removal", "cleanout", "moving", "estate")
+        }
 
         return max(scores, key=scores.get)
 
-    def estimate_job_value(self, title: str, description: str, location: str) -> float:
+    def estimate_job_value(
+        self,
+        title: str,
+        description: str,
+        location: str,
+        hits: Optional[KeywordHits] = None
+    ) -> float:
         """Estimate job value based on content and location"""
-        text = (title + " " + description).lower()
+        hits = hits or self.match_keywords(title, description)
         base_value = 200  # Base junk removal job
 
         # Size indicators
-        if any(word in text for word in ["house", "home", "entire", "whole"]):
+        if hits.any("value_whole_home"):
             base_value += 200
-        if any(word in text for word in ["apartment", "condo", "studio"]):
+        if hits.any("value_small_unit"):
             base_value -= 50
-        if any(word in text for word in ["basement", "garage", "shed"]):
+        if hits.any("value_storage"):
             base_value += 100
-        if any(word in text for word in ["estate", "inheritance"]):
+        if hits.any("value_estate"):
             base_value += 300
 
         # Volume indicators
-        if "furniture" in text:
+        if hits.any("value_furniture"):
             base_value += 75
-        if "appliances" in text:
+        if hits.any("value_appliances"):
             base_value += 50
-        if "construction" in text or "debris" in text:
+        if hits.any("value_debris"):
             base_value += 150
 
         # Location-based pricing (Detroit metro area)
@@ -255,206 +326,283 @@ class MichiganLeadGenerator:
 
         return max(base_value, 100)  # Minimum $100
 
-    async def scrape_facebook_marketplace(self) -> List[MichiganLead]:
-        """Scrape Facebook Marketplace for Michigan leads"""
+    def build_lead(
+        self,
+        source: str,
+        title: str,
+        description: str,
+        price: str,
+        city: str,
+        url: str,
+        listing_url: Optional[str] = None,
+        listing_id: Optional[str] = None,
+    ) -> MichiganLead:
+        """
+        Score a scraped listing (one keyword pass) and wrap it as a lead
+
+        listing_url is the listing's own page, if it has one; it identifies
+        the listing better than its text. Search-page URLs must not be passed.
+        """
+        hits = self.match_keywords(title, description)
+        return MichiganLead(
+            source=source,
+            title=title,
+            description=description,
+            price=price,
+            location=city.title(),
+            contact_info={},  # Would need to extract from listing
+            posted_date=datetime.now(),
+            url=url,
+            lead_type=self.classify_lead_type(title, description, hits),
+            urgency_score=self.calculate_urgency_score(title, description, hits),
+            estimated_value=self.estimate_job_value(title, description, city, hits),
+            fingerprint=lead_fingerprint(source, title, description, listing_url),
+            listing_id=listing_id,
+        )
+
+    def _host_limit(self, host: str) -> asyncio.Semaphore:
+        """Per-host concurrency limit, created on first request to that host"""
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.max_requests_per_host)
+        return self._host_limits[host]
+
+    async def fetch_page(self, url: str, conditional: bool = False) -> Optional[str]:
+        """
+        GET url within the per-host and global concurrency limits,
+        at the host's request rate
+
+        Returns the body on HTTP 200, otherwise None. With conditional=True
+        the page cache's validators are sent, and None is also returned when
+        the page is unchanged since the last saved cycle (304 or same body
+        hash), so there is nothing new to parse.
+        """
+        headers = self.page_cache.conditional_headers(url) if conditional else {}
+
+        # Take the host slot first so a busy host can't hold global slots idle
+        host = urlparse(url).netloc
+        async with self._host_limit(host):
+            await self.rate_limiter.acquire(host)
+            async with self._request_limit:
+                request_url = self.url_map(url) if self.url_map else url
+                async with self.session.get(request_url, headers=headers) as response:
+                    if conditional and response.status == 304:
+                        self.page_cache.not_modified += 1
+                        return None
+                    if response.status != 200:
+                        return None
+                    body = await response.text()
+
+                    if conditional:
+                        body_hash = self.page_cache.hash_body(body)
+                        if self.page_cache.is_unchanged(url, body_hash):
+                            self.page_cache.unchanged += 1
+                            return None
+                        self.page_cache.stage(
+                            url,
+                            response.headers.get("ETag"),
+                            response.headers.get("Last-Modified"),
+                            body_hash,
+                        )
+                    return body
+
+    def known_listing_ids(self, source: str, listing_ids: List[str]) -> set:
+        """Those of listing_ids already stored for source"""
+        if not listing_ids:
+            return set()
+
+        placeholders = ",".join("?" * len(listing_ids))
+        cursor = self.db_conn.execute(
+            f"SELECT listing_id FROM leads WHERE source = ? AND listing_id IN ({placeholders})",
+            (source, *listing_ids),
+        )
+        return {row[0] for row in cursor}
+
+    async def scrape_facebook_marketplace(
+        self, cities: Optional[List[str]] = None
+    ) -> List[MichiganLead]:
+        """Scrape Facebook Marketplace for Michigan leads (all cities concurrently)"""
+        if cities is None:
+            cities = self.cities[:5]  # Limit to major cities first
+
+        results = await asyncio.gather(
+            *(self._scrape_facebook_city(city) for city in cities)
+        )
+        return [lead for city_leads in results for lead in city_leads]
+
+    async def _scrape_facebook_city(self, city: str) -> List[MichiganLead]:
         leads = []
+        url = f"https://www.facebook.com/marketplace/{city}/search?query=junk%20removal"
 
-        for city in self.cities[:5]:  # Limit to major cities first
-            try:
-                url = f"https://www.facebook.com/marketplace/{city}/search?query=junk%20removal"
-                async with self.session.get(url) as response:
-                    if response.status == 200:
-                        html = await response.text()
-                        soup = BeautifulSoup(html, "html.parser")
-
-                        # Extract listings (this is simplified - would need more sophisticated parsing)
-                        listings = soup.find_all("div", class_="x78zum5")[:10]
-
-                        for listing in listings:
-                            try:
-                                title_elem = listing.find("span", class_="x1lliihq")
-                                title = title_elem.text if title_elem else ""
-
-                                desc_elem = listing.find("span", class_="x1yztbdb")
-                                description = desc_elem.text if desc_elem else ""
-
-                                price_elem = listing.find("span", class_="x193iq5w")
-                                price = price_elem.text if price_elem else ""
-
-                                if title and description:
-                                    leads.append(
-                                        MichiganLead(
-                                            source="facebook_marketplace",
-                                            title=title,
-                                            description=description,
-                                            price=price,
-                                            location=city.title(),
-                                            contact_info={},  # Would need to extract from listing
-                                            posted_date=datetime.now(),
-                                            url=url,
-                                            lead_type=self.classify_lead_type(
-                                                title, description
-                                            ),
-                                            urgency_score=self.calculate_urgency_score(
-                                                title, description
-                                            ),
-                                            estimated_value=self.estimate_job_value(
-                                                title, description, city
-                                            ),
-                                        )
-                                    )
-                            except Exception as e:
-                                logger.warning(f"Error parsing Facebook listing: {e}")
-
-                await asyncio.sleep(1)  # Rate limiting
-
-            except Exception as e:
-                logger.error(f"Error scraping Facebook for {city}: {e}")
+        try:
+            html = await self.fetch_page(url, conditional=True)
+            if html:
+                listings = await self.parser.parse(parse_facebook_search, html)
+
+                for title, description, price in listings:
+                    leads.append(
+                        self.build_lead(
+                            "facebook_marketplace", title, description, price, city, url
+                        )
+                    )
+
+        except Exception as e:
+            logger.error(f"Error scraping Facebook for {city}: {e}")
+            self.page_cache.discard(url)
+            leads = []
 
         return leads
 
-    async def scrape_craigslist(self) -> List[MichiganLead]:
-        """Scrape Craigslist for Michigan leads"""
+    async def scrape_craigslist(
+        self, cities: Optional[List[str]] = None
+    ) -> List[MichiganLead]:
+        """Scrape Craigslist for Michigan leads (all cities concurrently)"""
+        if cities is None:
+            cities = self.craigslist_cities
+
+        results = await asyncio.gather(
+            *(self._scrape_craigslist_city(city) for city in cities)
+        )
+        return [lead for city_leads in results for lead in city_leads]
+
+    async def _scrape_craigslist_city(self, city: str) -> List[MichiganLead]:
         leads = []
+        # Search services section
+        url = f"https://{city}.craigslist.org/search/svc?query=junk%20removal"
 
-        for city in ["detroit", "annarbor"]:
-            try:
-                # Search services section
-                url = f"https://{city}.craigslist.org/search/svc?query=junk%20removal"
-                async with self.session.get(url) as response:
-                    if response.status == 200:
-                        html = await response.text()
-                        soup = BeautifulSoup(html, "html.parser")
-
-                        listings = soup.find_all(
-                            "li", class_="cl-static-search-result"
-                        )[:15]
-
-                        for listing in listings:
-                            try:
-                                title_elem = listing.find("a", class_="title")
-                                title = title_elem.text if title_elem else ""
-
-                                price_elem = listing.find("span", class_="price")
-                                price = price_elem.text if price_elem else ""
-
-                                # Get description from listing page
-                                detail_url = (
-                                    listing.find("a")["href"]
-                                    if listing.find("a")
-                                    else ""
-                                )
-                                if detail_url:
-                                    try:
-                                        async with self.session.get(
-                                            detail_url
-                                        ) as detail_response:
-                                            if detail_response.status == 200:
-                                                detail_html = (
-                                                    await detail_response.text()
-                                                )
-                                                detail_soup = BeautifulSoup(
-                                                    detail_html, "html.parser"
-                                                )
-                                                desc_elem = detail_soup.find(
-                                                    "section", id="postingbody"
-                                                )
-                                                description = (
-                                                    desc_elem.text if desc_elem else ""
-                                                )
-                                            else:
-                                                description = ""
-                                    except:
-                                        description = ""
-
-                                if title:
-                                    leads.append(
-                                        MichiganLead(
-                                            source="craigslist",
-                                            title=title,
-                                            description=description,
-                                            price=price,
-                                            location=city.title(),
-                                            contact_info={},
-                                            posted_date=datetime.now(),
-                                            url=detail_url,
-                                            lead_type=self.classify_lead_type(
-                                                title, description
-                                            ),
-                                            urgency_score=self.calculate_urgency_score(
-                                                title, description
-                                            ),
-                                            estimated_value=self.estimate_job_value(
-                                                title, description, city
-                                            ),
-                                        )
-                                    )
-                            except Exception as e:
-                                logger.warning(f"Error parsing Craigslist listing: {e}")
-
-                await asyncio.sleep(2)  # Rate limiting
-
-            except Exception as e:
-                logger.error(f"Error scraping Craigslist for {city}: {e}")
+        try:
+            html = await self.fetch_page(url, conditional=True)
+            if not html:
+                return leads  # Failed, or unchanged since the last cycle
 
-        return leads
+            # [(title, price, detail_url)]
+            found = await self.parser.parse(parse_craigslist_search, html)
 
-    def save_leads(self, leads: List[MichiganLead]):
-        """Save leads to database"""
-        cursor = self.db_conn.cursor()
+            # Listings already stored don't need their detail page again
+            known = self.known_listing_ids(
+                "craigslist",
+                [i for i in (craigslist_listing_id(u) for _, _, u in found) if i],
+            )
+            if known:
+                self.skipped_known_listings += len(known)
+                found = [f for f in found if craigslist_listing_id(f[2]) not in known]
+
+            # Get descriptions from listing pages, all at once
+            descriptions = await asyncio.gather(
+                *(self._fetch_craigslist_description(detail_url) for _, _, detail_url in found)
+            )
 
-        for lead in leads:
-            try:
-                cursor.execute(
-                    """
-                    INSERT INTO leads (source, title, description, price, location, 
-                                     contact_info, posted_date, url, lead_type, 
-                                     urgency_score, estimated_value)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                    (
-                        lead.source,
-                        lead.title,
-                        lead.description,
-                        lead.price,
-                        lead.location,
-                        json.dumps(lead.contact_info),
-                        lead.posted_date.isoformat(),
-                        lead.url,
-                        lead.lead_type,
-                        lead.urgency_score,
-                        lead.estimated_value,
-                    ),
+            for (title, price, detail_url), description in zip(found, descriptions):
+                leads.append(
+                    self.build_lead(
+                        "craigslist", title, description, price, city, detail_url,
+                        listing_url=detail_url,
+                        listing_id=craigslist_listing_id(detail_url),
+                    )
                 )
-            except sqlite3.IntegrityError:
-                logger.info(f"Lead already exists: {lead.title}")
 
-        self.db_conn.commit()
-        logger.info(f"Saved {len(leads)} leads to database")
+        except Exception as e:
+            logger.error(f"Error scraping Craigslist for {city}: {e}")
+            self.page_cache.discard(url)
+            leads = []
+
+        return leads
+
+    async def _fetch_craigslist_description(self, detail_url: str) -> str:
+        if not detail_url:
+            return ""
+
+        try:
+            detail_html = await self.fetch_page(detail_url)
+            if not detail_html:
+                return ""
+
+            return await self.parser.parse(parse_craigslist_detail, detail_html)
+        except Exception:
+            return ""
+
+    def save_leads(self, leads: List[MichiganLead]) -> LeadSaveResult:
+        """
+        Save leads to database, skipping listings already stored
+
+        One executemany in one transaction; duplicates are dropped by the
+        unique fingerprint index.
+        """
+        rows = [
+            (
+                lead.source,
+                lead.title,
+                lead.description,
+                lead.price,
+                lead.location,
+                json.dumps(lead.contact_info),
+                lead.posted_date.isoformat(),
+                lead.url,
+                lead.lead_type,
+                lead.urgency_score,
+                lead.estimated_value,
+                lead.fingerprint
+                or lead_fingerprint(lead.source, lead.title, lead.description),
+                lead.listing_id,
+            )
+            for lead in leads
+        ]
+
+        with self.db_conn:
+            cursor = self.db_conn.executemany(
+                """
+                INSERT INTO leads (source, title, description, price, location, 
+                                 contact_info, posted_date, url, lead_type, 
+                                 urgency_score, estimated_value, fingerprint, listing_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(fingerprint) DO NOTHING
+            """,
+                rows,
+            )
+            new = max(cursor.rowcount, 0)
 
-    async def run_lead_generation(self):
-        """Main lead generation loop"""
+        result = LeadSaveResult(new=new, seen=len(rows) - new)
+        logger.info(f"Saved {result.new} new leads ({result.seen} already seen)")
+        return result
+
+    async def run_lead_generation(self, cities: Optional[List[str]] = None):
+        """
+        Main lead generation loop
+
+        Sources and cities are scraped concurrently within the request limits,
+        so a sweep takes about as long as the busiest host, not the sum of all.
+        Pass cities=self.cities for a full sweep of every Facebook city.
+        """
         logger.info("Starting Michigan lead generation...")
 
         all_leads = []
 
-        # Scrape multiple sources
-        try:
-            facebook_leads = await self.scrape_facebook_marketplace()
+        # Scrape all sources concurrently
+        facebook_leads, craigslist_leads = await asyncio.gather(
+            self.scrape_facebook_marketplace(cities),
+            self.scrape_craigslist(),
+            return_exceptions=True,
+        )
+
+        if isinstance(facebook_leads, Exception):
+            logger.error(f"Facebook scraping error: {facebook_leads}")
+        else:
             all_leads.extend(facebook_leads)
             logger.info(f"Found {len(facebook_leads)} Facebook leads")
-        except Exception as e:
-            logger.error(f"Facebook scraping error: {e}")
 
-        try:
-            craigslist_leads = await self.scrape_craigslist()
+        if isinstance(craigslist_leads, Exception):
+            logger.error(f"Craigslist scraping error: {craigslist_leads}")
+        else:
             all_leads.extend(craigslist_leads)
             logger.info(f"Found {len(craigslist_leads)} Craigslist leads")
-        except Exception as e:
-            logger.error(f"Craigslist scraping error: {e}")
 
-        # Save to database
-        self.save_leads(all_leads)
+        # Save to database, then mark the pages they came from as processed
+        saved = self.save_leads(all_leads)
+        self.page_cache.commit()
+        logger.info(
+            f"Incremental scrape: {self.page_cache.not_modified} pages not modified, "
+            f"{self.page_cache.unchanged} unchanged, "
+            f"{self.skipped_known_listings} known listings skipped"
+        )
 
         # Get top high-urgency leads
         cursor = self.db_conn.cursor()
@@ -468,7 +616,7 @@ class MichiganLeadGenerator:
         top_leads = cursor.fetchall()
         logger.info(f"Top {len(top_leads)} high-urgency leads ready for contact")
 
-        return all_leads, top_leads
+        return all_leads, top_leads, saved
 
 
 if __name__ == "__main__":
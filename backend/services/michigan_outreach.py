@@ -9,21 +9,55 @@ import json
 import logging
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import sqlite3
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import os
 import random
 import re
+import sys
 from twilio.rest import Client as TwilioClient
 
+from services.outbox_dispatcher import OutboxDispatcher
+from services.rate_limiter import RateLimiter, get_rate_limiter
+from services.smtp_pool import SMTPPool, get_smtp_pool
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# Placeholders filled in by personalize_message; other braces are literal text
+PLACEHOLDERS = (
+    "contact_name",
+    "listing_title",
+    "location",
+    "area_nickname",
+    "estimated_price",
+    "phone_number",
+    "website",
+)
+_PLACEHOLDER = re.compile(r"\{(" + "|".join(PLACEHOLDERS) + r")\}")
+
+
+def compile_template(text: str) -> Tuple[str, ...]:
+    """
+    Split text into (literal, name, literal, name, ..., literal)
+
+    Names sit at the odd indices, so render_template fills them in with
+    one slice assignment and one join.
+    """
+    return tuple(_PLACEHOLDER.split(text))
+
+
+def render_template(segments: Tuple[str, ...], values: Dict[str, str]) -> str:
+    """Fill a compiled template in a single pass"""
+    parts = list(segments)
+    parts[1::2] = [values[name] for name in segments[1::2]]
+    return "".join(parts)
+
+
 @dataclass
 class OutreachTemplate:
     """Michigan-specific outreach template"""
@@ -35,12 +69,37 @@ class OutreachTemplate:
     urgency_appropriate: bool
     estimated_response_rate: float
 
+    # Parsed once when the template is loaded
+    subject_segments: Tuple[str, ...] = field(init=False, repr=False, compare=False)
+    body_segments: Tuple[str, ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.subject_segments = compile_template(self.subject)
+        self.body_segments = compile_template(self.body_template)
+
 
 class MichiganOutreachSystem:
     """Automated outreach system for Michigan leads"""
 
-    def __init__(self):
+    MAX_LEADS_PER_CAMPAIGN = int(os.getenv("OUTREACH_MAX_LEADS", "2000"))
+
+    # Look for name patterns like "My name is John" or "Contact Sarah" (in priority order)
+    NAME_PATTERNS = [
+        re.compile(r"my name is (\w+)"),
+        re.compile(r"contact (\w+)"),
+        re.compile(r"call me at.*?(\w+)"),
+        re.compile(r"\b([A-Z][a-z]+ [A-Z][a-z]+)\b"),  # Full names
+    ]
+
+    def __init__(
+        self,
+        rate_limiter: Optional[RateLimiter] = None,
+        smtp_pool: Optional[SMTPPool] = None,
+    ):
         self.db_conn = sqlite3.connect("michigan_leads.db", check_same_thread=False)
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        # Shared by default so connections stay open across campaigns
+        self.smtp_pool = smtp_pool or get_smtp_pool()
         self.smtp_config = {
             "server": os.getenv("SMTP_SERVER", "smtp.gmail.com"),
             "port": int(os.getenv("SMTP_PORT", "587")),
@@ -57,6 +116,16 @@ class MichiganOutreachSystem:
 
         self.templates = self.load_michigan_templates()
 
+        # Rendered messages wait in the outbox; the dispatcher delivers them.
+        # Channels without credentials get no sender, so nothing is queued
+        # or attempted for them until they are configured.
+        senders = {}
+        if smtp_pool is not None or os.getenv("SMTP_SERVER") or self.smtp_config["username"]:
+            senders["email"] = self._send_email_message
+        if self.twilio_config["account_sid"]:
+            senders["sms"] = self._send_sms_message
+        self.dispatcher = OutboxDispatcher(self.db_conn, senders)
+
         # Michigan area knowledge for personalization
         self.area_info = {
             "detroit": {
@@ -78,6 +147,7 @@ class MichiganOutreachSystem:
                 "common_needs": ["downtown business cleanouts", "home renovations"],
             },
         }
+        self._area_index: Dict[str, Dict] = {}  # location -> area info
 
     def load_michigan_templates(self) -> List[OutreachTemplate]:
         """Load Michigan-specific outreach templates"""
@@ -155,6 +225,7 @@ CleanoutPro Team
             ),
             OutreachTemplate(
                 name="sms_urgent_michigan",
+                subject="",  # SMS has no subject
                 body_template="""
 CleanoutPro: Saw your post about {listing_title}. We offer SAME-DAY junk removal in {location}. Quick quote: ${estimated_price}. Call {phone_number} ASAP! Fast, reliable Michigan service.
                 """,
@@ -164,6 +235,7 @@ CleanoutPro: Saw your post about {listing_title}. We offer SAME-DAY junk removal
             ),
             OutreachTemplate(
                 name="sms_standard_michigan",
+                subject="",  # SMS has no subject
                 body_template="""
 CleanoutPro: Professional junk removal for your {listing_title} in {location}. Estimate: ${estimated_price}. Fully licensed Michigan company. Call {phone_number} for free quote!
                 """,
@@ -175,6 +247,14 @@ CleanoutPro: Professional junk removal for your {listing_title} in {location}. E
 
     def get_area_info(self, location: str) -> Dict:
         """Get area-specific information for personalization"""
+        # Leads come from a few dozen locations; scan each one only once
+        info = self._area_index.get(location)
+        if info is None:
+            info = self._find_area_info(location)
+            self._area_index[location] = info
+        return info
+
+    def _find_area_info(self, location: str) -> Dict:
         location_lower = location.lower()
         for area, info in self.area_info.items():
             if area in location_lower:
@@ -194,35 +274,22 @@ CleanoutPro: Professional junk removal for your {listing_title} in {location}. E
         price = self.format_price(lead_data.get("estimated_value", 0))
 
         # Personalization variables
-        replacements = {
-            "{contact_name}": contact_name,
-            "{listing_title}": lead_data.get("title", "your project"),
-            "{location}": lead_data.get("location", "your area"),
-            "{area_nickname}": area_info["nickname"],
-            "{estimated_price}": price,
-            "{phone_number}": "(313) 555-CLEAN",  # Michigan area code
-            "{website}": "www.cleanoutpro.com/michigan",
+        values = {
+            "contact_name": contact_name,
+            "listing_title": lead_data.get("title", "your project"),
+            "location": lead_data.get("location", "your area"),
+            "area_nickname": area_info["nickname"],
+            "estimated_price": price,
+            "phone_number": "(313) 555-CLEAN",  # Michigan area code
+            "website": "www.cleanoutpro.com/michigan",
         }
 
-        # Replace template variables
-        message = template.body_template
-        for placeholder, value in replacements.items():
-            message = message.replace(placeholder, value)
-
-        return message
+        return render_template(template.body_segments, values)
 
     def extract_contact_name(self, text: str) -> Optional[str]:
         """Extract contact name from listing text"""
-        # Look for name patterns like "My name is John" or "Contact Sarah"
-        name_patterns = [
-            r"my name is (\w+)",
-            r"contact (\w+)",
-            r"call me at.*?(\w+)",
-            r"\b([A-Z][a-z]+ [A-Z][a-z]+)\b",  # Full names
-        ]
-
-        for pattern in name_patterns:
-            match = re.search(pattern, text)
+        for pattern in self.NAME_PATTERNS:
+            match = pattern.search(text)
             if match:
                 return match.group(1)
 
@@ -250,11 +317,8 @@ CleanoutPro: Professional junk removal for your {listing_title} in {location}. E
 
             msg.attach(MIMEText(body, "plain"))
 
-            server = smtplib.SMTP(self.smtp_config["server"], self.smtp_config["port"])
-            server.starttls()
-            server.login(self.smtp_config["username"], self.smtp_config["password"])
-            server.send_message(msg)
-            server.quit()
+            await self.rate_limiter.acquire("smtp")
+            await self.smtp_pool.send(msg)
 
             logger.info(f"Email sent successfully to {to_email}")
             return True
@@ -270,15 +334,21 @@ CleanoutPro: Professional junk removal for your {listing_title} in {location}. E
                 logger.warning("Twilio not configured, skipping SMS")
                 return False
 
+            await self.rate_limiter.acquire("twilio")
             client = TwilioClient(
                 self.twilio_config["account_sid"], self.twilio_config["auth_token"]
             )
 
-            message = client.messages.create(
-                body=message, from_=self.twilio_config["from_number"], to=to_number
+            # Twilio's client is blocking; keep it off the event loop
+            loop = asyncio.get_running_loop()
+            sent = await loop.run_in_executor(
+                None,
+                lambda: client.messages.create(
+                    body=message, from_=self.twilio_config["from_number"], to=to_number
+                ),
             )
 
-            logger.info(f"SMS sent to {to_number}: {message.sid}")
+            logger.info(f"SMS sent to {to_number}: {sent.sid}")
             return True
 
         except Exception as e:
@@ -313,8 +383,8 @@ CleanoutPro: Professional junk removal for your {listing_title} in {location}. E
         # Return highest response rate template
         return max(appropriate_templates, key=lambda t: t.estimated_response_rate)
 
-    def get_high_quality_leads(self, limit: int = 20) -> List[Dict]:
-        """Get high-quality leads for outreach"""
+    def get_high_quality_leads(self, limit: int = MAX_LEADS_PER_CAMPAIGN) -> List[Dict]:
+        """Get high-quality leads for outreach (not yet contacted or queued)"""
         cursor = self.db_conn.cursor()
 
         cursor.execute(
@@ -324,6 +394,7 @@ CleanoutPro: Professional junk removal for your {listing_title} in {location}. E
                AND contacted = FALSE 
                AND urgency_score >= 0.4
                AND estimated_value >= 150
+               AND NOT EXISTS (SELECT 1 FROM outbox WHERE outbox.lead_id = leads.id)
             ORDER BY urgency_score DESC, estimated_value DESC
             LIMIT ?
         """,
@@ -339,80 +410,116 @@ CleanoutPro: Professional junk removal for your {listing_title} in {location}. E
 
         return leads
 
-    async def run_outreach_campaign(self):
-        """Main outreach campaign execution"""
-        logger.info("Starting Michigan outreach campaign...")
+    def render_outreach(self, lead: Dict) -> Optional[Tuple[str, str, Optional[str], str, str]]:
+        """
+        Personalized message for lead as (channel, recipient, subject, body, template_name)
+
+        None if the lead has no contact for the selected template's channel.
+        """
+        # Select best template
+        template = self.select_best_template(lead)
+
+        # Extract contact information (would need more sophisticated parsing)
+        contact_info = json.loads(lead.get("contact_info") or "{}")
+        recipient = contact_info.get("email" if template.type == "email" else "phone")
+        if not recipient:
+            return None
+
+        # Personalize message
+        message = self.personalize_message(template, lead)
+
+        subject = None
+        if template.type == "email":
+            subject = render_template(
+                template.subject_segments,
+                {
+                    "location": lead.get("location", "Michigan"),
+                    "listing_title": lead.get("title", "your project"),
+                },
+            )
 
-        leads = self.get_high_quality_leads(20)
-        logger.info(f"Found {len(leads)} leads for outreach")
+        return template.type, recipient, subject, message, template.name
 
-        successful_contacts = 0
+    def enqueue_outreach(self, leads: List[Dict]) -> int:
+        """
+        Render messages for leads into the outbox in one transaction; returns rows queued
 
+        Leads whose message would go through an unconfigured channel are
+        left out, so they stay eligible for a later campaign.
+        """
+        rows = []
+        unconfigured = 0
         for lead in leads:
             try:
-                # Select best template
-                template = self.select_best_template(lead)
-
-                # Personalize message
-                message = self.personalize_message(template, lead)
-
-                # Extract contact information (would need more sophisticated parsing)
-                contact_info = json.loads(lead.get("contact_info", "{}"))
-                email = contact_info.get("email")
-                phone = contact_info.get("phone")
-
-                # Send message
-                contact_success = False
-                if template.type == "email" and email:
-                    subject = template.subject.format(
-                        **{
-                            "location": lead.get("location", "Michigan"),
-                            "listing_title": lead.get("title", "your project"),
-                        }
-                    )
-                    contact_success = await self.send_email(email, subject, message)
-
-                elif template.type == "sms" and phone:
-                    contact_success = await self.send_sms(phone, message)
-
-                # Mark as contacted
-                if contact_success:
-                    self.mark_lead_contacted(lead["id"], template.name)
-                    successful_contacts += 1
-                    logger.info(f"Successfully contacted lead {lead['id']}")
-
-                # Rate limiting
-                await asyncio.sleep(random.uniform(2, 5))
-
+                rendered = self.render_outreach(lead)
             except Exception as e:
-                logger.error(f"Error processing lead {lead['id']}: {e}")
+                logger.error(f"Error rendering outreach for lead {lead['id']}: {e}")
+                continue
 
-        logger.info(
-            f"Outreach campaign complete. Contacted {successful_contacts}/{len(leads)} leads"
-        )
-        return successful_contacts
+            if rendered is None:
+                continue
 
-    def mark_lead_contacted(self, lead_id: int, template_used: str):
-        """Mark lead as contacted in database"""
-        cursor = self.db_conn.cursor()
-        cursor.execute(
-            """
-            UPDATE leads 
-            SET contacted = TRUE, 
-                processed = TRUE,
-                contact_date = ?,
-                template_used = ?
-            WHERE id = ?
-        """,
-            (datetime.now().isoformat(), template_used, lead_id),
-        )
-        self.db_conn.commit()
+            channel, recipient, subject, body, template_name = rendered
+            if channel not in self.dispatcher.senders:
+                unconfigured += 1
+                continue
+
+            rows.append(
+                (lead["id"], channel, recipient, subject, body, template_name,
+                 lead.get("urgency_score") or 0.0)
+            )
+
+        if unconfigured:
+            logger.warning(f"Skipped {unconfigured} leads whose outreach channel is not configured")
+
+        with self.db_conn:
+            cursor = self.db_conn.executemany(
+                """
+                INSERT INTO outbox (lead_id, channel, recipient, subject, body,
+                                    template_name, priority)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(lead_id) DO NOTHING
+            """,
+                rows,
+            )
+        return max(cursor.rowcount, 0)
+
+    async def _send_email_message(self, recipient: str, subject: Optional[str], body: str) -> bool:
+        return await self.send_email(recipient, subject or "", body)
+
+    async def _send_sms_message(self, recipient: str, subject: Optional[str], body: str) -> bool:
+        return await self.send_sms(recipient, body)
+
+    async def run_outreach_campaign(self, limit: int = MAX_LEADS_PER_CAMPAIGN):
+        """
+        Main outreach campaign execution
+
+        Renders messages for new leads into the outbox, then delivers
+        everything due (including retries from earlier campaigns).
+        """
+        logger.info("Starting Michigan outreach campaign...")
+
+        leads = self.get_high_quality_leads(limit)
+        queued = self.enqueue_outreach(leads)
+        logger.info(f"Found {len(leads)} leads for outreach, queued {queued} messages")
+
+        successful_contacts = await self.dispatcher.dispatch()
+
+        logger.info(f"Outreach campaign complete. Contacted {successful_contacts} leads")
+        return successful_contacts
 
 
 if __name__ == "__main__":
 
     async def main():
         outreach_system = MichiganOutreachSystem()
+
+        if len(sys.argv) > 1 and sys.argv[1].lower() == "retry-failed":
+            channel = sys.argv[2] if len(sys.argv) > 2 else None
+            requeued = outreach_system.dispatcher.requeue_failed(channel)
+            print(f"Requeued {requeued} failed outreach messages")
+            return
+
         await outreach_system.run_outreach_campaign()
 
     asyncio.run(main())
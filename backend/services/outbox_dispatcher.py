@@ -0,0 +1,206 @@
+"""
+Outbox Dispatcher
+Drains the outreach outbox concurrently with retries and exponential backoff
+Leads are marked contacted in one transaction per flush, not one per message
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import logging
+import sqlite3
+
+from services.michigan_database import ensure_outbox_table
+
+logger = logging.getLogger(__name__)
+
+# channel -> async send(recipient, subject, body) -> success
+Sender = Callable[[str, Optional[str], str], Awaitable[bool]]
+
+
+class OutboxDispatcher:
+    """
+    Concurrent delivery of queued outreach messages
+
+    Rows are claimed in priority order (status 'sending' is committed
+    before anything is sent), delivered with at most `concurrency` in
+    flight, and their outcomes written back every `flush_size` messages:
+    sent rows and their leads' contacted flags in one transaction, failed
+    rows rescheduled with exponential backoff. Rows left in 'sending' by a
+    crash are requeued once their claim is older than `claim_timeout`, so
+    messages are delivered at least once and never silently dropped, while
+    a dispatch still running elsewhere keeps its rows.
+
+    Only rows for channels in `senders` are claimed; rows for a channel
+    with no sender wait in 'pending' instead of burning their attempts.
+    Per-channel pacing is the senders' job (they hold the rate limiter).
+    """
+
+    MAX_ATTEMPTS = 5
+    RETRY_BACKOFF = 60.0  # seconds, doubled per attempt
+    CONCURRENCY = 8
+    FLUSH_SIZE = 50
+    CLAIM_TIMEOUT = 900.0  # seconds before a 'sending' row counts as abandoned
+
+    def __init__(
+        self,
+        db_conn: sqlite3.Connection,
+        senders: Dict[str, Sender],
+        concurrency: int = CONCURRENCY,
+        max_attempts: int = MAX_ATTEMPTS,
+        retry_backoff: float = RETRY_BACKOFF,
+        flush_size: int = FLUSH_SIZE,
+        claim_timeout: float = CLAIM_TIMEOUT,
+    ):
+        self.db_conn = db_conn
+        self.senders = senders
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.flush_size = flush_size
+        self.claim_timeout = claim_timeout
+
+        ensure_outbox_table(db_conn)
+
+    def requeue_interrupted(self) -> int:
+        """
+        Return rows a crashed dispatch left in 'sending' to the queue
+
+        Only claims older than claim_timeout are taken back; younger ones
+        may belong to a dispatch that is still delivering them.
+        """
+        with self.db_conn:
+            cursor = self.db_conn.execute(
+                """
+                UPDATE outbox SET status = 'pending'
+                WHERE status = 'sending' AND (claimed_at IS NULL OR claimed_at < ?)
+            """,
+                (time.time() - self.claim_timeout,),
+            )
+        return cursor.rowcount
+
+    def claim(self, limit: int) -> List[Tuple]:
+        """Mark up to limit due rows as 'sending' and return them"""
+        channels = list(self.senders)
+        if not channels:
+            return []
+
+        now = time.time()
+        with self.db_conn:
+            rows = self.db_conn.execute(
+                f"""
+                SELECT id, lead_id, channel, recipient, subject, body, template_name, attempts
+                FROM outbox
+                WHERE status = 'pending' AND next_attempt_at <= ?
+                  AND channel IN ({", ".join("?" * len(channels))})
+                ORDER BY priority DESC, id
+                LIMIT ?
+            """,
+                (now, *channels, limit),
+            ).fetchall()
+            self.db_conn.executemany(
+                "UPDATE outbox SET status = 'sending', claimed_at = ? WHERE id = ?",
+                [(now, row[0]) for row in rows],
+            )
+        return rows
+
+    def requeue_failed(self, channel: Optional[str] = None) -> int:
+        """
+        Give rows that ran out of attempts a fresh set; returns rows requeued
+
+        For operators, once whatever made them fail (credentials, relay,
+        provider outage) is fixed. Limited to one channel if given.
+        """
+        query = (
+            "UPDATE outbox SET status = 'pending', attempts = 0, next_attempt_at = 0 "
+            "WHERE status = 'failed'"
+        )
+        params: Tuple = ()
+        if channel is not None:
+            query += " AND channel = ?"
+            params = (channel,)
+
+        with self.db_conn:
+            cursor = self.db_conn.execute(query, params)
+        return cursor.rowcount
+
+    async def _deliver(self, row: Tuple) -> Tuple[Tuple, Optional[str]]:
+        """Send one row; returns (row, error or None)"""
+        _, _, channel, recipient, subject, body, _, _ = row
+        sender = self.senders.get(channel)
+        if sender is None:
+            return row, f"No sender for channel {channel!r}"
+
+        try:
+            if await sender(recipient, subject, body):
+                return row, None
+            return row, "Send failed"
+        except Exception as e:
+            return row, str(e)
+
+    def flush(self, results: List[Tuple[Tuple, Optional[str]]]):
+        """Write one batch of outcomes back in a single transaction"""
+        now = time.time()
+        now_iso = datetime.now().isoformat()
+
+        sent = [row for row, error in results if error is None]
+        failed = [(row, error) for row, error in results if error is not None]
+
+        retries = []
+        for row, error in failed:
+            attempts = row[7] + 1
+            status = "failed" if attempts >= self.max_attempts else "pending"
+            next_attempt = now + self.retry_backoff * (2 ** (attempts - 1))
+            retries.append((status, attempts, next_attempt, error, row[0]))
+
+        with self.db_conn:
+            self.db_conn.executemany(
+                "UPDATE outbox SET status = 'sent', attempts = attempts + 1, sent_at = ? "
+                "WHERE id = ?",
+                [(now_iso, row[0]) for row in sent],
+            )
+            self.db_conn.executemany(
+                """
+                UPDATE leads
+                SET contacted = TRUE, processed = TRUE, contact_date = ?, template_used = ?
+                WHERE id = ?
+            """,
+                [(now_iso, row[6], row[1]) for row in sent],
+            )
+            self.db_conn.executemany(
+                "UPDATE outbox SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ? "
+                "WHERE id = ?",
+                retries,
+            )
+
+        for row, error in failed:
+            logger.warning(f"Outreach to lead {row[1]} failed (attempt {row[7] + 1}): {error}")
+
+    async def dispatch(self) -> int:
+        """
+        Deliver every due message; returns the number sent
+
+        Messages in backoff stay queued for a later dispatch.
+        """
+        requeued = self.requeue_interrupted()
+        if requeued:
+            logger.info(f"Requeued {requeued} interrupted outreach messages")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(row):
+            async with semaphore:
+                return await self._deliver(row)
+
+        sent = 0
+        while True:
+            rows = self.claim(self.flush_size)
+            if not rows:
+                break
+
+            results = await asyncio.gather(*(bounded(row) for row in rows))
+            self.flush(results)
+            sent += sum(1 for _, error in results if error is None)
+
+        return sent
@@ -0,0 +1,115 @@
+"""
+Page Cache
+Remembers ETag, Last-Modified and body hash of scraped pages
+So unchanged search pages are neither downloaded nor parsed again
+"""
+
+import hashlib
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PageValidators:
+    """What we know about the last fetched version of a URL"""
+
+    etag: Optional[str]
+    last_modified: Optional[str]
+    body_hash: Optional[str]
+
+
+class PageCache:
+    """
+    Conditional-request state per URL, stored next to the leads
+
+    Validators from a fetch are staged and only written by commit(),
+    which the scraper calls after the leads from those pages are saved.
+    A page whose listings fail to build is discard()ed, and a cycle that
+    fails halfway never commits, so either way the page is re-fetched
+    next time instead of being treated as already processed.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self._pending: Dict[str, PageValidators] = {}
+
+        self.not_modified = 0  # 304 responses
+        self.unchanged = 0  # 200 responses with a known body hash
+
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS page_cache (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body_hash TEXT,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        conn.commit()
+
+    @staticmethod
+    def hash_body(body: str) -> str:
+        return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+    def get(self, url: str) -> Optional[PageValidators]:
+        row = self.conn.execute(
+            "SELECT etag, last_modified, body_hash FROM page_cache WHERE url = ?",
+            (url,),
+        ).fetchone()
+        return PageValidators(*row) if row else None
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for url, if known"""
+        cached = self.get(url)
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+        return headers
+
+    def is_unchanged(self, url: str, body_hash: str) -> bool:
+        """True if the body matches the last committed fetch of url"""
+        cached = self.get(url)
+        return cached is not None and cached.body_hash == body_hash
+
+    def stage(self, url: str, etag: Optional[str], last_modified: Optional[str], body_hash: str):
+        """Remember a fetched page's validators until commit()"""
+        self._pending[url] = PageValidators(etag, last_modified, body_hash)
+
+    def discard(self, url: str):
+        """Forget a staged page so it is fetched in full next cycle"""
+        self._pending.pop(url, None)
+
+    def commit(self) -> int:
+        """Write staged validators; returns the number of URLs written"""
+        if not self._pending:
+            return 0
+
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT INTO page_cache (url, etag, last_modified, body_hash, fetched_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    body_hash = excluded.body_hash,
+                    fetched_at = excluded.fetched_at
+            """,
+                [
+                    (url, v.etag, v.last_modified, v.body_hash, now)
+                    for url, v in self._pending.items()
+                ],
+            )
+
+        written = len(self._pending)
+        self._pending.clear()
+        return written
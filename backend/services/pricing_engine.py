@@ -4,12 +4,235 @@ Converts AI room classification into dollar estimates
 Applies size/workload multipliers and adjustments
 """
 
-from typing import Dict, List, Optional
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Tuple
 from decimal import Decimal
+import json
 import logging
+import os
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+CENTS = Decimal('0.01')
+
+
+def _to_cents(amount: Decimal) -> int:
+    """Amount rounded to the cent, as an integer number of cents"""
+    return int(amount.quantize(CENTS).scaleb(2))
+
+
+@dataclass(frozen=True)
+class CostMatrix:
+    """
+    Room cost for every size x workload pair, in integer cents
+
+    Class names map to integer codes; the cost of a room is
+    cents[size_code * width + workload_code] (costs holds the same
+    values as Decimal dollars). The last code on each axis is the
+    fallback for unknown class names.
+    """
+
+    size_codes: Dict[str, int]
+    workload_codes: Dict[str, int]
+    cents: Tuple[int, ...]
+    costs: Tuple[Decimal, ...]
+    width: int
+
+    def encode(self, size_classes: Sequence[str], workload_classes: Sequence[str]) -> List[int]:
+        """Flat matrix index of each (size, workload) pair"""
+        if len(size_classes) != len(workload_classes):
+            raise ValueError("size_classes and workload_classes must be the same length")
+
+        unknown_size = len(self.size_codes)
+        unknown_workload = self.width - 1
+        size_codes = [self.size_codes.get(name, unknown_size) for name in size_classes]
+        workload_codes = [self.workload_codes.get(name, unknown_workload) for name in workload_classes]
+        return [s * self.width + w for s, w in zip(size_codes, workload_codes)]
+
+
+def _condition_items(condition: Mapping) -> FrozenSet[Tuple[str, str]]:
+    """Hashable (key, JSON value) pairs of a rule condition or adjustment"""
+    return frozenset(
+        (key, json.dumps(value, sort_keys=True))
+        for key, value in condition.items()
+        if key not in ('type', 'per', 'amount', 'description', 'quantity')
+    )
+
+
+@dataclass(frozen=True)
+class AdjustmentRule:
+    """Flat fee for adjustments of one type whose fields include `condition`"""
+
+    condition: FrozenSet[Tuple[str, str]]
+    fee: Decimal
+    per_unit: bool  # fee is multiplied by the adjustment's quantity
+
+
+@dataclass(frozen=True)
+class PricingRuleTable:
+    """
+    Active pricing_rules rows compiled for lookup
+
+    Built once per rule change by compile_pricing_rules and never
+    mutated, so it can be swapped in while requests are pricing.
+    """
+
+    base_labor_rate: Optional[Decimal]
+    size_multipliers: Mapping[str, Decimal]
+    workload_multipliers: Mapping[str, Decimal]
+    adjustments: Mapping[str, Tuple[AdjustmentRule, ...]]  # type -> rules by priority
+    watermark: Tuple = ()
+
+    def adjustment_fee(self, adjustment: Dict) -> Optional[Decimal]:
+        """Fee of the highest-priority rule matching adjustment, if any"""
+        rules = self.adjustments.get(adjustment.get('type'))
+        if not rules:
+            return None
+
+        fields = _condition_items(adjustment)
+        for rule in rules:
+            if rule.condition <= fields:
+                if rule.per_unit:
+                    return rule.fee * Decimal(str(adjustment.get('quantity', 1)))
+                return rule.fee
+        return None
+
+
+def compile_pricing_rules(rules: Iterable, watermark: Tuple = ()) -> PricingRuleTable:
+    """
+    Compile PricingRule rows into a PricingRuleTable
+
+    Rows must come in priority order (highest first); the first rule for
+    a size class, workload class or base rate wins, and adjustment rules
+    are tried in that order. Adjustment rules are keyed by
+    condition["type"]; the other condition keys must all match fields of
+    the adjustment, except "per", which charges the fee per `quantity`.
+    """
+    base_labor_rate = None
+    size_multipliers: Dict[str, Decimal] = {}
+    workload_multipliers: Dict[str, Decimal] = {}
+    adjustments: Dict[str, List[AdjustmentRule]] = {}
+
+    for rule in rules:
+        if rule.rule_type == 'base_labor' and rule.flat_fee is not None:
+            if base_labor_rate is None:
+                base_labor_rate = Decimal(str(rule.flat_fee))
+        elif rule.rule_type == 'size_multiplier' and rule.size_class and rule.size_multiplier is not None:
+            size_multipliers.setdefault(rule.size_class, Decimal(str(rule.size_multiplier)))
+        elif rule.rule_type == 'workload_multiplier' and rule.workload_class and rule.workload_multiplier is not None:
+            workload_multipliers.setdefault(rule.workload_class, Decimal(str(rule.workload_multiplier)))
+        elif rule.rule_type == 'adjustment' and rule.flat_fee is not None:
+            condition = rule.condition or {}
+            if condition.get('type'):
+                adjustments.setdefault(condition['type'], []).append(AdjustmentRule(
+                    condition=_condition_items(condition),
+                    fee=Decimal(str(rule.flat_fee)),
+                    per_unit='per' in condition
+                ))
+
+    return PricingRuleTable(
+        base_labor_rate=base_labor_rate,
+        size_multipliers=MappingProxyType(size_multipliers),
+        workload_multipliers=MappingProxyType(workload_multipliers),
+        adjustments=MappingProxyType({t: tuple(r) for t, r in adjustments.items()}),
+        watermark=watermark
+    )
+
+
+def rate_overrides(
+    base_labor_rate: Optional[Decimal] = None,
+    size_multipliers: Optional[Mapping[str, Decimal]] = None,
+    workload_multipliers: Optional[Mapping[str, Decimal]] = None
+) -> PricingRuleTable:
+    """Rule set that only overrides the given rates (e.g. a what-if candidate)"""
+    return PricingRuleTable(
+        base_labor_rate=Decimal(str(base_labor_rate)) if base_labor_rate is not None else None,
+        size_multipliers=MappingProxyType(
+            {name: Decimal(str(value)) for name, value in (size_multipliers or {}).items()}
+        ),
+        workload_multipliers=MappingProxyType(
+            {name: Decimal(str(value)) for name, value in (workload_multipliers or {}).items()}
+        ),
+        adjustments=MappingProxyType({})
+    )
+
+
+@dataclass(frozen=True)
+class PricingSnapshot:
+    """
+    Rates, rules and the room cost table compiled from them
+
+    Built whole and never mutated. The engine swaps a new one in with a
+    single assignment, and every pricing call reads it once, so a reload
+    on another thread never mixes old and new values within one price.
+    """
+
+    base_labor_rate: Decimal
+    size_multipliers: Mapping[str, Decimal]
+    workload_multipliers: Mapping[str, Decimal]
+    rules: Optional[PricingRuleTable]  # None = defaults only
+    matrix: CostMatrix
+    room_costs: Mapping[str, Tuple[Mapping[str, Decimal], Decimal]]  # size -> ({workload: cost}, unknown workload)
+    fallback_costs: Tuple[Mapping[str, Decimal], Decimal]  # unknown size
+
+    def room_cost(self, size_class: str, workload_class: str) -> Decimal:
+        """base_rate * size * workload, rounded to the cent"""
+        costs, fallback = self.room_costs.get(size_class, self.fallback_costs)
+        return costs.get(workload_class, fallback)
+
+    def price_rooms(
+        self,
+        size_classes: Sequence[str],
+        workload_classes: Sequence[str],
+        adjustments: Optional[Sequence[Optional[List[Dict]]]] = None
+    ) -> List[Decimal]:
+        """Cost per room, rounded to the cent (see PricingEngine.price_rooms_bulk)"""
+        matrix = self.matrix
+        indices = matrix.encode(size_classes, workload_classes)
+        costs = [matrix.costs[index] for index in indices]
+
+        if adjustments is not None:
+            if len(adjustments) != len(costs):
+                raise ValueError("adjustments must have one entry per room")
+            for i, room_adjustments in enumerate(adjustments):
+                if room_adjustments:
+                    cents = matrix.cents[indices[i]] + _to_cents(self.adjustments_total(room_adjustments))
+                    costs[i] = Decimal(cents).scaleb(-2)
+
+        return costs
+
+    def adjustment_amount(self, adjustment: Dict) -> Decimal:
+        """Explicit amount of an adjustment, else the fee from the matching pricing rule"""
+        if 'amount' in adjustment:
+            return Decimal(str(adjustment['amount']))
+
+        fee = self.rules.adjustment_fee(adjustment) if self.rules is not None else None
+        return fee if fee is not None else Decimal('0')
+
+    def adjustments_total(self, adjustments: List[Dict]) -> Decimal:
+        total = Decimal('0.00')
+        for adj in adjustments:
+            total += self.adjustment_amount(adj)
+        return total
+
+
+@dataclass(frozen=True)
+class JobFilter:
+    """Which historical jobs a pricing simulation covers (None = no restriction)"""
+
+    statuses: Optional[Tuple[str, ...]] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None  # exclusive
+
+
+def _month_key(created_at: Optional[datetime]) -> Optional[int]:
+    return created_at.year * 100 + created_at.month if created_at is not None else None
+
 
 class PricingEngine:
     """
@@ -36,10 +259,50 @@ class PricingEngine:
         'extreme': Decimal('2.0')
     }
 
+    SIMULATION_CHUNK_SIZE = 10000  # rooms fetched per round trip
+
+    # Seconds between checks of pricing_rules for changes
+    RULES_CHECK_INTERVAL = float(os.getenv("PRICING_RULES_CHECK_INTERVAL", "30"))
+
+    # Used for unknown class names (medium / moderate defaults)
+    FALLBACK_SIZE_MULTIPLIER = Decimal('1.5')
+    FALLBACK_WORKLOAD_MULTIPLIER = Decimal('1.3')
+
     def __init__(self):
-        self.base_labor_rate = self.DEFAULT_BASE_LABOR
-        self.size_multipliers = self.DEFAULT_SIZE_MULTIPLIERS.copy()
-        self.workload_multipliers = self.DEFAULT_WORKLOAD_MULTIPLIERS.copy()
+        self.rules_version = 0  # bumped by invalidate_rules()
+        self._checked_version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()  # guards claiming a rules check and swapping snapshots
+
+        self._snapshot = self.build_snapshot(
+            self.DEFAULT_BASE_LABOR,
+            self.DEFAULT_SIZE_MULTIPLIERS,
+            self.DEFAULT_WORKLOAD_MULTIPLIERS,
+            None
+        )
+
+    # Current rates, read from the snapshot (change them with apply_rules)
+
+    @property
+    def base_labor_rate(self) -> Decimal:
+        return self._snapshot.base_labor_rate
+
+    @property
+    def size_multipliers(self) -> Mapping[str, Decimal]:
+        return self._snapshot.size_multipliers
+
+    @property
+    def workload_multipliers(self) -> Mapping[str, Decimal]:
+        return self._snapshot.workload_multipliers
+
+    @property
+    def rules(self) -> Optional[PricingRuleTable]:
+        """Compiled pricing_rules in use (None = defaults only)"""
+        return self._snapshot.rules
+
+    def snapshot(self) -> PricingSnapshot:
+        """Rates, rules and cost table currently used for pricing"""
+        return self._snapshot
 
     def calculate_room_cost(
         self,
@@ -58,24 +321,93 @@ class PricingEngine:
         Returns:
             Decimal: Total cost for room
         """
-        # Get multipliers
-        size_mult = self.size_multipliers.get(size_class, Decimal('1.5'))
-        workload_mult = self.workload_multipliers.get(workload_class, Decimal('1.3'))
+        snapshot = self._snapshot
 
-        # Base calculation: base_rate * size * workload
-        room_cost = self.base_labor_rate * size_mult * workload_mult
+        # Precomputed base_rate * size * workload, rounded to the cent
+        room_cost = snapshot.room_cost(size_class, workload_class)
 
         # Apply adjustments
         if adjustments:
-            adjustment_total = self._calculate_adjustments(adjustments)
-            room_cost += adjustment_total
+            room_cost += snapshot.adjustments_total(adjustments).quantize(CENTS)
 
-        logger.info(
-            f"Room cost calculated: {size_class}/{workload_class} = ${room_cost:.2f}"
-        )
+        logger.debug("Room cost calculated: %s/%s = $%s", size_class, workload_class, room_cost)
 
         return room_cost
 
+    @classmethod
+    def build_snapshot(
+        cls,
+        base_labor_rate: Decimal,
+        size_multipliers: Mapping[str, Decimal],
+        workload_multipliers: Mapping[str, Decimal],
+        rules: Optional[PricingRuleTable]
+    ) -> PricingSnapshot:
+        """Compile rates into a snapshot, with room costs for every size x workload pair"""
+        sizes = list(size_multipliers.values()) + [cls.FALLBACK_SIZE_MULTIPLIER]
+        workloads = list(workload_multipliers.values()) + [cls.FALLBACK_WORKLOAD_MULTIPLIER]
+        cents = tuple(
+            _to_cents(base_labor_rate * size_mult * workload_mult)
+            for size_mult in sizes
+            for workload_mult in workloads
+        )
+        matrix = CostMatrix(
+            size_codes={name: code for code, name in enumerate(size_multipliers)},
+            workload_codes={name: code for code, name in enumerate(workload_multipliers)},
+            cents=cents,
+            costs=tuple(Decimal(c).scaleb(-2) for c in cents),
+            width=len(workloads),
+        )
+
+        # size -> ({workload: cost}, cost for an unknown workload)
+        rows = {}
+        for size_code in range(len(sizes)):
+            row = matrix.costs[size_code * matrix.width:(size_code + 1) * matrix.width]
+            rows[size_code] = (
+                MappingProxyType({name: row[code] for name, code in matrix.workload_codes.items()}),
+                row[-1],
+            )
+
+        return PricingSnapshot(
+            base_labor_rate=base_labor_rate,
+            size_multipliers=MappingProxyType(dict(size_multipliers)),
+            workload_multipliers=MappingProxyType(dict(workload_multipliers)),
+            rules=rules,
+            matrix=matrix,
+            room_costs=MappingProxyType({name: rows[code] for name, code in matrix.size_codes.items()}),
+            fallback_costs=rows[len(sizes) - 1],
+        )
+
+    def cost_matrix(self) -> CostMatrix:
+        """Cost matrix for the current rates"""
+        return self._snapshot.matrix
+
+    def price_rooms_bulk(
+        self,
+        size_classes: Sequence[str],
+        workload_classes: Sequence[str],
+        adjustments: Optional[Sequence[Optional[List[Dict]]]] = None
+    ) -> List[Decimal]:
+        """
+        Calculate costs for many rooms in one pass
+
+        Args:
+            size_classes: Size class per room
+            workload_classes: Workload class per room
+            adjustments: Optional adjustment list per room
+
+        Returns:
+            List[Decimal]: Cost per room, rounded to the cent
+        """
+        return self._snapshot.price_rooms(size_classes, workload_classes, adjustments)
+
+    @staticmethod
+    def _price_rooms(snapshot: PricingSnapshot, rooms: List[Dict]) -> List[Decimal]:
+        return snapshot.price_rooms(
+            [room.get('size_class', 'medium') for room in rooms],
+            [room.get('workload_class', 'moderate') for room in rooms],
+            [room.get('adjustments') for room in rooms],
+        )
+
     def calculate_job_cost(
         self,
         rooms: List[Dict],
@@ -101,16 +433,12 @@ class PricingEngine:
                 "total": Decimal
             }
         """
+        snapshot = self._snapshot
         room_costs = []
         room_total = Decimal('0.00')
 
-        # Calculate each room
-        for room in rooms:
-            cost = self.calculate_room_cost(
-                size_class=room.get('size_class', 'medium'),
-                workload_class=room.get('workload_class', 'moderate'),
-                adjustments=room.get('adjustments')
-            )
+        # Calculate all rooms in one pass
+        for room, cost in zip(rooms, self._price_rooms(snapshot, rooms)):
             room_costs.append({
                 'room_id': room.get('id'),
                 'name': room.get('name', 'Unnamed Room'),
@@ -126,7 +454,7 @@ class PricingEngine:
 
         if job_adjustments:
             for adj in job_adjustments:
-                amount = Decimal(str(adj.get('amount', 0)))
+                amount = snapshot.adjustment_amount(adj)
                 adjustment_details.append({
                     'type': adj.get('type'),
                     'description': adj.get('description', adj.get('type')),
@@ -153,12 +481,13 @@ class PricingEngine:
             'total': total
         }
 
+    def adjustment_amount(self, adjustment: Dict) -> Decimal:
+        """Explicit amount of an adjustment, else the fee from the matching pricing rule"""
+        return self._snapshot.adjustment_amount(adjustment)
+
     def _calculate_adjustments(self, adjustments: List[Dict]) -> Decimal:
         """Calculate total of adjustments"""
-        total = Decimal('0.00')
-        for adj in adjustments:
-            total += Decimal(str(adj.get('amount', 0)))
-        return total
+        return self._snapshot.adjustments_total(adjustments)
 
     def generate_invoice_line_items(
         self,
@@ -183,16 +512,11 @@ class PricingEngine:
                 ...
             ]
         """
+        snapshot = self._snapshot
         line_items = []
 
         # Room line items
-        for room in rooms:
-            cost = self.calculate_room_cost(
-                size_class=room.get('size_class', 'medium'),
-                workload_class=room.get('workload_class', 'moderate'),
-                adjustments=room.get('adjustments')
-            )
-
+        for room, cost in zip(rooms, self._price_rooms(snapshot, rooms)):
             # Create plain description (no AI jargon)
             room_name = room.get('name', 'Room')
             description = f"{room_name} Cleanout"
@@ -207,31 +531,226 @@ class PricingEngine:
         # Job-level adjustments
         if job_adjustments:
             for adj in job_adjustments:
+                amount = float(snapshot.adjustment_amount(adj))
                 line_items.append({
                     'description': adj.get('description', adj.get('type', 'Adjustment')),
                     'quantity': 1,
-                    'unit_price': float(adj.get('amount', 0)),
-                    'total': float(adj.get('amount', 0))
+                    'unit_price': amount,
+                    'total': amount
                 })
 
         return line_items
 
+    def _candidate_snapshot(self, snapshot: PricingSnapshot, rule_set: PricingRuleTable) -> PricingSnapshot:
+        return self.build_snapshot(
+            rule_set.base_labor_rate or snapshot.base_labor_rate,
+            {**snapshot.size_multipliers, **rule_set.size_multipliers},
+            {**snapshot.workload_multipliers, **rule_set.workload_multipliers},
+            rule_set
+        )
+
+    def candidate(self, rule_set: PricingRuleTable) -> "PricingEngine":
+        """New engine with rule_set's rates layered over this engine's current rates"""
+        engine = PricingEngine()
+        engine._snapshot = self._candidate_snapshot(self._snapshot, rule_set)
+        return engine
+
+    def simulate(
+        self,
+        db_session,
+        rule_set: PricingRuleTable,
+        job_filter: Optional[JobFilter] = None,
+        chunk_size: int = SIMULATION_CHUNK_SIZE
+    ) -> Dict:
+        """
+        Revenue impact of rule_set on historical rooms
+
+        Rooms are streamed with a server-side cursor, chunk_size at a
+        time, and each chunk is reduced to counts per (size class,
+        workload class, job month). Only the distinct keys are then priced,
+        under both the current rates and the candidate ones, so memory
+        depends on the number of buckets rather than the number of rooms.
+        Room costs only, without job-level adjustments.
+
+        Returns:
+            Dict with totals and per-bucket / per-month breakdowns:
+            {
+                "rooms": int,
+                "current_total": Decimal,
+                "candidate_total": Decimal,
+                "delta": Decimal,
+                "by_bucket": [{"size_class", "workload_class", "rooms", "current", "candidate", "delta"}, ...],
+                "by_month": [{"month": "YYYY-MM", "rooms", "current", "candidate", "delta"}, ...]
+            }
+        """
+        from database.models import Job, Room
+
+        query = (
+            db_session.query(Room.final_size_class, Room.final_workload_class, Job.created_at)
+            .join(Job, Room.job_id == Job.id)
+        )
+        if job_filter is not None:
+            if job_filter.statuses:
+                query = query.filter(Job.status.in_(job_filter.statuses))
+            if job_filter.created_from is not None:
+                query = query.filter(Job.created_at >= job_filter.created_from)
+            if job_filter.created_to is not None:
+                query = query.filter(Job.created_at < job_filter.created_to)
+
+        counts = Counter()
+        result = db_session.execute(query.statement.execution_options(yield_per=chunk_size))
+        for chunk in result.partitions():
+            counts.update(
+                (size_class, workload_class, _month_key(created_at))
+                for size_class, workload_class, created_at in chunk
+            )
+
+        keys = list(counts)
+        sizes = [key[0] for key in keys]
+        workloads = [key[1] for key in keys]
+        snapshot = self._snapshot
+        current_costs = snapshot.price_rooms(sizes, workloads)
+        candidate_costs = self._candidate_snapshot(snapshot, rule_set).price_rooms(sizes, workloads)
+
+        zero = Decimal('0.00')
+        buckets: Dict[Tuple, List] = {}
+        months: Dict[Optional[int], List] = {}
+        for key, current_cost, candidate_cost in zip(keys, current_costs, candidate_costs):
+            rooms = counts[key]
+            for totals in (
+                buckets.setdefault(key[:2], [0, zero, zero]),
+                months.setdefault(key[2], [0, zero, zero]),
+            ):
+                totals[0] += rooms
+                totals[1] += current_cost * rooms
+                totals[2] += candidate_cost * rooms
+
+        def row(rooms, current, candidate, **labels):
+            return {**labels, 'rooms': rooms, 'current': current,
+                    'candidate': candidate, 'delta': candidate - current}
+
+        current_total = sum((totals[1] for totals in months.values()), zero)
+        candidate_total = sum((totals[2] for totals in months.values()), zero)
+
+        return {
+            'rooms': sum(counts.values()),
+            'current_total': current_total,
+            'candidate_total': candidate_total,
+            'delta': candidate_total - current_total,
+            'by_bucket': [
+                row(*totals, size_class=size_class, workload_class=workload_class)
+                for (size_class, workload_class), totals in sorted(
+                    buckets.items(), key=lambda item: (str(item[0][0]), str(item[0][1]))
+                )
+            ],
+            'by_month': [
+                row(*totals, month=f"{month // 100:04d}-{month % 100:02d}" if month else None)
+                for month, totals in sorted(months.items(), key=lambda item: item[0] or 0)
+            ],
+        }
+
+    def apply_rules(self, rules: Optional[PricingRuleTable]):
+        """Price with rules from now on (None = defaults); unset classes keep their defaults"""
+        overrides = rules if rules is not None else compile_pricing_rules([])
+
+        # Compiled aside and published with one assignment
+        snapshot = self.build_snapshot(
+            overrides.base_labor_rate or self.DEFAULT_BASE_LABOR,
+            {**self.DEFAULT_SIZE_MULTIPLIERS, **overrides.size_multipliers},
+            {**self.DEFAULT_WORKLOAD_MULTIPLIERS, **overrides.workload_multipliers},
+            rules
+        )
+        with self._lock:
+            self._snapshot = snapshot
+
+    @staticmethod
+    def _rules_watermark(db_session) -> Tuple:
+        from sqlalchemy import func
+        from database.models import PricingRule
+
+        count, updated_at = db_session.query(
+            func.count(PricingRule.id), func.max(PricingRule.updated_at)
+        ).one()
+        return count, updated_at
+
     def load_pricing_rules_from_db(self, db_session):
         """
         Load pricing rules from database
 
-        Updates multipliers based on active pricing_rules table
+        Compiles active pricing_rules (highest priority first) into a
+        PricingRuleTable and prices with it.
         """
-        # TODO: Implement when database models are ready
-        pass
+        from database.models import PricingRule
+
+        watermark = self._rules_watermark(db_session)
+        rules = (
+            db_session.query(PricingRule)
+            .filter(PricingRule.active.is_(True))
+            .order_by(PricingRule.priority.desc())
+            .all()
+        )
+        self.apply_rules(compile_pricing_rules(rules, watermark))
+        logger.info(f"Loaded {len(rules)} pricing rules")
+
+    def invalidate_rules(self):
+        """Make the next refresh_rules check the database (call after changing pricing_rules)"""
+        self.rules_version += 1
+
+    def refresh_rules(self, db_session) -> bool:
+        """
+        Reload pricing rules if they changed; returns True if reloaded
+
+        The (row count, latest updated_at) watermark is checked at most
+        every RULES_CHECK_INTERVAL seconds, or right away after
+        invalidate_rules(), so most calls are free. The first caller to
+        find a check due claims it and runs the queries; concurrent callers
+        (worker threads, or coroutines on the event loop via run_sync)
+        don't wait for it but keep pricing with the current snapshot until
+        the new one is swapped in. No lock is held during the queries. They
+        run in a savepoint, so a failure is rolled back without aborting
+        the caller's transaction.
+        """
+        if not self._claim_check(time.monotonic()):
+            return False
+
+        try:
+            with db_session.begin_nested():
+                rules = self.rules
+                if rules is not None and self._rules_watermark(db_session) == rules.watermark:
+                    return False
+                self.load_pricing_rules_from_db(db_session)
+        except Exception as e:
+            logger.warning(f"Could not load pricing rules, keeping current rates: {e}")
+            return False
+        return True
+
+    def _claim_check(self, now: float) -> bool:
+        """True if a check is due and this caller now owns it"""
+        if not self._check_due(now):
+            return False
+
+        with self._lock:
+            if not self._check_due(now):
+                return False
+            self._checked_version = self.rules_version
+            self._checked_at = now
+            return True
+
+    def _check_due(self, now: float) -> bool:
+        return (
+            self._checked_version != self.rules_version
+            or now - self._checked_at >= self.RULES_CHECK_INTERVAL
+        )
 
 
 # Singleton instance
 _pricing_engine = None
 
-def get_pricing_engine() -> PricingEngine:
-    """Get pricing engine singleton"""
+def get_pricing_engine(db_session=None) -> PricingEngine:
+    """Get pricing engine singleton (refreshing its rules if db_session is given)"""
     global _pricing_engine
     if _pricing_engine is None:
         _pricing_engine = PricingEngine()
+    if db_session is not None:
+        _pricing_engine.refresh_rules(db_session)
     return _pricing_engine
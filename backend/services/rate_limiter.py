@@ -0,0 +1,158 @@
+"""
+Rate Limiter
+Async token buckets keyed by host or channel (facebook.com, smtp, twilio)
+Callers wait exactly as long as the configured rate requires, no longer
+"""
+
+import asyncio
+import os
+import time
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse
+import logging
+
+logger = logging.getLogger(__name__)
+
+# key -> (requests per second, burst)
+DEFAULT_RATE_LIMITS: Dict[str, Tuple[float, int]] = {
+    "facebook.com": (0.5, 2),
+    "craigslist.org": (1.0, 3),
+    "smtp": (2.0, 5),
+    "twilio": (1.0, 1),  # Twilio long codes send ~1 message/sec
+}
+DEFAULT_RATE = (1.0, 1)
+
+
+class TokenBucket:
+    """
+    Token bucket: refills at rate tokens/sec up to burst tokens
+
+    acquire() takes a token immediately when one is available,
+    otherwise sleeps until the next token is due.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, clock: Callable[[], float] = time.monotonic):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        """Take a token without waiting; False if none is available"""
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    async def acquire(self):
+        """Wait for and take one token (callers are served in arrival order)"""
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._loop is not loop:
+            # asyncio.Lock binds to one event loop; the shared limiter may outlive it
+            self._lock = asyncio.Lock()
+            self._loop = loop
+
+        async with self._lock:
+            while not self.try_acquire():
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class RateLimiter:
+    """
+    Token buckets per host or channel
+
+    Host keys match subdomains, so "detroit.craigslist.org" and
+    "annarbor.craigslist.org" share the "craigslist.org" bucket.
+    Unknown keys get their own bucket with the default rate.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, Tuple[float, int]]] = None,
+        default: Tuple[float, int] = DEFAULT_RATE,
+    ):
+        self.limits = dict(DEFAULT_RATE_LIMITS if limits is None else limits)
+        self.default = default
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def resolve(self, key: str) -> str:
+        """Configured key for a host/channel (longest matching domain suffix)"""
+        key = key.lower()
+        if key.startswith("www."):
+            key = key[4:]
+
+        parts = key.split(".")
+        for i in range(len(parts)):
+            candidate = ".".join(parts[i:])
+            if candidate in self.limits:
+                return candidate
+        return key
+
+    def bucket(self, key: str) -> TokenBucket:
+        """Bucket for key, created on first use"""
+        key = self.resolve(key)
+        if key not in self._buckets:
+            rate, burst = self.limits.get(key, self.default)
+            self._buckets[key] = TokenBucket(rate, burst)
+        return self._buckets[key]
+
+    async def acquire(self, key: str):
+        """Wait for a token for host/channel key"""
+        await self.bucket(key).acquire()
+
+    async def acquire_url(self, url: str):
+        """Wait for a token for the host of url"""
+        await self.acquire(urlparse(url).netloc)
+
+
+def parse_rate_limits(spec: str) -> Dict[str, Tuple[float, int]]:
+    """
+    Parse "facebook.com=0.5:2,smtp=5" into {key: (rate, burst)}
+
+    Burst defaults to 1 when omitted.
+    """
+    limits = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        key, _, value = item.partition("=")
+        rate, _, burst = value.partition(":")
+        limits[key.strip().lower()] = (float(rate), int(burst) if burst else 1)
+    return limits
+
+
+# Singleton instance
+_rate_limiter = None
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Get shared rate limiter singleton
+
+    RATE_LIMITS (e.g. "craigslist.org=2:4,smtp=5") overrides the defaults per key.
+    """
+    global _rate_limiter
+    if _rate_limiter is None:
+        limits = dict(DEFAULT_RATE_LIMITS)
+        spec = os.getenv("RATE_LIMITS")
+        if spec:
+            try:
+                limits.update(parse_rate_limits(spec))
+            except ValueError as e:
+                logger.warning(f"Ignoring invalid RATE_LIMITS: {e}")
+        _rate_limiter = RateLimiter(limits)
+    return _rate_limiter
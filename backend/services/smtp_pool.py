@@ -0,0 +1,167 @@
+"""
+SMTP Connection Pool
+Keeps N authenticated SMTP connections open and sends on them off the event loop
+One TCP+TLS+AUTH handshake per connection, not per message
+"""
+
+import asyncio
+import os
+import queue
+import smtplib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from email.message import Message
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# The server answered and refused the message; the connection is still usable
+REJECTION_ERRORS = (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused)
+
+# Errors after which a connection is discarded and the message retried on a new one
+# (smtplib exceptions are OSErrors too, so rejections must be caught first)
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, OSError)
+
+
+class SMTPPool:
+    """
+    Pool of persistent SMTP connections
+
+    send() runs on a dedicated thread pool with one thread per connection,
+    so the event loop never blocks on the network. Each thread takes an idle
+    connection, opening and authenticating it only if it is new or was
+    dropped, and messages sent back-to-back on it skip the handshake.
+    A connection the server has closed (idle timeout, restart) is
+    reopened and the message retried once.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 587,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        size: int = 4,
+        starttls: bool = True,
+        timeout: float = 30.0,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.size = size
+        self.starttls = starttls
+        self.timeout = timeout
+
+        self.connects = 0
+        self.sent = 0
+
+        # Idle connection slots; None means "not connected yet"
+        self._idle: "queue.LifoQueue[Optional[smtplib.SMTP]]" = queue.LifoQueue()
+        for _ in range(size):
+            self._idle.put(None)
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.size, thread_name_prefix="smtp"
+                )
+            return self._executor
+
+    def _connect(self) -> smtplib.SMTP:
+        if self.port == 465:
+            conn = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls and self.port != 465:
+                conn.starttls()
+            if self.username:
+                conn.login(self.username, self.password or "")
+        except Exception:
+            self._discard(conn)
+            raise
+
+        with self._lock:
+            self.connects += 1
+        return conn
+
+    @staticmethod
+    def _discard(conn: Optional[smtplib.SMTP]):
+        if conn is None:
+            return
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _send_blocking(self, msg: Message):
+        conn = self._idle.get()
+        try:
+            for attempt in range(2):
+                if conn is None:
+                    conn = self._connect()
+                try:
+                    conn.send_message(msg)
+                    with self._lock:
+                        self.sent += 1
+                    return
+                except REJECTION_ERRORS:
+                    raise
+                except CONNECTION_ERRORS:
+                    # Stale or dropped connection: reconnect and retry once
+                    self._discard(conn)
+                    conn = None
+                    if attempt:
+                        raise
+        except REJECTION_ERRORS:
+            raise
+        except Exception:
+            self._discard(conn)
+            conn = None
+            raise
+        finally:
+            self._idle.put(conn)
+
+    async def send(self, msg: Message):
+        """Send msg on a pooled connection; raises smtplib errors on failure"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._get_executor(), self._send_blocking, msg)
+
+    def close(self):
+        """QUIT all open connections and stop the threads (reopened on next send)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+        connections = [self._idle.get() for _ in range(self.size)]
+        for conn in connections:
+            if conn is not None:
+                try:
+                    conn.quit()
+                except Exception:
+                    self._discard(conn)
+            self._idle.put(None)
+
+
+# Singleton instance
+_smtp_pool = None
+
+def get_smtp_pool() -> SMTPPool:
+    """Get shared SMTP pool singleton (SMTP_* settings, SMTP_POOL_SIZE connections)"""
+    global _smtp_pool
+    if _smtp_pool is None:
+        _smtp_pool = SMTPPool(
+            host=os.getenv("SMTP_SERVER", "smtp.gmail.com"),
+            port=int(os.getenv("SMTP_PORT", "587")),
+            username=os.getenv("SMTP_USERNAME"),
+            password=os.getenv("SMTP_PASSWORD"),
+            size=int(os.getenv("SMTP_POOL_SIZE", "4")),
+        )
+    return _smtp_pool
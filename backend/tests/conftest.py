@@ -2,15 +2,22 @@
 Pytest configuration and fixtures for CleanoutPro tests
 """
 
+import os
 import pytest
 from sqlalchemy import create_engine, event, TypeDecorator, String
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from fastapi.testclient import TestClient
 import uuid
 from datetime import datetime, timedelta
 import json
 
-from database.connection import Base, get_db
+# Don't start background classification workers against the real database;
+# tests drive ClassificationWorkerPool directly
+os.environ["AI_CLASSIFICATION_WORKERS"] = "0"
+
+from database.connection import Base, get_db, get_async_db, get_async_session_factory
 from database.models import Customer, Job, Room, Invoice, PricingRule
 from api.main import app
 
@@ -73,6 +80,7 @@ for model_name in dir(models):
 
 # Test database URL (use file-based SQLite for compatibility)
 TEST_DATABASE_URL = "sqlite:///./test.db"
+TEST_ASYNC_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
 
 
 @pytest.fixture(scope="function")
@@ -113,12 +121,28 @@ def client(test_db):
         finally:
             pass
 
+    # Async routes get their own sessions on the same SQLite file.
+    # NullPool: TestClient runs the app on its own event loop, so no
+    # connections may outlive a request.
+    async_engine = create_async_engine(TEST_ASYNC_DATABASE_URL, poolclass=NullPool)
+    TestingAsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as session:
+            yield session
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_session_factory] = lambda: TestingAsyncSessionLocal
 
     with TestClient(app) as test_client:
         yield test_client
 
     app.dependency_overrides.clear()
+    # Rows written through the API are not in test_db's identity map
+    test_db.expire_all()
 
 
 @pytest.fixture
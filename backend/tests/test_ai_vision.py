@@ -4,7 +4,7 @@ Tests the Ollama LLaVA integration and room classification
 """
 
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, patch, MagicMock, AsyncMock
 import json
 
 from services.ai_vision import AIVisionService, get_ai_vision_service
@@ -113,6 +113,57 @@ class TestAIVisionService:
         assert result['workload_class'] == 'moderate'
         assert result['confidence'] == 0.0
 
+    async def test_classify_room_async_success(self, mock_image_data, mock_ai_classification):
+        """Test async classification through the pooled httpx client"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            'response': json.dumps(mock_ai_classification)
+        }
+
+        service = AIVisionService()
+        with patch.object(
+            service._get_async_client(), 'post', new=AsyncMock(return_value=mock_response)
+        ) as mock_post:
+            result = await service.classify_room_async(
+                image_data=mock_image_data,
+                room_name="Master Bedroom"
+            )
+
+        assert result['size_class'] == 'large'
+        assert result['workload_class'] == 'heavy'
+        assert 'processing_time' in result
+
+        mock_post.assert_awaited_once()
+        assert mock_post.call_args.kwargs['json']['model'] == 'llava:7b'
+
+        await service.aclose()
+
+    async def test_classify_room_async_api_error(self, mock_image_data):
+        """Test async classification falls back on Ollama errors"""
+        service = AIVisionService()
+        with patch.object(
+            service._get_async_client(), 'post', new=AsyncMock(side_effect=Exception("Timeout"))
+        ):
+            result = await service.classify_room_async(image_data=mock_image_data)
+
+        assert result['size_class'] == 'medium'
+        assert result['workload_class'] == 'moderate'
+        assert result['confidence'] == 0.0
+        assert 'error' in result
+
+        await service.aclose()
+
+    async def test_async_client_is_shared(self):
+        """Test that the pooled client is reused across calls"""
+        service = AIVisionService()
+        client1 = service._get_async_client()
+        client2 = service._get_async_client()
+        assert client1 is client2
+
+        await service.aclose()
+        assert client1.is_closed
+
     def test_parse_classification_valid_json(self):
         """Test parsing valid JSON classification"""
         service = AIVisionService()
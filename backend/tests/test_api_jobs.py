@@ -4,7 +4,10 @@ Tests CRUD operations and job management
 """
 
 import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
 from datetime import datetime, timedelta
+from decimal import Decimal
+import json
 import uuid
 
 
@@ -294,3 +297,132 @@ class TestJobsAPI:
         """Test getting estimate for non-existent job"""
         response = client.get(f"/api/jobs/{uuid.uuid4()}/estimate")
         assert response.status_code == 404
+
+    @patch('services.ai_vision.get_ai_vision_service')
+    def test_classify_job_rooms_streams_results(
+        self,
+        mock_ai_service,
+        client,
+        test_db,
+        sample_job,
+        tmp_path,
+        mock_image_data,
+        mock_ai_classification
+    ):
+        """Test batch classification of all rooms in a job"""
+        from database.models import Job, Room
+
+        for number in range(1, 4):
+            image_path = tmp_path / f"room{number}.jpg"
+            image_path.write_bytes(mock_image_data)
+            test_db.add(Room(
+                job_id=sample_job.id,
+                name=f"Room {number}",
+                room_number=number,
+                image_path=str(image_path),
+                final_size_class="medium",
+                final_workload_class="moderate",
+                estimated_cost=0
+            ))
+        test_db.commit()
+        job_id = sample_job.id
+
+        mock_service = MagicMock()
+        mock_service.classify_room_async = AsyncMock(return_value=mock_ai_classification)
+        mock_ai_service.return_value = mock_service
+
+        response = client.post(f"/api/jobs/{job_id}/classify?concurrency=2")
+        assert response.status_code == 200
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        room_results, summary = lines[:-1], lines[-1]
+
+        assert len(room_results) == 3
+        assert all(r['status'] == 'classified' for r in room_results)
+        assert all(r['estimated_cost'] == 480.0 for r in room_results)
+
+        assert summary['rooms_classified'] == 3
+        assert summary['rooms_failed'] == 0
+        assert summary['ai_estimate'] == 1440.0
+        assert mock_service.classify_room_async.await_count == 3
+
+        # The API wrote through its own session
+        test_db.expire_all()
+        job = test_db.query(Job).filter(Job.id == job_id).one()
+        assert job.ai_estimate == Decimal('1440.00')
+        assert job.final_price == Decimal('1440.00')
+
+    @patch('services.ai_vision.get_ai_vision_service')
+    def test_classify_job_rooms_missing_image(self, mock_ai_service, client, sample_job, sample_room):
+        """Test rooms without an image are reported as failed"""
+        mock_service = MagicMock()
+        mock_service.classify_room_async = AsyncMock()
+        mock_ai_service.return_value = mock_service
+
+        response = client.post(f"/api/jobs/{sample_job.id}/classify")
+        assert response.status_code == 200
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines[0]['status'] == 'failed'
+        assert lines[-1]['rooms_failed'] == 1
+        mock_service.classify_room_async.assert_not_awaited()
+
+    @patch('services.ai_vision.get_ai_vision_service')
+    async def test_classify_stream_stopped_early_updates_totals(
+        self,
+        mock_ai_service,
+        client,
+        test_db,
+        sample_job,
+        tmp_path,
+        mock_image_data,
+        mock_ai_classification
+    ):
+        """Test job totals cover the rooms written before the client went away"""
+        from api.main import app
+        from api.routes.jobs import _classify_rooms_stream
+        from database.connection import get_async_session_factory
+        from database.models import Job, Room
+
+        rooms = []
+        for number in range(1, 4):
+            image_path = tmp_path / f"room{number}.jpg"
+            image_path.write_bytes(mock_image_data)
+            room = Room(
+                job_id=sample_job.id,
+                name=f"Room {number}",
+                room_number=number,
+                image_path=str(image_path),
+                final_size_class="medium",
+                final_workload_class="moderate",
+                estimated_cost=0
+            )
+            test_db.add(room)
+            rooms.append(room)
+        test_db.commit()
+        job_id = sample_job.id
+
+        mock_service = MagicMock()
+        mock_service.classify_room_async = AsyncMock(return_value=mock_ai_classification)
+        mock_ai_service.return_value = mock_service
+
+        stream = _classify_rooms_stream(
+            app.dependency_overrides[get_async_session_factory](),
+            job_id,
+            [(room.id, room.name, room.image_path) for room in rooms],
+            1,
+            False
+        )
+        first = json.loads(await stream.__anext__())
+        assert first['status'] == 'classified'
+        await stream.aclose()  # Client disconnected
+
+        test_db.expire_all()
+        job = test_db.query(Job).filter(Job.id == job_id).one()
+        assert job.ai_estimate == Decimal('480.00')
+        assert job.final_price == Decimal('480.00')
+
+    def test_classify_job_rooms_not_found(self, client):
+        """Test batch classification of non-existent job"""
+        response = client.post(f"/api/jobs/{uuid.uuid4()}/classify")
+        assert response.status_code == 404
@@ -0,0 +1,48 @@
+"""
+Tests for Pricing API endpoints
+Tests the what-if repricing simulator
+"""
+
+import uuid
+from datetime import datetime
+
+from database.models import Job, Room
+
+
+class TestPricingAPI:
+    """Test Pricing API endpoints"""
+
+    def test_simulate_empty(self, client, test_db):
+        """Test simulating with no jobs"""
+        response = client.post("/api/pricing/simulate", json={"base_labor_rate": "175.00"})
+        assert response.status_code == 200
+
+        result = response.json()
+        assert result['rooms'] == 0
+        assert result['delta'] == 0
+        assert result['by_bucket'] == []
+
+    def test_simulate_rate_change(self, client, test_db, sample_customer):
+        """Test revenue delta of a workload multiplier change"""
+        job = Job(id=uuid.uuid4(), customer_id=sample_customer.id, job_number="JOB-API-SIM",
+                  status="completed", property_address="1 Test St", created_at=datetime(2025, 3, 2))
+        test_db.add(job)
+        for number in range(1, 4):
+            test_db.add(Room(id=uuid.uuid4(), job_id=job.id, name=f"Room {number}", room_number=number,
+                             final_size_class="medium", final_workload_class="moderate"))
+        test_db.commit()
+
+        response = client.post("/api/pricing/simulate", json={
+            "workload_multipliers": {"moderate": "1.5"},
+            "statuses": ["completed"]
+        })
+        assert response.status_code == 200
+
+        # medium/moderate: 150 * 1.5 * 1.3 = 292.50 -> 150 * 1.5 * 1.5 = 337.50
+        result = response.json()
+        assert result['rooms'] == 3
+        assert result['current_total'] == 877.5
+        assert result['candidate_total'] == 1012.5
+        assert result['by_month'] == [{
+            'month': '2025-03', 'rooms': 3, 'current': 877.5, 'candidate': 1012.5, 'delta': 135.0
+        }]
@@ -4,10 +4,12 @@ Tests image upload, AI classification, and human overrides
 """
 
 import pytest
-from unittest.mock import patch, MagicMock, mock_open
+from unittest.mock import patch, MagicMock, AsyncMock, mock_open
 import uuid
 import io
 
+from database.models import SyncQueue
+
 
 class TestRoomsAPI:
     """Test Rooms API endpoints"""
@@ -70,25 +72,17 @@ class TestRoomsAPI:
         assert len(rooms) == 1
         assert rooms[0]['job_id'] == str(sample_job.id)
 
-    @patch('services.ai_vision.get_ai_vision_service')
     @patch('builtins.open', new_callable=mock_open)
     @patch('os.makedirs')
     def test_upload_room_success(
         self,
         mock_makedirs,
         mock_file_open,
-        mock_ai_service,
         client,
         sample_job,
-        mock_image_data,
-        mock_ai_classification
+        mock_image_data
     ):
-        """Test successful room upload with AI classification"""
-        # Mock AI service
-        mock_service = MagicMock()
-        mock_service.classify_room.return_value = mock_ai_classification
-        mock_ai_service.return_value = mock_service
-
+        """Test room upload returns immediately with a pending room"""
         # Create file upload
         files = {
             'image': ('test_room.jpg', io.BytesIO(mock_image_data), 'image/jpeg')
@@ -100,56 +94,14 @@ class TestRoomsAPI:
         }
 
         response = client.post("/api/rooms", files=files, data=data)
-        assert response.status_code == 201
+        assert response.status_code == 202
 
         room = response.json()
         assert room['name'] == 'Living Room'
         assert room['room_number'] == 1
-        assert room['ai_size_class'] == 'large'
-        assert room['ai_workload_class'] == 'heavy'
-        assert room['ai_confidence'] == 0.87
-        assert room['final_size_class'] == 'large'
-        assert room['final_workload_class'] == 'heavy'
-        assert room['estimated_cost'] > 0
-
-        # Verify AI service was called
-        mock_service.classify_room.assert_called_once()
-
-    @patch('services.ai_vision.get_ai_vision_service')
-    @patch('builtins.open', new_callable=mock_open)
-    @patch('os.makedirs')
-    def test_upload_room_ai_failure_fallback(
-        self,
-        mock_makedirs,
-        mock_file_open,
-        mock_ai_service,
-        client,
-        sample_job,
-        mock_image_data
-    ):
-        """Test that room upload falls back to defaults when AI fails"""
-        # Mock AI service failure
-        mock_service = MagicMock()
-        mock_service.classify_room.side_effect = Exception("AI service error")
-        mock_ai_service.return_value = mock_service
-
-        files = {
-            'image': ('test_room.jpg', io.BytesIO(mock_image_data), 'image/jpeg')
-        }
-        data = {
-            'job_id': str(sample_job.id),
-            'room_name': 'Bedroom',
-            'room_number': '2'
-        }
-
-        response = client.post("/api/rooms", files=files, data=data)
-        assert response.status_code == 201
-
-        room = response.json()
-        # Should use fallback values
-        assert room['ai_size_class'] == 'medium'
-        assert room['ai_workload_class'] == 'moderate'
-        assert room['ai_confidence'] == 0.0
+        assert room['status'] == 'pending'
+        assert room['ai_size_class'] is None
+        assert room['estimated_cost'] == 0
 
     def test_upload_room_job_not_found(self, client, mock_image_data):
         """Test uploading room to non-existent job"""
@@ -427,3 +379,87 @@ class TestRoomsAPI:
         """Test reprocessing non-existent room"""
         response = client.post(f"/api/rooms/{uuid.uuid4()}/reprocess")
         assert response.status_code == 404
+
+    @pytest.fixture
+    def queued_room(self, test_db, sample_room, tmp_path, mock_image_data):
+        """sample_room with an image on disk and a pending classification job"""
+        image_path = tmp_path / "room.jpg"
+        image_path.write_bytes(mock_image_data)
+        sample_room.image_path = str(image_path)
+        sample_room.status = 'pending'
+        item = SyncQueue(
+            device_id="server",
+            entity_type="room",
+            entity_id=sample_room.id,
+            action="classify",
+            payload={},
+            status='pending'
+        )
+        test_db.add(item)
+        test_db.commit()
+        return sample_room, item
+
+    async def reprocess(self, room_id):
+        """Call the route directly; RoomResponse can't serialize SQLite UUIDs"""
+        from api.main import app
+        from api.routes.rooms import reprocess_room
+        from database.connection import get_async_session_factory
+
+        session_factory = app.dependency_overrides[get_async_session_factory]()
+        async with session_factory() as db:
+            return await reprocess_room(str(room_id), db=db)
+
+    @patch('services.ai_vision.get_ai_vision_service')
+    async def test_reprocess_failed_room_is_classified(
+        self, mock_ai_service, client, queued_room, mock_ai_classification, test_db
+    ):
+        """Test that a successful reprocess clears a worker failure"""
+        room, item = queued_room
+        room.status = 'failed'
+        item.status = 'failed'
+        test_db.commit()
+        mock_ai_service.return_value.classify_room_async = AsyncMock(return_value=mock_ai_classification)
+
+        assert (await self.reprocess(room.id)).status == 'classified'
+
+        test_db.expire_all()
+        assert room.status == 'classified'
+        assert item.status == 'failed'
+
+    @patch('services.ai_vision.get_ai_vision_service')
+    async def test_reprocess_pending_room_drops_queued_job(
+        self, mock_ai_service, client, queued_room, mock_ai_classification, test_db
+    ):
+        """Test that a queued room is classified now instead of again by a worker"""
+        room, item = queued_room
+        mock_ai_service.return_value.classify_room_async = AsyncMock(return_value=mock_ai_classification)
+
+        await self.reprocess(room.id)
+
+        test_db.expire_all()
+        assert room.status == 'classified'
+        assert item.status == 'completed'
+
+    @patch('services.ai_vision.get_ai_vision_service')
+    async def test_reprocess_fallback_keeps_queued_job(
+        self, mock_ai_service, client, queued_room, mock_ai_classification, test_db
+    ):
+        """Test that an AI failure leaves a queued room to the worker's retries"""
+        room, item = queued_room
+        fallback = dict(mock_ai_classification, error="Ollama unavailable")
+        mock_ai_service.return_value.classify_room_async = AsyncMock(return_value=fallback)
+
+        await self.reprocess(room.id)
+
+        test_db.expire_all()
+        assert room.status == 'pending'
+        assert item.status == 'pending'
+
+    def test_reprocess_room_being_processed(self, client, queued_room, test_db):
+        """Test that a room a worker holds can't be reprocessed concurrently"""
+        room, _ = queued_room
+        room.status = 'processing'
+        test_db.commit()
+
+        response = client.post(f"/api/rooms/{room.id}/reprocess")
+        assert response.status_code == 409
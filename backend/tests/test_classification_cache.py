@@ -0,0 +1,159 @@
+"""
+Tests for Classification Cache
+Tests content-addressed keys, LRU eviction and hit/miss counters
+"""
+
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+import json
+import threading
+
+from services.ai_vision import AIVisionService
+from services.classification_cache import ClassificationCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Fresh on-disk cache per test"""
+    cache = ClassificationCache(db_path=str(tmp_path / "cache.db"))
+    yield cache
+    cache.close()
+
+
+class TestClassificationCache:
+    """Test classification cache behavior"""
+
+    def test_make_key_is_content_addressed(self):
+        """Test that keys depend on image bytes, model, ultrathink and prompt"""
+        key = ClassificationCache.make_key(b'image', 'llava:7b', True, 'prompt')
+
+        assert key == ClassificationCache.make_key(b'image', 'llava:7b', True, 'prompt')
+        assert key != ClassificationCache.make_key(b'other', 'llava:7b', True, 'prompt')
+        assert key != ClassificationCache.make_key(b'image', 'llava:13b', True, 'prompt')
+        assert key != ClassificationCache.make_key(b'image', 'llava:7b', False, 'prompt')
+        assert key != ClassificationCache.make_key(b'image', 'llava:7b', True, 'prompt v2')
+
+    def test_get_put_and_counters(self, cache, mock_ai_classification):
+        """Test hit/miss counters"""
+        assert cache.get('missing') is None
+
+        cache.put('key', mock_ai_classification)
+        assert cache.get('key') == mock_ai_classification
+
+        stats = cache.stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['entries'] == 1
+        assert stats['size_bytes'] > 0
+
+    def test_persists_across_instances(self, tmp_path, mock_ai_classification):
+        """Test that entries survive reopening the cache"""
+        path = str(tmp_path / "cache.db")
+
+        first = ClassificationCache(db_path=path)
+        first.put('key', mock_ai_classification)
+        first.close()
+
+        second = ClassificationCache(db_path=path)
+        assert second.get('key') == mock_ai_classification
+        assert second.stats()['size_bytes'] == first._total_bytes
+        second.close()
+
+    def test_lru_eviction_by_size(self, tmp_path):
+        """Test that least-recently-used entries are evicted over max_bytes"""
+        entry = {'size_class': 'large', 'reasoning': 'x' * 100}
+        entry_size = len(json.dumps(entry))
+
+        cache = ClassificationCache(db_path=str(tmp_path / "cache.db"), max_bytes=entry_size * 2)
+        cache.put('a', entry)
+        cache.put('b', entry)
+
+        # Touch 'a' so 'b' becomes least recently used
+        cache.get('a')
+        cache.put('c', entry)
+
+        assert cache.get('b') is None
+        assert cache.get('a') == entry
+        assert cache.get('c') == entry
+        assert cache.stats()['evictions'] == 1
+        cache.close()
+
+
+class TestAIVisionServiceCaching:
+    """Test AIVisionService integration with the cache"""
+
+    @patch('services.ai_vision.requests.post')
+    def test_repeat_classification_hits_cache(
+        self, mock_post, cache, mock_image_data, mock_ai_classification
+    ):
+        """Test that an identical image skips the Ollama call"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {'response': json.dumps(mock_ai_classification)}
+        mock_post.return_value = mock_response
+
+        service = AIVisionService(cache=cache)
+        first = service.classify_room(mock_image_data, room_name="Kitchen")
+        second = service.classify_room(mock_image_data, room_name="Kitchen")
+
+        assert mock_post.call_count == 1
+        assert second['size_class'] == first['size_class']
+        assert second['cache_hit'] is True
+        assert cache.stats()['hits'] == 1
+
+    @patch('services.ai_vision.requests.post')
+    def test_use_cache_false_bypasses_cache(
+        self, mock_post, cache, mock_image_data, mock_ai_classification
+    ):
+        """Test that use_cache=False always calls Ollama"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {'response': json.dumps(mock_ai_classification)}
+        mock_post.return_value = mock_response
+
+        service = AIVisionService(cache=cache)
+        service.classify_room(mock_image_data)
+        service.classify_room(mock_image_data, use_cache=False)
+
+        assert mock_post.call_count == 2
+
+    @patch('services.ai_vision.requests.post')
+    def test_failed_classification_not_cached(self, mock_post, cache, mock_image_data):
+        """Test that fallback results are not cached"""
+        mock_response = Mock()
+        mock_response.status_code = 500
+        mock_response.text = "Internal server error"
+        mock_post.return_value = mock_response
+
+        service = AIVisionService(cache=cache)
+        service.classify_room(mock_image_data)
+        service.classify_room(mock_image_data)
+
+        assert mock_post.call_count == 2
+        assert cache.stats()['entries'] == 0
+
+    async def test_async_cache_access_stays_off_event_loop(
+        self, cache, mock_image_data, mock_ai_classification
+    ):
+        """Test that async lookups and stores run in the executor"""
+        threads = []
+        get, put = cache.get, cache.put
+        cache.get = lambda *args: threads.append(threading.current_thread()) or get(*args)
+        cache.put = lambda *args: threads.append(threading.current_thread()) or put(*args)
+
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {'response': json.dumps(mock_ai_classification)}
+
+        service = AIVisionService(cache=cache)
+        with patch.object(
+            service._get_async_client(), 'post', new=AsyncMock(return_value=mock_response)
+        ) as mock_post:
+            await service.classify_room_async(mock_image_data)
+            second = await service.classify_room_async(mock_image_data)
+        await service.aclose()
+
+        assert second['cache_hit'] is True
+        mock_post.assert_awaited_once()
+        assert len(threads) == 3  # miss, store, hit
+        assert threading.current_thread() not in threads
@@ -0,0 +1,171 @@
+"""
+Tests for Classification Worker Pool
+Tests background classification of queued rooms
+"""
+
+import pytest
+from unittest.mock import MagicMock, AsyncMock
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy.orm import sessionmaker
+
+from database.models import Job, Room, SyncQueue
+from services.classification_worker import ClassificationWorkerPool
+
+
+@pytest.fixture
+def pending_room(test_db, sample_job, tmp_path, mock_image_data):
+    """Room uploaded but not yet classified"""
+    image_path = tmp_path / "room.jpg"
+    image_path.write_bytes(mock_image_data)
+
+    room = Room(
+        job_id=sample_job.id,
+        name="Garage",
+        room_number=1,
+        image_path=str(image_path),
+        final_size_class="medium",
+        final_workload_class="moderate",
+        estimated_cost=0,
+        status="pending"
+    )
+    test_db.add(room)
+    test_db.commit()
+    return room
+
+
+def make_pool(test_db, classify):
+    """Worker pool sharing the test database"""
+    ai_service = MagicMock()
+    ai_service.classify_room_async = classify
+    pool = ClassificationWorkerPool(
+        session_factory=sessionmaker(bind=test_db.get_bind()),
+        concurrency=1,
+        ai_service=ai_service
+    )
+    pool.RETRY_BACKOFF = 0
+    return pool
+
+
+class TestClassificationWorkerPool:
+    """Test queued classification processing"""
+
+    async def test_process_next_empty_queue(self, test_db):
+        """Test that an empty queue reports no work"""
+        pool = make_pool(test_db, AsyncMock())
+        assert await pool.process_next() is False
+
+    async def test_process_classifies_room_and_updates_job(
+        self, test_db, sample_job, pending_room, mock_ai_classification
+    ):
+        """Test that a queued room gets AI fields, cost and job totals"""
+        pool = make_pool(test_db, AsyncMock(return_value=mock_ai_classification))
+        pool.enqueue(test_db, pending_room)
+        test_db.commit()
+
+        assert await pool.process_next() is True
+
+        test_db.expire_all()
+        room = test_db.query(Room).filter(Room.id == pending_room.id).one()
+        assert room.status == 'classified'
+        assert room.ai_size_class == 'large'
+        assert room.final_workload_class == 'heavy'
+        assert room.estimated_cost == Decimal('480.00')
+
+        job = test_db.query(Job).filter(Job.id == sample_job.id).one()
+        assert job.ai_estimate == Decimal('480.00')
+        assert job.final_price == Decimal('480.00')
+
+        item = test_db.query(SyncQueue).one()
+        assert item.status == 'completed'
+        assert item.processed_at is not None
+
+    async def test_human_override_while_queued_is_preserved(
+        self, test_db, pending_room, mock_ai_classification
+    ):
+        """Test that a human override made before classification wins"""
+        pool = make_pool(test_db, AsyncMock(return_value=mock_ai_classification))
+        pool.enqueue(test_db, pending_room)
+        pending_room.human_size_class = 'small'
+        pending_room.final_size_class = 'small'
+        test_db.commit()
+
+        await pool.process_next()
+
+        test_db.expire_all()
+        room = test_db.query(Room).filter(Room.id == pending_room.id).one()
+        assert room.ai_size_class == 'large'
+        assert room.final_size_class == 'small'
+
+    async def test_ai_failure_retries_then_uses_fallback(self, test_db, pending_room):
+        """Test that repeated AI errors fall back to default classification"""
+        fallback = {
+            'size_class': 'medium',
+            'workload_class': 'moderate',
+            'confidence': 0.0,
+            'reasoning': 'AI classification failed: Timeout',
+            'features': {},
+            'error': 'Timeout'
+        }
+        classify = AsyncMock(return_value=fallback)
+        pool = make_pool(test_db, classify)
+        pool.enqueue(test_db, pending_room)
+        test_db.commit()
+
+        await pool.process_next()
+
+        assert classify.await_count == pool.MAX_RETRIES
+
+        test_db.expire_all()
+        room = test_db.query(Room).filter(Room.id == pending_room.id).one()
+        assert room.status == 'failed'
+        assert room.ai_confidence == 0.0
+        assert room.estimated_cost == Decimal('292.50')
+
+        item = test_db.query(SyncQueue).one()
+        assert item.status == 'failed'
+        assert item.retry_count == pool.MAX_RETRIES
+
+    async def test_start_requeues_interrupted_items(self, test_db, pending_room):
+        """Test that items left 'processing' by a crash are picked up again"""
+        pool = make_pool(test_db, AsyncMock())
+        item = pool.enqueue(test_db, pending_room)
+        test_db.commit()
+        assert pool._claim_next() is not None
+
+        test_db.expire_all()
+        item = test_db.query(SyncQueue).one()
+        item.claimed_at = datetime.utcnow() - timedelta(seconds=pool.CLAIM_TIMEOUT + 60)
+        test_db.commit()
+
+        assert pool._requeue_interrupted() == 1
+
+        test_db.expire_all()
+        assert test_db.query(SyncQueue).one().status == 'pending'
+
+    async def test_start_keeps_live_claims(self, test_db, pending_room):
+        """Test that items another instance is still processing are left alone"""
+        pool = make_pool(test_db, AsyncMock())
+        pool.enqueue(test_db, pending_room)
+        test_db.commit()
+        assert pool._claim_next() is not None
+
+        assert pool._requeue_interrupted() == 0
+
+        test_db.expire_all()
+        item = test_db.query(SyncQueue).one()
+        assert item.status == 'processing'
+        assert item.claimed_at is not None
+
+    async def test_enqueue_creates_pending_sync_queue_item(self, test_db, pending_room):
+        """Test that enqueue records a persistent classify job for the room"""
+        pool = make_pool(test_db, AsyncMock())
+        pool.enqueue(test_db, pending_room, use_ultrathink=False)
+        test_db.commit()
+
+        item = test_db.query(SyncQueue).one()
+        assert item.entity_type == 'room'
+        assert item.entity_id == pending_room.id
+        assert item.action == 'classify'
+        assert item.status == 'pending'
+        assert item.payload == {'use_ultrathink': False}
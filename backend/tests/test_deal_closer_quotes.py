@@ -0,0 +1,250 @@
+"""
+Tests for Michigan Deal Closer quote delivery
+Tests that quotes go out through a shared outreach system and are saved in batches
+before they are emailed
+"""
+
+import json
+import sqlite3
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from services.michigan_deal_closer import MichiganDealCloser
+from services.rate_limiter import RateLimiter
+
+
+class FakeOutreach:
+    """Records send_email calls instead of talking to SMTP"""
+
+    def __init__(self, succeed=True, fail_for=()):
+        self.succeed = succeed
+        self.fail_for = set(fail_for)
+        self.sent = []
+
+    async def send_email(self, to_email, subject, body):
+        self.sent.append((to_email, subject, body))
+        return self.succeed and to_email not in self.fail_for
+
+
+@pytest.fixture
+def limiter():
+    return RateLimiter({}, default=(1000.0, 1000))
+
+
+@pytest.fixture
+def db_conn():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("""
+        CREATE TABLE leads (
+            id INTEGER PRIMARY KEY, source TEXT, title TEXT, description TEXT, location TEXT,
+            contact_info TEXT, urgency_score REAL, estimated_value REAL,
+            contacted BOOLEAN DEFAULT TRUE, quoted BOOLEAN DEFAULT FALSE, quote_sent_date TEXT
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE quotes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, quote_id TEXT UNIQUE NOT NULL,
+            lead_id INTEGER NOT NULL, customer_name TEXT NOT NULL, property_address TEXT NOT NULL,
+            estimated_cost REAL NOT NULL, discount_amount REAL NOT NULL, final_price REAL NOT NULL,
+            estimated_duration TEXT NOT NULL, quote_expires TEXT NOT NULL, terms TEXT,
+            status TEXT DEFAULT 'sent', created_at TIMESTAMP, updated_at TIMESTAMP
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO leads (id, title, description, location, contact_info, urgency_score, estimated_value) "
+        "VALUES (?, ?, ?, ?, ?, 0.8, 300)",
+        [
+            (lead["id"], lead["title"], lead["description"], lead["location"], lead["contact_info"])
+            for lead in (make_lead(i, f"lead{i}@example.com") for i in range(1, 301))
+        ],
+    )
+    conn.commit()
+    return conn
+
+
+def make_lead(lead_id=1, email="owner@example.com"):
+    return {
+        "id": lead_id,
+        "title": "Basement cleanout",
+        "description": "my name is John, estate cleanout",
+        "location": "Detroit",
+        "estimated_value": 300,
+        "contact_info": json.dumps({"email": email} if email else {}),
+    }
+
+
+class TestQuoteDelivery:
+    """Test send_quote_via_email"""
+
+    async def test_sends_through_injected_outreach(self, limiter):
+        """Every quote uses the same outreach instance"""
+        outreach = FakeOutreach()
+        closer = MichiganDealCloser(sqlite3.connect(":memory:"), rate_limiter=limiter, outreach=outreach)
+
+        for lead_id in range(1, 4):
+            lead = make_lead(lead_id, f"lead{lead_id}@example.com")
+            quote = closer.calculate_michigan_pricing(lead)
+            assert await closer.send_quote_via_email(lead, quote, closer.generate_quote_document(quote))
+
+        assert closer.outreach is outreach
+        assert [to for to, _, _ in outreach.sent] == [f"lead{i}@example.com" for i in range(1, 4)]
+        to_email, subject, body = outreach.sent[0]
+        assert subject.startswith("CleanoutPro Quote MI-")
+        assert "**Final Price: $" in body
+
+    async def test_explicit_recipient_and_missing_email(self, limiter):
+        """to_email overrides the lead's contact; no email means not sent"""
+        outreach = FakeOutreach()
+        closer = MichiganDealCloser(sqlite3.connect(":memory:"), rate_limiter=limiter, outreach=outreach)
+
+        lead = make_lead(email=None)
+        quote = closer.calculate_michigan_pricing(lead)
+        quote_doc = closer.generate_quote_document(quote)
+
+        assert not await closer.send_quote_via_email(lead, quote, quote_doc)
+        assert await closer.send_quote_via_email(lead, quote, quote_doc, "form@example.com")
+        assert [to for to, _, _ in outreach.sent] == ["form@example.com"]
+
+    async def test_failed_send_is_reported(self, limiter):
+        """A failed delivery is not reported as sent"""
+        closer = MichiganDealCloser(
+            sqlite3.connect(":memory:"), rate_limiter=limiter, outreach=FakeOutreach(succeed=False)
+        )
+        lead = make_lead()
+        quote = closer.calculate_michigan_pricing(lead)
+
+        assert not await closer.send_quote_via_email(lead, quote, closer.generate_quote_document(quote))
+
+
+    async def test_single_quote_status_follows_delivery(self, db_conn, limiter):
+        """A quote sent on its own is 'sent' only if the email went out"""
+        outreach = FakeOutreach(fail_for={"bad@example.com"})
+        closer = MichiganDealCloser(db_conn, rate_limiter=limiter, outreach=outreach)
+
+        quotes = []
+        for lead in (make_lead(1), make_lead(2)):
+            quote = closer.calculate_michigan_pricing(lead)
+            quote_doc = closer.generate_quote_document(quote)
+            closer.save_quote_to_database(lead, quote, quote_doc, status="sending")
+            quotes.append((lead, quote, quote_doc))
+        assert closer.claim_pending_quotes() == []  # not picked up by a quoting run
+
+        assert await closer.deliver_quote(*quotes[0], "form@example.com")
+        assert not await closer.deliver_quote(*quotes[1], "bad@example.com")
+
+        statuses = dict(db_conn.execute("SELECT lead_id, status FROM quotes").fetchall())
+        assert statuses == {1: "sent", 2: "pending"}
+        assert db_conn.execute(
+            "SELECT id FROM leads WHERE quote_sent_date IS NOT NULL"
+        ).fetchall() == [(1,)]
+
+
+class TestBatchQuoting:
+    """Test run_automated_quoting"""
+
+    async def test_quotes_batch_and_marks_leads(self, db_conn, limiter):
+        """Every quote is saved and its lead marked; a failed email stays pending"""
+        outreach = FakeOutreach(fail_for={"lead7@example.com"})
+        closer = MichiganDealCloser(db_conn, rate_limiter=limiter, outreach=outreach)
+
+        assert await closer.run_automated_quoting(limit=300) == 300
+        assert len(outreach.sent) == 300
+
+        statuses = dict(db_conn.execute("SELECT lead_id, status FROM quotes").fetchall())
+        assert len(statuses) == 300
+        assert statuses.pop(7) == "pending"
+        assert set(statuses.values()) == {"sent"}
+        assert db_conn.execute("SELECT COUNT(*) FROM leads WHERE quoted = FALSE").fetchone() == (0,)
+        assert db_conn.execute(
+            "SELECT id FROM leads WHERE quote_sent_date IS NULL"
+        ).fetchall() == [(7,)]
+
+        # The next run retries only the undelivered quote
+        outreach.fail_for.clear()
+        outreach.sent.clear()
+        assert await closer.run_automated_quoting(limit=300) == 0
+        assert [to for to, _, _ in outreach.sent] == ["lead7@example.com"]
+        assert db_conn.execute("SELECT status FROM quotes WHERE lead_id = 7").fetchone() == ("sent",)
+
+    async def test_quotes_are_saved_before_sending(self, db_conn, limiter):
+        """A quote is committed as pending before its email goes out"""
+        statuses = []
+
+        class CheckingOutreach(FakeOutreach):
+            async def send_email(self, to_email, subject, body):
+                quote_id = subject.split()[2]
+                statuses.append(
+                    db_conn.execute("SELECT status FROM quotes WHERE quote_id = ?", (quote_id,)).fetchone()
+                )
+                return await super().send_email(to_email, subject, body)
+
+        closer = MichiganDealCloser(db_conn, rate_limiter=limiter, outreach=CheckingOutreach())
+
+        assert await closer.run_automated_quoting(limit=3) == 3
+        assert statuses == [("sending",)] * 3
+
+    async def test_interrupted_delivery_is_resumed(self, db_conn, limiter):
+        """Claims of a live delivery are left alone; stale ones are sent again"""
+        outreach = FakeOutreach()
+        closer = MichiganDealCloser(db_conn, rate_limiter=limiter, outreach=outreach)
+        batch = closer.price_leads([make_lead(1, "lead1@example.com")])
+        closer.save_quotes([(lead, quote) for lead, quote, _ in batch])
+        assert len(closer.claim_pending_quotes()) == 1  # crash after claiming
+
+        assert await closer.deliver_pending_quotes() == 0
+
+        db_conn.execute("UPDATE quotes SET updated_at = '2000-01-01T00:00:00'")
+        assert await closer.deliver_pending_quotes() == 1
+        assert [to for to, _, _ in outreach.sent] == ["lead1@example.com"]
+
+    async def test_expired_quotes_are_not_sent(self, db_conn, limiter):
+        """A pending quote past its expiry is marked expired instead"""
+        outreach = FakeOutreach()
+        closer = MichiganDealCloser(db_conn, rate_limiter=limiter, outreach=outreach)
+        batch = closer.price_leads([make_lead(1, "lead1@example.com")])
+        closer.save_quotes([(lead, quote) for lead, quote, _ in batch])
+        db_conn.execute("UPDATE quotes SET quote_expires = '2000-01-01T00:00:00'")
+
+        assert await closer.deliver_pending_quotes() == 0
+        assert outreach.sent == []
+        assert db_conn.execute("SELECT status FROM quotes").fetchone() == ("expired",)
+
+    async def test_leads_without_email_are_not_quoted(self, db_conn, limiter):
+        """A lead with no email gets no quote and stays unquoted"""
+        db_conn.execute("UPDATE leads SET contact_info = '{}' WHERE id = 3")
+        closer = MichiganDealCloser(db_conn, rate_limiter=limiter, outreach=FakeOutreach())
+
+        assert await closer.run_automated_quoting(limit=5) == 5
+        assert db_conn.execute("SELECT quoted FROM leads WHERE id = 3").fetchone() == (0,)
+        assert db_conn.execute("SELECT quoted FROM leads WHERE id = 6").fetchone() == (1,)
+
+    async def test_leads_without_email_do_not_starve_the_batch(self, db_conn, limiter):
+        """SMS-only leads ranked first don't keep emailable leads from being quoted"""
+        db_conn.execute("UPDATE leads SET urgency_score = 0.5")
+        db_conn.executemany(
+            "INSERT INTO leads (id, title, description, location, contact_info, urgency_score, estimated_value) "
+            "VALUES (?, 'Garage cleanout', 'garage', 'Detroit', ?, 0.9, 300)",
+            [(1000 + i, json.dumps({"phone": "313-555-0100"})) for i in range(15)],
+        )
+        closer = MichiganDealCloser(db_conn, rate_limiter=limiter, outreach=FakeOutreach())
+
+        for _ in range(3):
+            assert await closer.run_automated_quoting(limit=5) == 5
+
+        quoted = db_conn.execute("SELECT id FROM leads WHERE quoted = TRUE").fetchall()
+        assert sorted(lead_id for (lead_id,) in quoted) == list(range(1, 16))
+
+    async def test_save_is_one_transaction(self, db_conn, limiter):
+        """A failing row rolls back the whole batch, quotes and lead flags"""
+        closer = MichiganDealCloser(db_conn, rate_limiter=limiter, outreach=FakeOutreach())
+        batch = closer.price_leads([make_lead(1), make_lead(2)])
+        quoted = [(lead, quote) for lead, quote, _ in batch]
+        quoted[1][1].quote_id = quoted[0][1].quote_id  # UNIQUE violation
+
+        with pytest.raises(sqlite3.IntegrityError):
+            closer.save_quotes(quoted)
+
+        assert db_conn.execute("SELECT COUNT(*) FROM quotes").fetchone() == (0,)
+        assert db_conn.execute("SELECT COUNT(*) FROM leads WHERE quoted = TRUE").fetchone() == (0,)
@@ -0,0 +1,102 @@
+"""
+Tests for Image Preprocessing
+Tests downsizing, EXIF rotation and re-encoding before AI classification
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+import base64
+import io
+import json
+
+from PIL import Image
+
+from services.ai_vision import AIVisionService
+from services.image_preprocessing import preprocess_image, DEFAULT_MAX_SIDE
+
+
+def make_jpeg(size, orientation=None, quality=95):
+    """Encode a noisy RGB test photo"""
+    image = Image.effect_noise(size, 50).convert('RGB')
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    output = io.BytesIO()
+    image.save(output, format='JPEG', quality=quality, exif=exif)
+    return output.getvalue()
+
+
+class TestImagePreprocessing:
+    """Test image preprocessing stage"""
+
+    def test_large_photo_is_downsized(self):
+        """Test that phone-size photos shrink to the model input size"""
+        raw = make_jpeg((4032, 3024))
+        processed = preprocess_image(raw)
+
+        image = Image.open(io.BytesIO(processed))
+        assert image.format == 'JPEG'
+        assert max(image.size) == DEFAULT_MAX_SIDE
+        assert image.size == (672, 504)
+        assert len(processed) < len(raw) / 10
+
+    def test_exif_orientation_is_applied(self):
+        """Test that rotated phone photos are stored upright"""
+        # Orientation 6 = rotate 90 degrees clockwise for display
+        raw = make_jpeg((1600, 1200), orientation=6)
+        processed = preprocess_image(raw)
+
+        image = Image.open(io.BytesIO(processed))
+        assert image.size == (504, 672)
+
+    def test_small_upright_jpeg_unchanged(self):
+        """Test that images already at model size are passed through"""
+        raw = make_jpeg((320, 240))
+        assert preprocess_image(raw) == raw
+
+    def test_png_converted_to_jpeg(self):
+        """Test that non-JPEG input is re-encoded as JPEG"""
+        output = io.BytesIO()
+        Image.new('RGBA', (1000, 500), (255, 0, 0, 128)).save(output, format='PNG')
+
+        processed = preprocess_image(output.getvalue())
+
+        image = Image.open(io.BytesIO(processed))
+        assert image.format == 'JPEG'
+        assert image.mode == 'RGB'
+        assert image.size == (672, 336)
+
+    def test_undecodable_bytes_returned_unchanged(self, mock_image_data):
+        """Test that corrupt images fall back to the original bytes"""
+        assert preprocess_image(mock_image_data) == mock_image_data
+        assert preprocess_image(b'not an image') == b'not an image'
+
+    @patch('services.ai_vision.requests.post')
+    def test_classify_room_sends_downsized_image(self, mock_post, mock_ai_classification):
+        """Test that AIVisionService encodes the preprocessed image"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {'response': json.dumps(mock_ai_classification)}
+        mock_post.return_value = mock_response
+
+        raw = make_jpeg((4032, 3024))
+        AIVisionService().classify_room(raw)
+
+        sent = base64.b64decode(mock_post.call_args.kwargs['json']['images'][0])
+        assert max(Image.open(io.BytesIO(sent)).size) == DEFAULT_MAX_SIDE
+
+    @patch('services.ai_vision.requests.post')
+    def test_preprocessing_can_be_disabled(self, mock_post, mock_ai_classification):
+        """Test that preprocess_images=False sends raw bytes"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {'response': json.dumps(mock_ai_classification)}
+        mock_post.return_value = mock_response
+
+        raw = make_jpeg((1600, 1200))
+        service = AIVisionService()
+        service.preprocess_images = False
+        service.classify_room(raw)
+
+        sent = base64.b64decode(mock_post.call_args.kwargs['json']['images'][0])
+        assert sent == raw
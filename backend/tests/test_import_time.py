@@ -0,0 +1,102 @@
+"""
+Tests for cold-start import cost
+Imports the Vercel entry point in a fresh interpreter with -X importtime
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# Heavy subsystems that must not load until their first request
+DEFERRED_MODULES = [
+    'services.ai_vision',
+    'services.michigan_autonomous',
+    'aiohttp',
+    'bs4',
+    'twilio',
+    'httpx',
+    'requests',
+    'PIL',
+    'psycopg',
+]
+
+# Our own modules (api, database, services, index) - self time only
+OWN_IMPORT_BUDGET_MS = int(os.getenv("OWN_IMPORT_BUDGET_MS", "400"))
+
+# Whole entry point, as a multiple of importing the frameworks alone on the
+# same machine (index is ~1.3x fastapi + sqlalchemy.orm; it was ~1.9x before
+# deferring the heavy subsystems)
+TOTAL_IMPORT_RATIO = float(os.getenv("TOTAL_IMPORT_RATIO", "1.5"))
+FRAMEWORK_MODULES = ('fastapi', 'sqlalchemy.orm')
+
+OWN_PACKAGES = ('api', 'database', 'services')
+
+
+def import_modules(code):
+    """Run code in a fresh interpreter; return ({module: (self_us, cumulative_us)}, stdout)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        timeout=60
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings.setdefault(name.strip(), (int(self_us), int(cumulative_us)))
+    return timings, result.stdout
+
+
+def import_entry_point():
+    """Import index in a fresh interpreter; return ({module: (self_us, cumulative_us)}, loaded)"""
+    timings, stdout = import_modules(
+        "import sys, index; "
+        f"print('LOADED:' + ','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    )
+    marker = stdout.rsplit("LOADED:", 1)[1].strip()
+    loaded = [m for m in marker.split(",") if m]
+    return timings, loaded
+
+
+class TestImportTime:
+    """Test that the app imports cheaply"""
+
+    def test_heavy_subsystems_deferred(self):
+        """Test that AI, Michigan and DB driver modules load lazily"""
+        _, loaded = import_entry_point()
+        assert loaded == []
+
+    def test_import_time_budget(self):
+        """Test app import time against the cold-start budget (best of 5)"""
+        # Interleaved, so machine load affects both measurements alike
+        runs = []
+        framework_runs = []
+        for _ in range(5):
+            runs.append(import_entry_point()[0])
+            framework_runs.append(import_modules(f"import {', '.join(FRAMEWORK_MODULES)}")[0])
+
+        framework_ms = min(
+            sum(timings[name][1] for name in FRAMEWORK_MODULES) for timings in framework_runs
+        ) / 1000
+
+        own_ms = min(
+            sum(
+                self_us for name, (self_us, _) in timings.items()
+                if name == 'index' or name.split('.')[0] in OWN_PACKAGES
+            ) / 1000
+            for timings in runs
+        )
+        total_ms = min(timings['index'][1] for timings in runs) / 1000
+
+        assert own_ms < OWN_IMPORT_BUDGET_MS, f"own modules took {own_ms:.0f} ms"
+        assert total_ms < framework_ms * TOTAL_IMPORT_RATIO, (
+            f"index took {total_ms:.0f} ms, frameworks alone {framework_ms:.0f} ms"
+        )
@@ -0,0 +1,73 @@
+"""
+Tests for Job Totals
+Tests SQL-side recompute of job ai_estimate and final_price
+"""
+
+import pytest
+from decimal import Decimal
+
+from database.models import Job, Room
+from services.job_totals import aggregate_room_costs, recompute_job_totals
+
+
+def add_room(test_db, job, number, estimated_cost, ai_estimated_cost=None):
+    room = Room(
+        job_id=job.id,
+        name=f"Room {number}",
+        room_number=number,
+        final_size_class="medium",
+        final_workload_class="moderate",
+        estimated_cost=estimated_cost,
+        ai_estimated_cost=ai_estimated_cost
+    )
+    test_db.add(room)
+    test_db.commit()
+    return room
+
+
+class TestJobTotals:
+    """Test job total aggregation"""
+
+    def test_aggregate_sums_ai_and_final_costs(self, test_db, sample_job):
+        """Test that AI and final costs are summed separately"""
+        add_room(test_db, sample_job, 1, Decimal('480.00'), Decimal('292.50'))
+        add_room(test_db, sample_job, 2, Decimal('150.00'), Decimal('150.00'))
+
+        totals = aggregate_room_costs(test_db, [sample_job.id])
+
+        assert totals[sample_job.id] == (Decimal('442.50'), Decimal('630.00'))
+
+    def test_aggregate_falls_back_to_estimated_cost(self, test_db, sample_job):
+        """Test that rooms without a stored AI cost count their final cost"""
+        add_room(test_db, sample_job, 1, Decimal('292.50'))
+
+        totals = aggregate_room_costs(test_db, [sample_job.id])
+
+        assert totals[sample_job.id] == (Decimal('292.50'), Decimal('292.50'))
+
+    def test_recompute_updates_job(self, test_db, sample_job):
+        """Test that recompute writes ai_estimate and final_price"""
+        add_room(test_db, sample_job, 1, Decimal('480.00'), Decimal('292.50'))
+
+        recompute_job_totals(test_db, sample_job)
+
+        assert sample_job.ai_estimate == Decimal('292.50')
+        assert sample_job.final_price == Decimal('480.00')
+
+    def test_recompute_keeps_human_adjusted_price(self, test_db, sample_job):
+        """Test that a human adjusted estimate is not overwritten"""
+        sample_job.human_adjusted_estimate = Decimal('1000.00')
+        sample_job.final_price = Decimal('1000.00')
+        add_room(test_db, sample_job, 1, Decimal('480.00'))
+
+        recompute_job_totals(test_db, sample_job)
+
+        assert sample_job.ai_estimate == Decimal('480.00')
+        assert sample_job.final_price == Decimal('1000.00')
+
+    def test_recompute_job_without_rooms(self, test_db, sample_job):
+        """Test that a job with no rooms totals zero"""
+        recompute_job_totals(test_db, sample_job)
+
+        assert sample_job.ai_estimate == Decimal('0.00')
+        assert sample_job.final_price == Decimal('0.00')
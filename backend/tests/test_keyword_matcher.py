@@ -0,0 +1,67 @@
+"""
+Tests for Keyword Matcher
+Tests single-pass keyword matching used by lead scoring
+"""
+
+import pytest
+
+from services.keyword_matcher import AHOCORASICK_AVAILABLE, KeywordMatcher
+
+GROUPS = {
+    "urgent": ["urgent", "asap", "moving tomorrow"],
+    "moving": ["moving", "relocation"],
+    "junk": ["junk", "junk removal", "removal"],
+}
+
+BACKENDS = [
+    False,
+    pytest.param(True, marks=pytest.mark.skipif(
+        not AHOCORASICK_AVAILABLE, reason="pyahocorasick not installed"
+    )),
+]
+
+
+@pytest.mark.parametrize("use_automaton", BACKENDS)
+class TestKeywordMatcher:
+    """Test keyword hits match `keyword in text.lower()` semantics"""
+
+    def test_finds_nested_and_overlapping_keywords(self, use_automaton):
+        """Test that keywords inside longer keywords are all found"""
+        matcher = KeywordMatcher(GROUPS, use_automaton=use_automaton)
+
+        hits = matcher.find("URGENT Junk Removal", "we are moving tomorrow")
+
+        assert hits.terms == {"urgent", "moving tomorrow", "moving", "junk", "junk removal", "removal"}
+        assert hits.count("urgent") == 2
+        assert hits.count("junk") == 3
+        assert hits.any("moving")
+
+    def test_substring_semantics(self, use_automaton):
+        """Test that keywords match inside words, like the `in` operator"""
+        matcher = KeywordMatcher(GROUPS, use_automaton=use_automaton)
+
+        hits = matcher.find("junkyard", "")
+
+        assert "junk" in hits
+        assert hits.count("junk") == 1
+
+    def test_no_hits(self, use_automaton):
+        """Test that unrelated text has no hits in any group"""
+        matcher = KeywordMatcher(GROUPS, use_automaton=use_automaton)
+
+        hits = matcher.find("free couch", "pickup only")
+
+        assert hits.terms == frozenset()
+        assert hits.count("urgent") == 0
+        assert not hits.any("junk")
+
+    def test_matches_naive_scan(self, use_automaton):
+        """Test agreement with a per-keyword scan on mixed text"""
+        matcher = KeywordMatcher(GROUPS, use_automaton=use_automaton)
+        title, description = "Relocation ASAP", "junk and more junk, removal needed"
+
+        hits = matcher.find(title, description)
+
+        text = (title + " " + description).lower()
+        for group, keywords in GROUPS.items():
+            assert hits.count(group) == sum(1 for keyword in keywords if keyword in text)
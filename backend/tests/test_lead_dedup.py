@@ -0,0 +1,97 @@
+"""
+Tests for Lead De-duplication
+Tests lead fingerprints, the fingerprint migration and bulk lead saving
+"""
+
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from services.michigan_database import ensure_lead_fingerprints, lead_fingerprint
+
+
+class TestLeadFingerprint:
+    """Test listing identity"""
+
+    def test_text_is_normalized(self):
+        """Test that case and whitespace don't change the fingerprint"""
+        a = lead_fingerprint("craigslist", "Junk  Removal", "Basement\ncleanout ")
+        b = lead_fingerprint("craigslist", "junk removal", "basement cleanout")
+
+        assert a == b
+
+    def test_url_is_canonical(self):
+        """Test that query, fragment, scheme and trailing slash are ignored"""
+        a = lead_fingerprint("craigslist", "A", "x", "https://detroit.craigslist.org/svc/d/123.html?lang=en")
+        b = lead_fingerprint("craigslist", "B", "y", "http://detroit.craigslist.org/svc/d/123.html/#map")
+
+        assert a == b
+
+    def test_source_distinguishes(self):
+        """Test that the same text from two sources is two leads"""
+        assert lead_fingerprint("craigslist", "t", "d") != lead_fingerprint("facebook_marketplace", "t", "d")
+
+
+class TestFingerprintMigration:
+    """Test adding fingerprints to an existing leads table"""
+
+    def test_backfills_and_keeps_duplicates(self):
+        """Test that old rows are fingerprinted and repeats keep a NULL fingerprint"""
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE leads (id INTEGER PRIMARY KEY, source TEXT, title TEXT, description TEXT)")
+        conn.executemany(
+            "INSERT INTO leads (source, title, description) VALUES (?, ?, ?)",
+            [("craigslist", "Junk", "old couch"), ("craigslist", "junk", "Old  couch"), ("craigslist", "Other", "")],
+        )
+
+        ensure_lead_fingerprints(conn)
+
+        rows = conn.execute("SELECT id, fingerprint FROM leads ORDER BY id").fetchall()
+        assert rows[0][1] == lead_fingerprint("craigslist", "Junk", "old couch")
+        assert rows[1][1] is None
+        assert rows[2][1] is not None
+        assert len(rows) == 3
+
+        with pytest.raises(sqlite3.IntegrityError):
+            conn.execute("INSERT INTO leads (fingerprint) VALUES (?)", (rows[0][1],))
+
+
+class TestSaveLeads:
+    """Test bulk insert with ON CONFLICT DO NOTHING"""
+
+    @pytest.fixture
+    def generator(self, tmp_path, monkeypatch):
+        pytest.importorskip("aiohttp")
+        pytest.importorskip("bs4")
+        from services.michigan_lead_generator import MichiganLeadGenerator
+
+        monkeypatch.chdir(tmp_path)  # michigan_leads.db is created in the cwd
+        generator = MichiganLeadGenerator()
+        yield generator
+        generator.db_conn.close()
+
+    def make_leads(self, generator, titles):
+        return [
+            generator.build_lead("craigslist", title, "must go asap", "$100", "detroit",
+                                 f"https://detroit.craigslist.org/d/{title}.html",
+                                 listing_url=f"https://detroit.craigslist.org/d/{title}.html")
+            for title in titles
+        ]
+
+    def test_reports_new_and_seen(self, generator):
+        """Test that re-scraped listings are counted as seen, not inserted"""
+        first = generator.save_leads(self.make_leads(generator, ["a", "b"]))
+        second = generator.save_leads(self.make_leads(generator, ["a", "b", "c", "c"]))
+
+        assert (first.new, first.seen) == (2, 0)
+        assert (second.new, second.seen) == (1, 3)
+        assert generator.db_conn.execute("SELECT COUNT(*) FROM leads").fetchone()[0] == 3
+
+    def test_leads_without_fingerprint_are_fingerprinted(self, generator):
+        """Test that leads built elsewhere still de-duplicate by text"""
+        lead = self.make_leads(generator, ["x"])[0]
+        lead.fingerprint = ""
+        lead.posted_date = datetime(2024, 1, 1)
+
+        assert generator.save_leads([lead, lead]).new == 1
@@ -0,0 +1,75 @@
+"""
+Tests for Listing Parser
+Tests page parsing into tuples, inline and in the process pool
+"""
+
+import pytest
+
+pytest.importorskip("bs4")
+
+from services.listing_parser import (
+    ListingParser,
+    parse_craigslist_detail,
+    parse_craigslist_search,
+    parse_facebook_search,
+)
+
+CRAIGSLIST_SEARCH = """
+<html><body><ol>
+  <li class="cl-static-search-result">
+    <a class="title" href="https://detroit.craigslist.org/d/junk/101.html">Junk removal</a>
+    <span class="price">$100</span>
+  </li>
+  <li class="cl-static-search-result"><a class="title" href="https://detroit.craigslist.org/d/x/102.html">Garage cleanout</a></li>
+  <li class="cl-static-search-result"><span class="price">$5</span></li>
+  <li class="other">Not a result</li>
+</ol></body></html>
+"""
+
+FACEBOOK_SEARCH = """
+<div class="x78zum5"><span class="x1lliihq">Couch</span><span class="x1yztbdb">Must go ASAP</span><span class="x193iq5w">$20</span></div>
+<div class="x78zum5"><span class="x1lliihq">No description</span></div>
+"""
+
+
+class TestPageParsers:
+    """Test the page parsers return the listing tuples the scraper expects"""
+
+    def test_craigslist_search(self):
+        """Test that result items become (title, price, detail_url)"""
+        assert parse_craigslist_search(CRAIGSLIST_SEARCH) == [
+            ("Junk removal", "$100", "https://detroit.craigslist.org/d/junk/101.html"),
+            ("Garage cleanout", "", "https://detroit.craigslist.org/d/x/102.html"),
+        ]
+
+    def test_craigslist_detail(self):
+        """Test that the posting body is extracted, or "" if missing"""
+        html = '<html><section id="postingbody">Basement full of boxes</section></html>'
+
+        assert parse_craigslist_detail(html) == "Basement full of boxes"
+        assert parse_craigslist_detail("<html></html>") == ""
+
+    def test_facebook_search(self):
+        """Test that listings without a description are skipped"""
+        assert parse_facebook_search(FACEBOOK_SEARCH) == [("Couch", "Must go ASAP", "$20")]
+
+
+class TestListingParser:
+    """Test inline and pooled parsing give the same results"""
+
+    async def test_inline(self):
+        """Test that max_workers=0 parses on the calling thread"""
+        parser = ListingParser(max_workers=0)
+
+        assert await parser.parse(parse_craigslist_search, CRAIGSLIST_SEARCH) == parse_craigslist_search(CRAIGSLIST_SEARCH)
+        assert parser._executor is None
+
+    async def test_process_pool(self):
+        """Test that pooled parsing returns the same tuples"""
+        parser = ListingParser(max_workers=1)
+        try:
+            result = await parser.parse(parse_craigslist_search, CRAIGSLIST_SEARCH)
+        finally:
+            parser.shutdown()
+
+        assert result == parse_craigslist_search(CRAIGSLIST_SEARCH)
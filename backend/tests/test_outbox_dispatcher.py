@@ -0,0 +1,200 @@
+"""
+Tests for Outbox Dispatcher
+Tests concurrent delivery, retries and batched contacted updates
+"""
+
+import asyncio
+import sqlite3
+
+import pytest
+
+from services.outbox_dispatcher import OutboxDispatcher
+
+
+@pytest.fixture
+def db_conn():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("""
+        CREATE TABLE leads (
+            id INTEGER PRIMARY KEY, contacted BOOLEAN DEFAULT FALSE, processed BOOLEAN DEFAULT FALSE,
+            contact_date TEXT, template_used TEXT
+        )
+    """)
+    conn.executemany("INSERT INTO leads (id) VALUES (?)", [(i,) for i in range(1, 101)])
+    conn.commit()
+    return conn
+
+
+def queue_messages(conn, lead_ids, channel="email"):
+    conn.executemany(
+        "INSERT INTO outbox (lead_id, channel, recipient, subject, body, template_name, priority) "
+        "VALUES (?, ?, ?, 'subject', 'body', 'template', ?)",
+        [(lead_id, channel, f"lead{lead_id}@example.com", lead_id / 100) for lead_id in lead_ids],
+    )
+    conn.commit()
+
+
+class TestOutboxDispatcher:
+    """Test outbox delivery"""
+
+    async def test_delivers_concurrently_and_marks_contacted(self, db_conn):
+        """Test that all messages are sent with bounded concurrency"""
+        in_flight = 0
+        peak = 0
+
+        async def send(recipient, subject, body):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return True
+
+        dispatcher = OutboxDispatcher(db_conn, {"email": send}, concurrency=4, flush_size=20)
+        queue_messages(db_conn, range(1, 51))
+
+        assert await dispatcher.dispatch() == 50
+        assert peak == 4
+        assert db_conn.execute("SELECT COUNT(*) FROM outbox WHERE status = 'sent'").fetchone()[0] == 50
+        assert db_conn.execute(
+            "SELECT COUNT(*) FROM leads WHERE contacted AND template_used = 'template'"
+        ).fetchone()[0] == 50
+
+    async def test_sends_highest_priority_first(self, db_conn):
+        """Test that claim order follows priority"""
+        order = []
+
+        async def send(recipient, subject, body):
+            order.append(recipient)
+            return True
+
+        dispatcher = OutboxDispatcher(db_conn, {"email": send}, concurrency=1)
+        queue_messages(db_conn, [10, 90, 50])
+
+        await dispatcher.dispatch()
+
+        assert order == ["lead90@example.com", "lead50@example.com", "lead10@example.com"]
+
+    async def test_failures_back_off_then_fail(self, db_conn):
+        """Test that failed sends are rescheduled, then given up after max attempts"""
+        async def send(recipient, subject, body):
+            raise ConnectionError("relay down")
+
+        dispatcher = OutboxDispatcher(
+            db_conn, {"email": send}, max_attempts=2, retry_backoff=0.0
+        )
+        queue_messages(db_conn, [1])
+
+        assert await dispatcher.dispatch() == 0
+
+        status, attempts, error = db_conn.execute(
+            "SELECT status, attempts, last_error FROM outbox"
+        ).fetchone()
+        assert (status, attempts, error) == ("failed", 2, "relay down")
+        assert db_conn.execute("SELECT contacted FROM leads WHERE id = 1").fetchone()[0] == 0
+
+    async def test_backoff_defers_retry(self, db_conn):
+        """Test that a failed message waits for its next attempt time"""
+        async def send(recipient, subject, body):
+            return False
+
+        dispatcher = OutboxDispatcher(db_conn, {"email": send}, retry_backoff=60.0)
+        queue_messages(db_conn, [1])
+
+        await dispatcher.dispatch()
+
+        status, attempts = db_conn.execute("SELECT status, attempts FROM outbox").fetchone()
+        assert (status, attempts) == ("pending", 1)
+        assert dispatcher.claim(10) == []
+
+    async def test_requeues_interrupted_messages(self, db_conn):
+        """Test that rows a crash left in 'sending' are delivered next time"""
+        sent = []
+
+        async def send(recipient, subject, body):
+            sent.append(recipient)
+            return True
+
+        dispatcher = OutboxDispatcher(db_conn, {"email": send}, claim_timeout=600.0)
+        queue_messages(db_conn, [1, 2])
+        dispatcher.claim(10)  # crash after claiming
+        db_conn.execute("UPDATE outbox SET claimed_at = claimed_at - 3600")
+        db_conn.commit()
+
+        assert await dispatcher.dispatch() == 2
+        assert sorted(sent) == ["lead1@example.com", "lead2@example.com"]
+
+    async def test_keeps_claims_of_running_dispatch(self, db_conn):
+        """Test that a concurrent dispatch does not resend rows claimed moments ago"""
+        sent = []
+
+        async def send(recipient, subject, body):
+            sent.append(recipient)
+            return True
+
+        dispatcher = OutboxDispatcher(db_conn, {"email": send}, claim_timeout=600.0)
+        queue_messages(db_conn, [1, 2, 3])
+        claimed = dispatcher.claim(2)  # another campaign is delivering these
+
+        assert await dispatcher.dispatch() == 1
+        assert sent == ["lead1@example.com"]  # 3 and 2 go first by priority
+        statuses = db_conn.execute(
+            "SELECT status FROM outbox WHERE id IN (?, ?)", [row[0] for row in claimed]
+        ).fetchall()
+        assert statuses == [("sending",), ("sending",)]
+
+    async def test_adds_claimed_at_to_existing_outbox(self, db_conn):
+        """Test that an outbox created before claimed_at is migrated"""
+        db_conn.execute("""
+            CREATE TABLE outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, lead_id INTEGER NOT NULL UNIQUE,
+                channel TEXT NOT NULL, recipient TEXT NOT NULL, subject TEXT, body TEXT NOT NULL,
+                template_name TEXT NOT NULL, priority REAL DEFAULT 0.0, status TEXT DEFAULT 'pending',
+                attempts INTEGER DEFAULT 0, next_attempt_at REAL DEFAULT 0, last_error TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, sent_at TEXT
+            )
+        """)
+        db_conn.execute(
+            "INSERT INTO outbox (lead_id, channel, recipient, body, template_name, status) "
+            "VALUES (1, 'email', 'lead1@example.com', 'body', 'template', 'sending')"
+        )
+
+        async def send(recipient, subject, body):
+            return True
+
+        dispatcher = OutboxDispatcher(db_conn, {"email": send})
+
+        assert await dispatcher.dispatch() == 1
+
+    async def test_channel_without_sender_stays_pending(self, db_conn):
+        """Test that rows for an unconfigured channel are not attempted"""
+        async def send(recipient, subject, body):
+            return True
+
+        dispatcher = OutboxDispatcher(db_conn, {"email": send})
+        queue_messages(db_conn, [1], channel="sms")
+        queue_messages(db_conn, [2])
+
+        assert await dispatcher.dispatch() == 1
+        assert db_conn.execute(
+            "SELECT status, attempts FROM outbox WHERE lead_id = 1"
+        ).fetchone() == ("pending", 0)
+
+    async def test_requeue_failed(self, db_conn):
+        """Test that failed rows can be given a fresh set of attempts"""
+        outcome = False
+
+        async def send(recipient, subject, body):
+            return outcome
+
+        dispatcher = OutboxDispatcher(db_conn, {"email": send, "sms": send}, max_attempts=1)
+        queue_messages(db_conn, [1])
+        queue_messages(db_conn, [2], channel="sms")
+        await dispatcher.dispatch()
+
+        outcome = True
+        assert dispatcher.requeue_failed("email") == 1
+        assert await dispatcher.dispatch() == 1
+        assert db_conn.execute(
+            "SELECT lead_id, status FROM outbox ORDER BY lead_id"
+        ).fetchall() == [(1, "sent"), (2, "failed")]
@@ -0,0 +1,106 @@
+"""
+Tests for Outreach Rendering
+Tests compiled templates against the old str.replace personalization
+"""
+
+import json
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from services.michigan_database import create_michigan_database
+from services.michigan_outreach import MichiganOutreachSystem, compile_template, render_template
+
+
+@pytest.fixture
+def outreach(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # michigan_leads.db
+    return MichiganOutreachSystem()
+
+
+@pytest.fixture
+def unconfigured_outreach(tmp_path, monkeypatch):
+    """Outreach with no SMTP or Twilio settings, over a few stored leads"""
+    monkeypatch.chdir(tmp_path)
+    for name in ("SMTP_SERVER", "SMTP_USERNAME", "TWILIO_ACCOUNT_SID"):
+        monkeypatch.delenv(name, raising=False)
+    create_michigan_database()
+
+    system = MichiganOutreachSystem()
+    system.db_conn.execute("DELETE FROM leads")  # samples have no contact info
+    system.db_conn.executemany(
+        "INSERT INTO leads (source, title, description, location, url, contact_info, lead_type, "
+        "urgency_score, estimated_value) VALUES ('craigslist', 'Garage cleanout', "
+        "'garage full of boxes', 'Detroit', ?, ?, 'cleanout', 0.9, 300)",
+        [
+            (f"https://detroit.craigslist.org/{i}.html",
+             json.dumps({"email": f"lead{i}@example.com", "phone": "3135550100"}))
+            for i in range(3)
+        ],
+    )
+    system.db_conn.commit()
+    return system
+
+
+class TestCompiledTemplates:
+    """Test compile_template / render_template"""
+
+    def test_matches_replace(self):
+        """Rendering gives the same text as replacing each placeholder"""
+        text = "Hi {contact_name}, {listing_title} in {location}? {contact_name}!"
+        values = {"contact_name": "Sarah", "listing_title": "Couch", "location": "Troy"}
+
+        expected = text
+        for name, value in values.items():
+            expected = expected.replace("{" + name + "}", value)
+
+        assert render_template(compile_template(text), values) == expected
+
+    def test_unknown_braces_are_literal(self):
+        """Only known placeholders are substituted"""
+        segments = compile_template("{unknown} {} {location}")
+        assert render_template(segments, {"location": "Novi"}) == "{unknown} {} Novi"
+
+    def test_values_are_not_rescanned(self):
+        """A value that looks like a placeholder is inserted verbatim"""
+        segments = compile_template("{listing_title} / {location}")
+        rendered = render_template(segments, {"listing_title": "{location}", "location": "Warren"})
+        assert rendered == "{location} / Warren"
+
+
+class TestPersonalization:
+    """Test MichiganOutreachSystem personalization"""
+
+    def test_every_template_is_filled(self, outreach):
+        """No placeholder survives personalization"""
+        lead = {
+            "title": "Garage cleanout",
+            "description": "my name is John, garage full of boxes",
+            "location": "Ann Arbor",
+            "estimated_value": 350,
+        }
+        for template in outreach.templates:
+            message = outreach.personalize_message(template, lead)
+            assert "{" not in message
+            assert "Garage cleanout" in message or "Ann Arbor" in message
+
+    def test_area_info_is_memoized(self, outreach):
+        """Area lookup keeps substring matching and caches per location"""
+        first = outreach.get_area_info("Downtown Detroit")
+        assert first is outreach.area_info["detroit"]
+        assert outreach.get_area_info("Downtown Detroit") is first
+        assert outreach.get_area_info("Kalamazoo")["nickname"] == "Kalamazoo"
+
+
+class TestUnconfiguredChannels:
+    """Test outreach when SMTP and Twilio are not set up"""
+
+    async def test_leads_are_not_queued(self, unconfigured_outreach):
+        """Nothing is queued or attempted, and the leads stay eligible"""
+        leads = unconfigured_outreach.get_high_quality_leads()
+        assert len(leads) == 3
+
+        assert await unconfigured_outreach.run_outreach_campaign() == 0
+        assert unconfigured_outreach.db_conn.execute("SELECT COUNT(*) FROM outbox").fetchone() == (0,)
+        assert len(unconfigured_outreach.get_high_quality_leads()) == 3
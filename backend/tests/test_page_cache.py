@@ -0,0 +1,163 @@
+"""
+Tests for Page Cache
+Tests conditional-request state and incremental Craigslist scraping
+"""
+
+import sqlite3
+
+import pytest
+
+from services.michigan_database import craigslist_listing_id
+from services.page_cache import PageCache
+
+
+class TestPageCache:
+    """Test validator storage and staging"""
+
+    def test_conditional_headers_after_commit(self):
+        """Test that validators are only used once committed"""
+        cache = PageCache(sqlite3.connect(":memory:"))
+        url = "https://detroit.craigslist.org/search/svc"
+
+        cache.stage(url, '"abc"', "Wed, 01 Jan 2025 00:00:00 GMT", cache.hash_body("page"))
+        assert cache.conditional_headers(url) == {}
+
+        assert cache.commit() == 1
+        assert cache.conditional_headers(url) == {
+            "If-None-Match": '"abc"',
+            "If-Modified-Since": "Wed, 01 Jan 2025 00:00:00 GMT",
+        }
+
+    def test_body_hash_detects_unchanged_page(self):
+        """Test that a page without validators is recognized by its body"""
+        cache = PageCache(sqlite3.connect(":memory:"))
+        url = "https://www.facebook.com/marketplace/detroit/search"
+
+        cache.stage(url, None, None, cache.hash_body("page v1"))
+        cache.commit()
+
+        assert cache.conditional_headers(url) == {}
+        assert cache.is_unchanged(url, cache.hash_body("page v1"))
+        assert not cache.is_unchanged(url, cache.hash_body("page v2"))
+
+    def test_commit_updates_existing_url(self):
+        """Test that a refetched page replaces its validators"""
+        cache = PageCache(sqlite3.connect(":memory:"))
+        url = "https://annarbor.craigslist.org/search/svc"
+
+        cache.stage(url, '"v1"', None, "h1")
+        cache.commit()
+        cache.stage(url, '"v2"', None, "h2")
+        cache.commit()
+
+        assert cache.get(url).etag == '"v2"'
+        assert cache.get(url).body_hash == "h2"
+
+
+def test_craigslist_listing_id():
+    """Test posting id extraction from detail URLs"""
+    assert craigslist_listing_id("https://detroit.craigslist.org/mcb/svc/d/junk-removal/7712345678.html") == "7712345678"
+    assert craigslist_listing_id("https://detroit.craigslist.org/search/svc") is None
+    assert craigslist_listing_id("") is None
+
+
+class FakeResponse:
+    def __init__(self, status, body="", headers=None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def text(self):
+        return self.body
+
+
+class FakeSession:
+    """Craigslist with an ETag on the search page"""
+
+    def __init__(self, listing_ids):
+        self.listing_ids = listing_ids
+        self.requests = []
+
+    def get(self, url, headers=None):
+        self.requests.append(url)
+        if "/search/" in url:
+            if (headers or {}).get("If-None-Match") == '"search-v1"':
+                return FakeResponse(304)
+            items = "".join(
+                f'<li class="cl-static-search-result"><a class="title" '
+                f'href="https://detroit.craigslist.org/d/junk/{i}.html">Junk removal {i}</a></li>'
+                for i in self.listing_ids
+            )
+            return FakeResponse(200, items, {"ETag": '"search-v1"'})
+        return FakeResponse(200, '<section id="postingbody">basement cleanout</section>')
+
+
+class TestIncrementalCraigslist:
+    """Test that repeat cycles only fetch genuinely new listings"""
+
+    @pytest.fixture
+    def generator(self, tmp_path, monkeypatch):
+        pytest.importorskip("aiohttp")
+        pytest.importorskip("bs4")
+        from services.listing_parser import ListingParser
+        from services.michigan_lead_generator import MichiganLeadGenerator
+        from services.rate_limiter import RateLimiter
+
+        monkeypatch.chdir(tmp_path)  # michigan_leads.db is created in the cwd
+        generator = MichiganLeadGenerator(
+            rate_limiter=RateLimiter({}, default=(1000.0, 100)),
+            parser=ListingParser(max_workers=0),
+        )
+        yield generator
+        generator.db_conn.close()
+
+    async def test_second_cycle_skips_unchanged_and_known(self, generator):
+        """Test 304 search pages and stored listing ids avoid refetching"""
+        generator.session = FakeSession(["101", "102"])
+        leads = await generator.scrape_craigslist(["detroit"])
+        generator.save_leads(leads)
+        generator.page_cache.commit()
+
+        assert [lead.listing_id for lead in leads] == ["101", "102"]
+        assert len(generator.session.requests) == 3
+
+        # Unchanged search page: one 304, no detail pages
+        generator.session = FakeSession(["101", "102"])
+        assert await generator.scrape_craigslist(["detroit"]) == []
+        assert len(generator.session.requests) == 1
+
+        # Changed search page (no validators match): only the new listing is fetched
+        generator.page_cache.conn.execute("UPDATE page_cache SET etag = NULL")
+        generator.session = FakeSession(["101", "102", "103"])
+        leads = await generator.scrape_craigslist(["detroit"])
+
+        assert [lead.listing_id for lead in leads] == ["103"]
+        assert generator.session.requests[1:] == ["https://detroit.craigslist.org/d/junk/103.html"]
+
+    async def test_failed_parse_refetches_page(self, generator):
+        """Test that a page whose listings fail to build isn't marked processed"""
+        parser = generator.parser
+
+        class FailingParser:
+            async def parse(self, func, html):
+                raise ValueError("unexpected markup")
+
+        search_url = "https://detroit.craigslist.org/search/svc?query=junk%20removal"
+        generator.parser = FailingParser()
+        generator.session = FakeSession(["101"])
+        assert await generator.scrape_craigslist(["detroit"]) == []
+        generator.page_cache.commit()
+        assert generator.page_cache.get(search_url) is None
+
+        # Next cycle sends no validators, so the page is fetched and parsed again
+        generator.parser = parser
+        generator.session = FakeSession(["101"])
+        leads = await generator.scrape_craigslist(["detroit"])
+
+        assert [lead.listing_id for lead in leads] == ["101"]
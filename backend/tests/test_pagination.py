@@ -0,0 +1,120 @@
+"""
+Tests for Keyset Pagination
+Tests cursor encoding and seek queries used by list endpoints
+"""
+
+import uuid
+import pytest
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+
+from api.pagination import apply_keyset, decode_cursor, encode_cursor, next_cursor
+from database.models import Job, Room
+
+
+@pytest.fixture
+def many_jobs(test_db, sample_customer):
+    """Jobs sharing created_at timestamps, so ties must break on id"""
+    base = datetime(2024, 1, 1, 12, 0, 0)
+    jobs = []
+    for i in range(7):
+        job = Job(
+            customer_id=sample_customer.id,
+            job_number=f"JOB-{i:03d}",
+            status="draft",
+            property_address=f"{i} Test St",
+            created_at=base + timedelta(minutes=i // 2)
+        )
+        test_db.add(job)
+        jobs.append(job)
+    test_db.commit()
+    return jobs
+
+
+def fetch_all_pages(test_db, query_factory, columns, key, limit, descending=False, parsers=None):
+    """Walk every page via cursors and return the rows in order"""
+    seen = []
+    cursor = None
+    while True:
+        after = decode_cursor(cursor, parsers) if cursor else None
+        page = apply_keyset(query_factory(), columns, after, descending).limit(limit).all()
+        seen.extend(page)
+        cursor = next_cursor(page, limit, key)
+        if cursor is None:
+            return seen
+
+
+class TestCursorEncoding:
+    """Test opaque cursor tokens"""
+
+    def test_round_trip(self):
+        """Test that encoded values decode to the same values"""
+        created = datetime(2024, 1, 1, 12, 30, 15, 123456)
+        job_id = uuid.uuid4()
+
+        token = encode_cursor((created, job_id))
+
+        assert decode_cursor(token, (datetime.fromisoformat, uuid.UUID)) == (created, job_id)
+
+    def test_invalid_cursor_rejected(self):
+        """Test that garbage cursors raise 400"""
+        with pytest.raises(HTTPException) as exc_info:
+            decode_cursor("not-a-cursor", (datetime.fromisoformat, uuid.UUID))
+
+        assert exc_info.value.status_code == 400
+
+    def test_wrong_field_count_rejected(self):
+        """Test that a cursor for another endpoint is rejected"""
+        token = encode_cursor((uuid.uuid4(),))
+
+        with pytest.raises(HTTPException):
+            decode_cursor(token, (datetime.fromisoformat, uuid.UUID))
+
+    def test_no_cursor_on_short_page(self):
+        """Test that a partial page ends pagination"""
+        assert next_cursor([1, 2], 5, lambda item: (item,)) is None
+
+
+class TestKeysetQueries:
+    """Test seek queries over real rows"""
+
+    def test_jobs_pages_cover_every_row_once(self, test_db, many_jobs):
+        """Test that newest-first pages neither skip nor repeat jobs"""
+        seen = fetch_all_pages(
+            test_db,
+            lambda: test_db.query(Job),
+            (Job.created_at, Job.id),
+            lambda job: (job.created_at, job.id),
+            limit=3,
+            descending=True,
+            parsers=(datetime.fromisoformat, uuid.UUID)
+        )
+
+        expected = sorted(many_jobs, key=lambda job: (job.created_at, str(job.id)), reverse=True)
+        assert [job.id for job in seen] == [job.id for job in expected]
+
+    def test_rooms_pages_ordered_by_job_and_number(self, test_db, many_jobs):
+        """Test that room pages follow (job_id, room_number, id)"""
+        for job in many_jobs[:3]:
+            for number in (2, 1):
+                test_db.add(Room(
+                    job_id=job.id,
+                    name=f"Room {number}",
+                    room_number=number,
+                    final_size_class="medium",
+                    final_workload_class="moderate"
+                ))
+        test_db.commit()
+
+        seen = fetch_all_pages(
+            test_db,
+            lambda: test_db.query(Room),
+            (Room.job_id, Room.room_number, Room.id),
+            lambda room: (room.job_id, room.room_number, room.id),
+            limit=4,
+            parsers=(uuid.UUID, int, uuid.UUID)
+        )
+
+        assert len(seen) == 6
+        keys = [(str(room.job_id), room.room_number) for room in seen]
+        assert keys == sorted(keys)
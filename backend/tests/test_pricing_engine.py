@@ -6,7 +6,18 @@ Tests cost calculation, multipliers, and invoice generation
 import pytest
 from decimal import Decimal
 
-from services.pricing_engine import PricingEngine, get_pricing_engine
+import threading
+import time
+import uuid
+from unittest.mock import MagicMock
+from datetime import datetime
+
+from sqlalchemy import event, text
+
+from database.models import Job, PricingRule, Room
+from services.pricing_engine import (
+    JobFilter, PricingEngine, compile_pricing_rules, get_pricing_engine, rate_overrides
+)
 
 
 class TestPricingEngine:
@@ -335,3 +346,278 @@ class TestPricingEngine:
 
         assert direct_cost == job_result['room_total']
         assert float(direct_cost) == line_items[0]['unit_price']
+
+
+class TestBulkPricing:
+    """Test PricingEngine.price_rooms_bulk"""
+
+    def test_matches_calculate_room_cost(self):
+        """Test that every size/workload pair matches single-room pricing"""
+        engine = PricingEngine()
+        pairs = [
+            (size, workload)
+            for size in list(engine.size_multipliers) + ['unknown']
+            for workload in list(engine.workload_multipliers) + ['unknown']
+        ]
+
+        costs = engine.price_rooms_bulk([s for s, _ in pairs], [w for _, w in pairs])
+
+        for (size, workload), cost in zip(pairs, costs):
+            assert cost == engine.calculate_room_cost(size, workload)
+            assert cost.as_tuple().exponent == -2
+
+    def test_adjustments_per_room(self):
+        """Test that each room gets its own adjustments"""
+        engine = PricingEngine()
+        costs = engine.price_rooms_bulk(
+            ['medium', 'medium', 'small'],
+            ['moderate', 'moderate', 'light'],
+            [None, [{'amount': 50}, {'amount': 25.25}], []]
+        )
+
+        assert costs == [Decimal('292.50'), Decimal('367.75'), Decimal('150.00')]
+
+    def test_rounds_to_cents(self):
+        """Test that sub-cent products are rounded to the cent"""
+        engine = PricingEngine()
+        engine.apply_rules(rate_overrides(
+            size_multipliers={'medium': Decimal('1.25')},
+            workload_multipliers={'moderate': Decimal('1.33')}
+        ))
+
+        # 150 * 1.25 * 1.33 = 249.375
+        assert engine.price_rooms_bulk(['medium'], ['moderate']) == [Decimal('249.38')]
+        assert engine.calculate_room_cost('medium', 'moderate') == Decimal('249.38')
+
+    def test_rate_change_rebuilds_matrix(self):
+        """Test that the cost table follows rate changes"""
+        engine = PricingEngine()
+        assert engine.price_rooms_bulk(['small'], ['light']) == [Decimal('150.00')]
+
+        engine.apply_rules(rate_overrides(base_labor_rate=Decimal('200.00')))
+        assert engine.price_rooms_bulk(['small'], ['light']) == [Decimal('200.00')]
+        assert engine.calculate_room_cost('small', 'light') == Decimal('200.00')
+
+    def test_mismatched_lengths(self):
+        """Test that per-room inputs must line up"""
+        engine = PricingEngine()
+
+        with pytest.raises(ValueError):
+            engine.price_rooms_bulk(['small', 'large'], ['light'])
+        with pytest.raises(ValueError):
+            engine.price_rooms_bulk(['small'], ['light'], [None, None])
+
+
+class TestPricingRules:
+    """Test loading and compiling pricing_rules"""
+
+    def test_load_from_db(self, test_db, sample_pricing_rules):
+        """Test that active rules replace the default rates"""
+        sample_pricing_rules[2].size_multiplier = 2.5  # Large
+        test_db.add(PricingRule(rule_name="Old Large", rule_type="size_multiplier",
+                                size_class="large", size_multiplier=9.0, active=False))
+        test_db.commit()
+
+        engine = PricingEngine()
+        engine.load_pricing_rules_from_db(test_db)
+
+        assert engine.size_multipliers['large'] == Decimal('2.5')
+        assert engine.calculate_room_cost('large', 'light') == Decimal('375.00')
+        assert engine.price_rooms_bulk(['large'], ['light']) == [Decimal('375.00')]
+
+    def test_empty_table_keeps_defaults(self, test_db):
+        """Test that no rules means default pricing"""
+        engine = PricingEngine()
+        engine.load_pricing_rules_from_db(test_db)
+
+        assert engine.calculate_room_cost('medium', 'moderate') == Decimal('292.50')
+
+    def test_highest_priority_wins(self):
+        """Test that the first rule (highest priority) for a class is used"""
+        rules = [
+            PricingRule(rule_type='size_multiplier', size_class='small', size_multiplier=1.2, priority=5),
+            PricingRule(rule_type='size_multiplier', size_class='small', size_multiplier=1.1, priority=1),
+        ]
+        table = compile_pricing_rules(rules)
+
+        assert table.size_multipliers['small'] == Decimal('1.2')
+        with pytest.raises(TypeError):
+            table.size_multipliers['small'] = Decimal('1.0')
+
+    def test_conditional_adjustment_fees(self):
+        """Test that adjustments without an amount take the matching rule's fee"""
+        rules = [
+            PricingRule(rule_type='adjustment', flat_fee=200.00,
+                        condition={'type': 'bin_rental', 'size': '20_yard'}),
+            PricingRule(rule_type='adjustment', flat_fee=300.00,
+                        condition={'type': 'bin_rental', 'size': '30_yard'}),
+            PricingRule(rule_type='adjustment', flat_fee=25.00,
+                        condition={'type': 'stairs', 'per': 'flight'}),
+        ]
+        engine = PricingEngine()
+        engine.apply_rules(compile_pricing_rules(rules))
+
+        assert engine.adjustment_amount({'type': 'bin_rental', 'size': '30_yard'}) == Decimal('300.00')
+        assert engine.adjustment_amount({'type': 'stairs', 'quantity': 3}) == Decimal('75.00')
+        assert engine.adjustment_amount({'type': 'bin_rental', 'size': '40_yard'}) == Decimal('0')
+        assert engine.adjustment_amount({'type': 'bin_rental', 'amount': 10}) == Decimal('10')
+
+    def test_refresh_follows_watermark(self, test_db, sample_pricing_rules):
+        """Test that refresh reloads only after a change and the check interval"""
+        engine = PricingEngine()
+        engine.RULES_CHECK_INTERVAL = 3600
+
+        assert engine.refresh_rules(test_db)
+        assert not engine.refresh_rules(test_db)  # within the interval
+
+        test_db.add(PricingRule(rule_name="Bigger", rule_type="size_multiplier",
+                                size_class="extra_large", size_multiplier=4.0, priority=10))
+        test_db.commit()
+        assert not engine.refresh_rules(test_db)
+        assert engine.size_multipliers['extra_large'] == Decimal('3.0')
+
+        engine.invalidate_rules()
+        assert engine.refresh_rules(test_db)
+        assert engine.size_multipliers['extra_large'] == Decimal('4.0')
+
+        engine.invalidate_rules()
+        assert not engine.refresh_rules(test_db)  # checked, unchanged
+
+    def test_failed_refresh_keeps_caller_transaction(self, test_db, sample_customer):
+        """Test that a failing rules query is rolled back to a savepoint"""
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        def broken_watermark(db_session):
+            db_session.execute(text("SELECT missing_column FROM pricing_rules"))
+
+        engine = PricingEngine()
+        engine.apply_rules(compile_pricing_rules([]))
+        engine._rules_watermark = broken_watermark
+        sample_customer.name = "Renamed Customer"  # pending in the caller's transaction
+        test_db.flush()
+
+        event.listen(test_db.get_bind(), "before_cursor_execute", record)
+        try:
+            assert not engine.refresh_rules(test_db)
+        finally:
+            event.remove(test_db.get_bind(), "before_cursor_execute", record)
+
+        assert any(s.startswith("ROLLBACK TO SAVEPOINT") for s in statements)
+        assert engine.size_multipliers['small'] == Decimal('1.0')
+        test_db.commit()
+        test_db.refresh(sample_customer)
+        assert sample_customer.name == "Renamed Customer"
+
+    def test_refresh_during_reload_does_not_block(self):
+        """Test that a due check isn't held up by another caller's slow reload"""
+        engine = PricingEngine()
+        in_query = threading.Event()
+        release = threading.Event()
+
+        def slow_load(db_session):
+            if not in_query.is_set():
+                in_query.set()
+                release.wait(5)
+            engine.apply_rules(compile_pricing_rules([]))
+
+        engine.load_pricing_rules_from_db = slow_load
+
+        reloader = threading.Thread(target=engine.refresh_rules, args=(MagicMock(),))
+        reloader.start()
+        try:
+            assert in_query.wait(5)
+            engine.invalidate_rules()
+
+            started = time.monotonic()
+            assert engine.refresh_rules(MagicMock())
+            assert time.monotonic() - started < 1
+        finally:
+            release.set()
+            reloader.join()
+
+    def test_reload_is_never_torn(self):
+        """Test that pricing during reloads always uses one complete rate set"""
+        engine = PricingEngine()
+        rate_sets = [
+            rate_overrides(Decimal('100.00'), {'medium': Decimal('1.0')}, {'moderate': Decimal('1.0')}),
+            rate_overrides(Decimal('200.00'), {'medium': Decimal('2.0')}, {'moderate': Decimal('2.0')}),
+        ]
+        rooms = [{'size_class': 'medium', 'workload_class': 'moderate'}] * 3
+        stop = threading.Event()
+
+        def reload():
+            i = 0
+            while not stop.is_set():
+                engine.apply_rules(rate_sets[i % 2])
+                i += 1
+
+        reloader = threading.Thread(target=reload)
+        reloader.start()
+        try:
+            totals = {engine.calculate_job_cost(rooms)['total'] for _ in range(2000)}
+        finally:
+            stop.set()
+            reloader.join()
+
+        assert totals <= {Decimal('300.00'), Decimal('2400.00')}
+
+
+@pytest.fixture
+def job_history(test_db, sample_customer):
+    """Two months of jobs: Jan has 2 large/heavy + 1 small/light, Feb has 1 large/heavy"""
+    jobs = [
+        ("JOB-SIM-1", "completed", datetime(2025, 1, 10), [("large", "heavy"), ("small", "light")]),
+        ("JOB-SIM-2", "completed", datetime(2025, 1, 20), [("large", "heavy")]),
+        ("JOB-SIM-3", "draft", datetime(2025, 2, 5), [("large", "heavy")]),
+    ]
+    for job_number, status, created_at, rooms in jobs:
+        job = Job(id=uuid.uuid4(), customer_id=sample_customer.id, job_number=job_number,
+                  status=status, property_address="1 Test St", created_at=created_at)
+        test_db.add(job)
+        for number, (size, workload) in enumerate(rooms, 1):
+            test_db.add(Room(id=uuid.uuid4(), job_id=job.id, name=f"Room {number}", room_number=number,
+                             final_size_class=size, final_workload_class=workload))
+    test_db.commit()
+
+
+class TestSimulation:
+    """Test PricingEngine.simulate"""
+
+    def test_deltas_by_bucket_and_month(self, test_db, job_history):
+        """Test that candidate rates are compared with current ones per bucket and month"""
+        engine = PricingEngine()
+        rule_set = rate_overrides(size_multipliers={'large': Decimal('2.5')})
+
+        result = engine.simulate(test_db, rule_set, chunk_size=2)
+
+        # large/heavy: 150 * 2.0 * 1.6 = 480 -> 150 * 2.5 * 1.6 = 600
+        assert result['rooms'] == 4
+        assert result['current_total'] == Decimal('1590.00')
+        assert result['candidate_total'] == Decimal('1950.00')
+        assert result['delta'] == Decimal('360.00')
+
+        buckets = {(b['size_class'], b['workload_class']): b for b in result['by_bucket']}
+        assert buckets[('large', 'heavy')]['rooms'] == 3
+        assert buckets[('large', 'heavy')]['delta'] == Decimal('360.00')
+        assert buckets[('small', 'light')]['delta'] == Decimal('0.00')
+
+        months = [(m['month'], m['rooms'], m['delta']) for m in result['by_month']]
+        assert months == [('2025-01', 3, Decimal('240.00')), ('2025-02', 1, Decimal('120.00'))]
+
+        # The engine's own rates are untouched
+        assert engine.calculate_room_cost('large', 'heavy') == Decimal('480.00')
+
+    def test_job_filter(self, test_db, job_history):
+        """Test that only matching jobs are repriced"""
+        engine = PricingEngine()
+        rule_set = rate_overrides(base_labor_rate=Decimal('200.00'))
+
+        by_status = engine.simulate(test_db, rule_set, JobFilter(statuses=('completed',)))
+        by_date = engine.simulate(test_db, rule_set, JobFilter(created_from=datetime(2025, 2, 1)))
+
+        assert by_status['rooms'] == 3
+        assert by_date['rooms'] == 1
+        assert by_date['delta'] == Decimal('160.00')  # 480 -> 640
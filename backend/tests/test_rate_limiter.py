@@ -0,0 +1,91 @@
+"""
+Tests for Rate Limiter
+Tests token buckets and per-host/channel key resolution
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from services.rate_limiter import RateLimiter, TokenBucket, parse_rate_limits
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket:
+    """Test token bucket refill and waiting"""
+
+    def test_burst_then_refill(self):
+        """Test that burst tokens are available at once, then refill at rate"""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2.0, burst=3, clock=clock)
+
+        assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+        clock.now = 0.5  # one token at 2/sec
+        assert bucket.try_acquire()
+        assert not bucket.try_acquire()
+
+        clock.now = 100.0  # never more than burst
+        assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+    def test_invalid_configuration(self):
+        """Test that non-positive rate or burst is rejected"""
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+        with pytest.raises(ValueError):
+            TokenBucket(rate=1.0, burst=0)
+
+    async def test_acquire_waits_for_rate(self):
+        """Test that acquire paces callers at the configured rate"""
+        bucket = TokenBucket(rate=50.0, burst=1)
+
+        start = time.monotonic()
+        await asyncio.gather(*(bucket.acquire() for _ in range(6)))
+        elapsed = time.monotonic() - start
+
+        # First token is immediate, the other five wait 20ms each
+        assert elapsed >= 0.09
+        assert elapsed < 1.0
+
+
+class TestRateLimiter:
+    """Test per-host and per-channel buckets"""
+
+    def test_subdomains_share_bucket(self):
+        """Test that host keys resolve to the configured domain"""
+        limiter = RateLimiter({"craigslist.org": (1.0, 1), "facebook.com": (1.0, 1)})
+
+        assert limiter.resolve("detroit.craigslist.org") == "craigslist.org"
+        assert limiter.resolve("www.facebook.com") == "facebook.com"
+        assert limiter.bucket("detroit.craigslist.org") is limiter.bucket("annarbor.craigslist.org")
+
+    def test_keys_are_independent(self):
+        """Test that one exhausted key doesn't block another"""
+        limiter = RateLimiter({"smtp": (1.0, 1), "twilio": (1.0, 1)})
+
+        assert limiter.bucket("smtp").try_acquire()
+        assert not limiter.bucket("smtp").try_acquire()
+        assert limiter.bucket("twilio").try_acquire()
+
+    def test_unknown_key_uses_default(self):
+        """Test that unconfigured hosts get the default rate"""
+        limiter = RateLimiter({}, default=(3.0, 2))
+
+        bucket = limiter.bucket("example.com")
+
+        assert (bucket.rate, bucket.burst) == (3.0, 2)
+
+    def test_parse_rate_limits(self):
+        """Test RATE_LIMITS parsing with and without burst"""
+        assert parse_rate_limits("craigslist.org=2:4, SMTP=5") == {
+            "craigslist.org": (2.0, 4),
+            "smtp": (5.0, 1),
+        }
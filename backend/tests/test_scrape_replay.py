@@ -0,0 +1,136 @@
+"""
+Tests for Scrape Replay
+Tests the lead generator end-to-end against the local replay server
+"""
+
+from collections import Counter
+
+import pytest
+
+pytest.importorskip("aiohttp")
+pytest.importorskip("bs4")
+
+from services.listing_parser import ListingParser
+from services.michigan_lead_generator import MichiganLeadGenerator
+from services.rate_limiter import RateLimiter
+from benchmarks.scrape_replay import ReplayServer, write_synthetic_fixtures
+
+
+class TestScrapeReplay:
+    """Test replaying recorded pages through the real scraping code"""
+
+    @pytest.fixture
+    def fixtures_dir(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)  # michigan_leads.db is created in the cwd
+        directory = str(tmp_path / "fixtures")
+        write_synthetic_fixtures(directory, ["detroit", "troy"], ["detroit", "annarbor"], listings_per_page=3)
+        return directory
+
+    async def test_full_cycle_from_fixtures(self, fixtures_dir):
+        """Test scraping, saving, then a repeat cycle served as 304s"""
+        async with ReplayServer(fixtures_dir) as server:
+            async with MichiganLeadGenerator(
+                rate_limiter=RateLimiter({}, default=(1000.0, 100)),
+                parser=ListingParser(max_workers=0),
+                url_map=server.url_for,
+            ) as generator:
+                all_leads, _, saved = await generator.run_lead_generation(["detroit", "troy"])
+
+                assert server.not_found == 0
+                assert server.requests == 2 + 2 + 2 * 3  # Facebook, Craigslist searches, detail pages
+                assert saved.new == len(all_leads) == 2 * 3 + 2 * 3
+                assert all(lead.url.startswith("https://") for lead in all_leads)
+
+                all_leads, _, saved = await generator.run_lead_generation(["detroit", "troy"])
+
+                assert all_leads == []
+                assert generator.page_cache.not_modified == 4
+
+
+class CountingReplayServer(ReplayServer):
+    """Replay server that records peak in-flight requests, overall and per original host"""
+
+    def __init__(self, fixtures_dir, latency):
+        super().__init__(fixtures_dir, latency=latency)
+        self.in_flight = 0
+        self.peak = 0
+        self.host_in_flight = Counter()
+        self.host_peak = Counter()
+
+    async def _handle(self, request):
+        host = request.match_info["path"].split("/", 1)[0]
+        self.in_flight += 1
+        self.host_in_flight[host] += 1
+        self.peak = max(self.peak, self.in_flight)
+        self.host_peak[host] = max(self.host_peak[host], self.host_in_flight[host])
+        try:
+            return await super()._handle(request)
+        finally:
+            self.in_flight -= 1
+            self.host_in_flight[host] -= 1
+
+
+class TestConcurrentScraping:
+    """Test request limits and failure isolation of the concurrent sweep"""
+
+    FACEBOOK_CITIES = ["detroit", "troy", "warren", "novi"]
+    CRAIGSLIST_CITIES = ["detroit", "annarbor", "flint", "lansing"]
+
+    @pytest.fixture
+    def fixtures_dir(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)  # michigan_leads.db is created in the cwd
+        directory = str(tmp_path / "fixtures")
+        write_synthetic_fixtures(directory, self.FACEBOOK_CITIES, self.CRAIGSLIST_CITIES, listings_per_page=4)
+        return directory
+
+    def make_generator(self, server, url_map=None):
+        generator = MichiganLeadGenerator(
+            max_concurrent_requests=3,
+            max_requests_per_host=2,
+            rate_limiter=RateLimiter({}, default=(1000.0, 100)),
+            parser=ListingParser(max_workers=0),
+            url_map=url_map or server.url_for,
+        )
+        generator.craigslist_cities = self.CRAIGSLIST_CITIES
+        return generator
+
+    async def test_peak_requests_within_limits(self, fixtures_dir):
+        """Test that no host gets more than 2 requests at once, and no more than 3 overall"""
+        async with CountingReplayServer(fixtures_dir, latency=0.02) as server:
+            async with self.make_generator(server) as generator:
+                all_leads, _, _ = await generator.run_lead_generation(self.FACEBOOK_CITIES)
+
+        assert len(all_leads) == 4 * 4 + 4 * 4
+        assert server.requests == 4 + 4 + 4 * 4
+        assert server.peak == 3
+        assert max(server.host_peak.values()) == 2
+        assert server.host_peak["www.facebook.com"] == 2
+
+    async def test_failing_city_does_not_cancel_others(self, fixtures_dir):
+        """Test that an error in one city leaves the other cities' leads intact"""
+        def url_map(url):
+            if url.startswith("https://flint.craigslist.org/"):
+                raise ConnectionError("connection reset")
+            return server.url_for(url)
+
+        async with CountingReplayServer(fixtures_dir, latency=0.02) as server:
+            async with self.make_generator(server, url_map) as generator:
+                all_leads, _, saved = await generator.run_lead_generation(self.FACEBOOK_CITIES)
+
+        craigslist_cities = {lead.location for lead in all_leads if lead.source == "craigslist"}
+        assert craigslist_cities == {"Detroit", "Annarbor", "Lansing"}
+        assert sum(lead.source == "facebook_marketplace" for lead in all_leads) == 4 * 4
+        assert saved.new == len(all_leads) == 4 * 4 + 3 * 4
+
+    async def test_failing_source_does_not_cancel_others(self, fixtures_dir):
+        """Test that a whole source failing still saves the other source's leads"""
+        async with CountingReplayServer(fixtures_dir, latency=0.02) as server:
+            async with self.make_generator(server) as generator:
+                async def broken(cities=None):
+                    raise RuntimeError("marketplace layout changed")
+
+                generator.scrape_facebook_marketplace = broken
+                all_leads, _, saved = await generator.run_lead_generation(self.FACEBOOK_CITIES)
+
+        assert {lead.source for lead in all_leads} == {"craigslist"}
+        assert saved.new == len(all_leads) == 4 * 4
@@ -0,0 +1,112 @@
+"""
+Tests for SMTP Connection Pool
+Tests pooled sending against a local aiosmtpd server
+"""
+
+import asyncio
+import smtplib
+import socket
+from email.mime.text import MIMEText
+
+import pytest
+
+pytest.importorskip("aiosmtpd")
+
+from aiosmtpd.controller import Controller
+
+from services.smtp_pool import SMTPPool
+
+
+class RecordingHandler:
+    """Accepts every message and records which connection delivered it"""
+
+    def __init__(self, reject: str = ""):
+        self.messages = []
+        self.peers = set()
+        self.reject = reject
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address == self.reject:
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope.content)
+        self.peers.add(session.peer)
+        return "250 Message accepted for delivery"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler(reject="nobody@example.com")
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    yield controller
+    controller.stop()
+
+
+def make_message(to: str, i: int = 0) -> MIMEText:
+    msg = MIMEText(f"Quote {i}")
+    msg["From"] = "quotes@cleanoutpro.com"
+    msg["To"] = to
+    msg["Subject"] = f"Quote {i}"
+    return msg
+
+
+def make_pool(controller, size: int) -> SMTPPool:
+    return SMTPPool("127.0.0.1", controller.port, size=size, starttls=False, timeout=5)
+
+
+class TestSMTPPool:
+    """Test connection reuse, reconnects and rejections"""
+
+    async def test_reuses_connections(self, smtp_server):
+        """Test that many messages share at most `size` connections"""
+        pool = make_pool(smtp_server, size=2)
+        try:
+            await asyncio.gather(*(pool.send(make_message("lead@example.com", i)) for i in range(40)))
+        finally:
+            pool.close()
+
+        assert len(smtp_server.handler.messages) == 40
+        assert pool.sent == 40
+        assert pool.connects <= 2
+        assert len(smtp_server.handler.peers) <= 2
+
+    async def test_reconnects_dropped_connection(self, smtp_server):
+        """Test that a connection closed under the pool is reopened transparently"""
+        pool = make_pool(smtp_server, size=1)
+        try:
+            await pool.send(make_message("lead@example.com", 1))
+
+            # Simulate the server dropping the idle connection
+            conn = pool._idle.get()
+            conn.close()
+            pool._idle.put(conn)
+
+            await pool.send(make_message("lead@example.com", 2))
+        finally:
+            pool.close()
+
+        assert len(smtp_server.handler.messages) == 2
+        assert pool.connects == 2
+
+    async def test_rejected_recipient_keeps_connection(self, smtp_server):
+        """Test that a refused message raises but doesn't cost a reconnect"""
+        pool = make_pool(smtp_server, size=1)
+        try:
+            with pytest.raises(smtplib.SMTPRecipientsRefused):
+                await pool.send(make_message("nobody@example.com"))
+            await pool.send(make_message("lead@example.com"))
+        finally:
+            pool.close()
+
+        assert len(smtp_server.handler.messages) == 1
+        assert pool.connects == 1